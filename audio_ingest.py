@@ -0,0 +1,418 @@
+"""
+답변 음성 입력 처리 (Gradio → STT, 임시 파일 없음)
+- Gradio 마이크 입력 (sample_rate, ndarray)을 메모리에서 바로 변환
+  모노 다운믹스 → 16kHz 리샘플링 (NumPy 벡터 연산) → 음성 구간 검출(VAD) → 16bit PCM
+- VAD: 프레임 에너지 + 영교차율(ZCR), 행오버 적용
+  앞뒤 무음 제거, 긴 중간 쉼은 짧게 압축, 음성이 거의 없는 녹음은 업로드 전에 거절
+  → STT 지연/비용이 녹음 길이가 아니라 실제 발화 길이에 비례
+- 변환된 PCM을 PushAudioInputStream에 조각 단위로 입력하여 연속 인식
+  (PCM WAV 파일은 1초 조각씩 읽어 VAD 결과를 바로 입력 → 긴 녹음도 메모리 사용량 고정)
+- 변환 전/후 크기, 발화/무음 길이를 metrics에 기록
+"""
+
+import wave
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from continuous_stt import CHUNK_BYTES, SAMPLE_RATE
+from speech_backend import SpeechBackend
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# PCM 변환
+# ============================================
+
+def to_mono_float(data: np.ndarray) -> np.ndarray:
+    """정수/실수 샘플 → [-1, 1] float32 모노 (Gradio 배열은 (샘플 수, 채널 수))"""
+    samples = np.asarray(data)
+
+    if np.issubdtype(samples.dtype, np.integer):
+        info = np.iinfo(samples.dtype)
+        # uint8 등 부호 없는 형식은 중앙값을 0으로 이동
+        offset = (info.max + info.min + 1) / 2
+        samples = (samples.astype(np.float32) - offset) / (info.max - offset + 1)
+    else:
+        samples = samples.astype(np.float32, copy=False)
+
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    return samples
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """선형 보간 리샘플링 (다운샘플링 시 이동 평균으로 앨리어싱 완화)"""
+    if sample_rate == target_rate or samples.size == 0:
+        return samples
+
+    ratio = sample_rate / target_rate
+    if ratio > 1:
+        width = int(np.ceil(ratio))
+        samples = np.convolve(samples, np.full(width, 1.0 / width, dtype=np.float32), mode="same")
+
+    target_length = int(round(samples.size / ratio))
+    positions = np.arange(target_length, dtype=np.float64) * ratio
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """float32 [-1, 1] → 16bit little-endian PCM"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+# ============================================
+# 음성 구간 검출 (VAD)
+# ============================================
+
+FRAME_MS = 30
+HANGOVER_MS = 300
+PREROLL_MS = 150
+MAX_PAUSE_MS = 700
+MIN_SPEECH_SECONDS = 0.3
+
+# 에너지 기준: 추정 소음 바닥 + margin, 단 절대 하한 이상
+ENERGY_MARGIN_DB = 12.0
+ABSOLUTE_FLOOR_DB = -55.0
+NOISE_RISE_DB_PER_FRAME = 0.1
+# 에너지가 약간 낮아도 영교차율이 높으면 무성 자음(ㅅ, ㅊ 등)으로 보고 음성 처리
+UNVOICED_ZCR = 0.3
+UNVOICED_MARGIN_DB = 6.0
+
+
+class VoiceActivityDetector:
+    """
+    스트리밍 VAD (16kHz 모노 float 입력 → 발화 구간만 반환)
+    - process(): 입력 조각을 프레임 단위로 판정, 내보낼 샘플 반환 (첫 발화 전/쉼 구간은 보류)
+    - flush(): 입력 종료 (뒤쪽 무음은 버림)
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = FRAME_MS,
+        hangover_ms: int = HANGOVER_MS,
+        preroll_ms: int = PREROLL_MS,
+        max_pause_ms: int = MAX_PAUSE_MS
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.hangover_frames = hangover_ms // frame_ms
+        self.preroll_frames = max(1, preroll_ms // frame_ms)
+        self.max_pause_frames = max(1, max_pause_ms // frame_ms)
+
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._pending = deque(maxlen=self.max_pause_frames)
+        self._noise_db: Optional[float] = None
+        self._hangover = 0
+        self._started = False
+
+        self.input_frames = 0
+        self.output_frames = 0      # 내보낸 프레임 (행오버/쉼 포함, 잘라낸 길이)
+        self.speech_frames = 0      # 음성으로 판정된 프레임만 (짧은 녹음 거절 기준)
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        """프레임별 음성 여부 (에너지 dBFS + 영교차율, 벡터 연산)"""
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+
+        # 소음 바닥: 최솟값 추적 (천천히 상승하여 소음 변화에 적응)
+        decisions = np.zeros(len(frames), dtype=bool)
+        noise_db = self._noise_db if self._noise_db is not None else float(energy_db[0])
+        for i, e in enumerate(energy_db):
+            noise_db = min(float(e), noise_db + NOISE_RISE_DB_PER_FRAME)
+            threshold = max(noise_db + ENERGY_MARGIN_DB, ABSOLUTE_FLOOR_DB)
+            decisions[i] = e > threshold or (
+                zcr[i] > UNVOICED_ZCR and e > threshold - UNVOICED_MARGIN_DB
+            )
+        self._noise_db = noise_db
+        return decisions
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.concatenate([self._rest, samples]) if self._rest.size else samples
+        count = samples.size // self.frame_size
+        self._rest = samples[count * self.frame_size:]
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        frames = samples[:count * self.frame_size].reshape(count, self.frame_size)
+        output = []
+        for frame, is_speech in zip(frames, self._classify(frames)):
+            self.input_frames += 1
+            if is_speech:
+                self._hangover = self.hangover_frames
+                # 보류한 쉼 구간: 첫 발화 전이면 직전 일부만, 중간 쉼이면 최대 max_pause만 유지
+                kept = list(self._pending)[-self.preroll_frames:] if not self._started else list(self._pending)
+                output.extend(kept)
+                self._pending.clear()
+                self._started = True
+                self.speech_frames += 1
+            elif self._hangover > 0:
+                self._hangover -= 1
+            else:
+                self._pending.append(frame)
+                continue
+            output.append(frame)
+
+        self.output_frames += len(output)
+        return np.concatenate(output) if output else np.zeros(0, dtype=np.float32)
+
+    def flush(self) -> np.ndarray:
+        """입력 종료 - 보류 중인 뒤쪽 무음은 버림"""
+        self._pending.clear()
+        self._rest = np.zeros(0, dtype=np.float32)
+        return np.zeros(0, dtype=np.float32)
+
+    @property
+    def speech_seconds(self) -> float:
+        return self.speech_frames * self.frame_size / self.sample_rate
+
+    def stats(self) -> Dict[str, float]:
+        seconds = self.frame_size / self.sample_rate
+        return {
+            "input_seconds": round(self.input_frames * seconds, 2),
+            "output_seconds": round(self.output_frames * seconds, 2),
+            "speech_seconds": round(self.speech_seconds, 2)
+        }
+
+
+def accept_vad(vad: VoiceActivityDetector) -> bool:
+    """입력 종료 후 VAD 통계 기록 → 음성으로 판정된 길이가 MIN_SPEECH_SECONDS 이상인지"""
+    vad.flush()
+    stats = vad.stats()
+    metrics.observe("vad_input_seconds", stats["input_seconds"])
+    metrics.observe("vad_output_seconds", stats["output_seconds"])
+
+    if vad.speech_seconds < MIN_SPEECH_SECONDS:
+        metrics.increment("vad_rejections")
+        logger.warning(f"⚠️  음성이 감지되지 않음 (녹음 {stats['input_seconds']}초, 발화 {stats['speech_seconds']}초)")
+        return False
+
+    logger.info(f"✂️  무음 제거: {stats['input_seconds']}초 → {stats['output_seconds']}초 (발화 {stats['speech_seconds']}초)")
+    return True
+
+
+def _finish_vad(vad: VoiceActivityDetector, chunks) -> bytes:
+    """VAD 결과 → PCM (발화가 너무 짧으면 b"")"""
+    if not accept_vad(vad):
+        return b""
+    return to_pcm16(np.concatenate(chunks)) if chunks else b""
+
+
+def prepare_pcm(sample_rate: int, data: np.ndarray) -> bytes:
+    """Gradio 음성 배열 → 무음 제거된 16kHz 모노 16bit PCM (발화가 없으면 b"")"""
+    samples = resample(to_mono_float(data), sample_rate)
+
+    vad = VoiceActivityDetector()
+    pcm = _finish_vad(vad, [vad.process(samples)])
+
+    metrics.observe("stt_input_bytes", np.asarray(data).nbytes, stage="raw")
+    metrics.observe("stt_input_bytes", len(pcm), stage="pcm16k_trimmed")
+    return pcm
+
+
+def _iter_wav_samples(audio_file: str) -> Iterator[np.ndarray]:
+    """PCM WAV를 1초 단위로 읽어 16kHz 모노 float로 변환 (메모리는 조각 크기로 고정)"""
+    dtypes = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+    with wave.open(audio_file, "rb") as wav:
+        dtype = dtypes[wav.getsampwidth()]
+        channels = wav.getnchannels()
+        sample_rate = wav.getframerate()
+        while True:
+            chunk = wav.readframes(sample_rate)
+            if not chunk:
+                break
+            data = np.frombuffer(chunk, dtype=dtype)
+            if channels > 1:
+                data = data.reshape(-1, channels)
+            yield resample(to_mono_float(data), sample_rate)
+
+
+def is_pcm_wav(audio_file: str) -> bool:
+    """VAD로 직접 읽을 수 있는 PCM WAV인지 (아니면 SDK 파일 입력으로 처리)"""
+    try:
+        with wave.open(audio_file, "rb") as wav:
+            return wav.getcomptype() == "NONE" and wav.getsampwidth() in (1, 2, 4)
+    except (wave.Error, EOFError):
+        return False
+
+
+def parse_gradio_audio(audio) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Gradio Audio 값 → (파일 경로, PCM)
+    type="numpy"는 (sample_rate, ndarray), type="filepath"는 경로 문자열
+    PCM은 무음 제거 후 값 (발화가 없으면 b"")
+    """
+    if audio is None:
+        return None, None
+
+    if isinstance(audio, str):
+        return audio, None
+
+    if isinstance(audio, tuple) and len(audio) >= 2:
+        sample_rate, data = audio[0], audio[1]
+        if isinstance(data, str):
+            return data, None
+        if data is None or np.asarray(data).size == 0:
+            return None, None
+        return None, prepare_pcm(int(sample_rate), data)
+
+    logger.warning(f"⚠️  알 수 없는 오디오 형식: {type(audio)}")
+    return None, None
+
+
+# ============================================
+# STT 입력
+# ============================================
+
+def push_pcm(recognizer, pcm: bytes, chunk_bytes: int = CHUNK_BYTES * 10):
+    """PCM을 조각 단위로 PushAudioInputStream에 입력"""
+    view = memoryview(pcm)
+    for start in range(0, len(view), chunk_bytes):
+        recognizer.write(bytes(view[start:start + chunk_bytes]))
+
+
+def _feed_wav_file(
+    speech: SpeechBackend,
+    audio_file: str,
+    on_partial: Optional[Callable[[str], None]] = None
+):
+    """
+    PCM WAV를 1초 조각씩 VAD에 통과시켜 발화 구간만 바로 인식기에 입력 (녹음 전체를 메모리에 올리지 않음)
+    인식 세션은 첫 발화에서 시작, 음성 판정 길이가 MIN_SPEECH_SECONDS 미만이면 세션을 취소하고 None
+    → 입력이 끝난 인식기 반환 (finish/afinish로 결과 수신)
+    """
+    vad = VoiceActivityDetector()
+    recognizer = None
+    try:
+        for samples in _iter_wav_samples(audio_file):
+            voiced = vad.process(samples)
+            if not voiced.size:
+                continue
+            if recognizer is None:
+                recognizer = speech.open_recognizer(on_partial=on_partial)
+                recognizer.start()
+            recognizer.write(to_pcm16(voiced))
+    except Exception:
+        if recognizer is not None:
+            recognizer.cancel()
+        raise
+
+    if not accept_vad(vad):
+        if recognizer is not None:
+            recognizer.cancel()
+        return None
+    return recognizer
+
+
+def transcribe_wav_file(
+    speech: SpeechBackend,
+    audio_file: str,
+    on_partial: Optional[Callable[[str], None]] = None
+) -> Optional[str]:
+    """음성 파일 연속 인식 (PCM WAV는 무음 제거 후 조각 입력, 그 외 형식은 SDK 파일 입력)"""
+    if not is_pcm_wav(audio_file):
+        return speech.transcribe_file(audio_file, on_partial)
+
+    recognizer = _feed_wav_file(speech, audio_file, on_partial)
+    return recognizer.finish() if recognizer is not None else None
+
+
+async def atranscribe_wav_file(
+    speech: SpeechBackend,
+    audio_file: str,
+    on_partial: Optional[Callable[[str], None]] = None
+) -> Optional[str]:
+    """transcribe_wav_file의 비동기 버전 (파일 읽기/입력만 스레드에서, 결과는 이벤트로 await)"""
+    if not is_pcm_wav(audio_file):
+        return await speech.atranscribe_file(audio_file, on_partial)
+
+    recognizer = await asyncio.to_thread(_feed_wav_file, speech, audio_file, on_partial)
+    return await recognizer.afinish() if recognizer is not None else None
+
+
+async def atranscribe_pcm(
+    speech: SpeechBackend,
+    pcm: bytes,
+    on_partial: Optional[Callable[[str], None]] = None
+) -> Optional[str]:
+    """16kHz 모노 16bit PCM 연속 인식 (디스크를 거치지 않음)"""
+    recognizer = speech.open_recognizer(on_partial=on_partial)
+
+    def feed():
+        recognizer.start()
+        push_pcm(recognizer, pcm)
+
+    await asyncio.to_thread(feed)
+    return await recognizer.afinish()
+
+
+# ============================================
+# 실시간 인식 (마이크 스트리밍)
+# ============================================
+
+class LiveTranscriber:
+    """
+    녹음 중 마이크 조각 → 16kHz 변환 → VAD → 연속 인식
+    - 조각을 받는 즉시 인식기에 입력하므로 녹음 중에도 중간 결과(text) 확인 가능
+    - 녹음이 끝나면 finish()로 남은 음성만 인식하면 되어 STT가 평가 앞 대기 시간에서 빠짐
+    - 인식 세션은 첫 발화가 감지될 때 시작 (무음만 녹음하면 Speech 호출 없음)
+    - afinish() 후에는 finished가 True이며 더 이상 조각을 받지 않음 (다음 녹음은 새 인스턴스로)
+    """
+
+    def __init__(self, speech: SpeechBackend):
+        self.speech = speech
+        self.vad = VoiceActivityDetector()
+        self.recognizer = None
+        self.finished = False
+        # 인식기 시작(서비스 연결 대기)과 종료가 엇갈리지 않도록 보호
+        self._lock = threading.Lock()
+
+    @property
+    def text(self) -> str:
+        return self.recognizer.text if self.recognizer is not None else ""
+
+    def feed(self, sample_rate: int, data: np.ndarray):
+        """마이크 조각 입력 (인식기 시작 시 서비스 연결까지 대기하므로 이벤트 루프 밖에서 호출)"""
+        with self._lock:
+            if self.finished:
+                return
+            speech = self.vad.process(resample(to_mono_float(data), sample_rate))
+            if not speech.size:
+                return
+
+            if self.recognizer is None:
+                recognizer = self.speech.open_recognizer()
+                recognizer.start()
+                if self.finished:
+                    # 시작하는 동안 종료됨 → 세션을 남기지 않음
+                    recognizer.cancel()
+                    return
+                self.recognizer = recognizer
+                logger.info("🎙️  실시간 음성 인식 시작")
+            self.recognizer.write(to_pcm16(speech))
+
+    def _stop_input(self):
+        """더 이상 조각을 받지 않음 (진행 중인 feed의 인식기 시작이 끝날 때까지 대기)"""
+        with self._lock:
+            self.finished = True
+
+    async def afinish(self) -> Optional[str]:
+        """녹음 종료 → 최종 텍스트 (발화가 없거나 너무 짧으면 None)"""
+        # 잠금 대기가 서비스 연결 시간만큼 길 수 있으므로 이벤트 루프 밖에서
+        await asyncio.to_thread(self._stop_input)
+
+        # 음성 판정 길이가 MIN_SPEECH_SECONDS 미만이면 (짧은 잡음) 이미 시작된 세션도 결과 없이 종료
+        if not accept_vad(self.vad):
+            if self.recognizer is not None:
+                self.recognizer.cancel()
+            return None
+        if self.recognizer is None:
+            return None
+        return await self.recognizer.afinish()
@@ -0,0 +1,136 @@
+"""
+LLM 배포별 서킷 브레이커
+- 최근 호출의 오류율(429/5xx/연결·타임아웃)이 임계값을 넘으면 회로를 열고
+  일정 시간 동안 해당 배포 호출을 즉시 거절 (응답 대기 없이 캐시/문제 은행으로 대체)
+- 열린 시간이 지나면 시험 호출 1건만 허용 (half-open) → 성공 시 닫힘, 실패 시 다시 열림
+- 상태 전환/거절 횟수를 metrics에 기록
+
+LLM_CIRCUIT_BREAKER_ENABLED=false 로 비활성화
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_HALF_OPEN = "half_open"
+STATE_OPEN = "open"
+
+_STATE_GAUGE = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출하지 않음"""
+
+
+class CircuitBreaker:
+    """최근 N회 호출의 오류율 기반 서킷 브레이커"""
+
+    def __init__(
+        self,
+        name: str,
+        error_threshold: float = 0.5,
+        min_calls: int = 10,
+        window: int = 20,
+        open_seconds: float = 30.0
+    ):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._outcomes = deque(maxlen=max(window, min_calls))
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _current_state(self) -> str:
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(STATE_HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        if state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(f"⚠️  서킷 브레이커 열림: {self.name} ({self.open_seconds:g}초간 호출 차단)")
+        elif state == STATE_CLOSED:
+            self._outcomes.clear()
+            logger.info(f"✅ 서킷 브레이커 닫힘: {self.name}")
+        self._probe_started = None
+        metrics.set_gauge("llm_circuit_state", _STATE_GAUGE[state], target=self.name)
+        metrics.increment("llm_circuit_transitions", target=self.name, state=state)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def is_open(self) -> bool:
+        """호출이 즉시 거절될 상태인지 (시험 호출 슬롯은 소비하지 않음)"""
+        return self.state == STATE_OPEN
+
+    def allow(self) -> bool:
+        """호출 허용 여부 (half-open에서는 시험 호출 1건만 허용)"""
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_HALF_OPEN:
+                now = time.monotonic()
+                # 시험 호출이 취소되어 결과가 오지 않는 경우에 대비해 일정 시간 후 재허용
+                if self._probe_started is None or now - self._probe_started >= self.open_seconds:
+                    self._probe_started = now
+                    return True
+        metrics.increment("llm_circuit_rejections", target=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._outcomes.append(True)
+            if self._state == STATE_HALF_OPEN:
+                self._transition(STATE_CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            if self._state == STATE_HALF_OPEN:
+                self._transition(STATE_OPEN)
+                return
+            if self._state == STATE_CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for ok in self._outcomes if not ok)
+                if failures / len(self._outcomes) >= self.error_threshold:
+                    self._transition(STATE_OPEN)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: Optional[str]) -> Optional[CircuitBreaker]:
+    """배포(대상)별 공유 서킷 브레이커 (비활성화 시 None)"""
+    if os.getenv("LLM_CIRCUIT_BREAKER_ENABLED", "true").lower() == "false":
+        return None
+
+    name = name or "default"
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    error_threshold=float(os.getenv("LLM_CIRCUIT_ERROR_THRESHOLD", 0.5)),
+                    min_calls=int(os.getenv("LLM_CIRCUIT_MIN_CALLS", 10)),
+                    open_seconds=float(os.getenv("LLM_CIRCUIT_OPEN_SECONDS", 30))
+                )
+    return breaker
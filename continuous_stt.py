@@ -0,0 +1,274 @@
+"""
+연속 음성 인식 (긴 답변용)
+- recognize_once는 첫 긴 쉼 또는 약 15초에서 끊기므로 start_continuous_recognition 사용
+- 세션이 끝날 때까지 recognized 이벤트를 모두 모아 하나의 답변으로 반환
+- recognizing(중간 결과) 이벤트를 on_partial 콜백으로 바로 전달
+- 음성은 PushAudioInputStream에 조각 단위로 입력 (파일 전체를 메모리에 올리지 않음)
+- 인식 시간/음성 길이를 metrics에 기록
+"""
+
+import os
+import time
+import wave
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+BITS_PER_SAMPLE = 16
+CHANNELS = 1
+
+# 100ms 분량 (16kHz, 16bit, mono)
+CHUNK_BYTES = SAMPLE_RATE * BITS_PER_SAMPLE // 8 // 10
+
+# 입력 종료 후 최종 결과를 기다리는 최대 시간
+DEFAULT_FINISH_TIMEOUT = 60.0
+
+
+class ContinuousRecognizer:
+    """
+    PushAudioInputStream + 연속 인식 세션 1개
+
+    사용:
+        recognizer = ContinuousRecognizer(speech_config, on_partial=print)
+        recognizer.start()
+        recognizer.write(pcm_chunk)  # 반복
+        text = recognizer.finish()
+    """
+
+    def __init__(
+        self,
+        speech_config,
+        on_partial: Optional[Callable[[str], None]] = None,
+        sample_rate: int = SAMPLE_RATE,
+        bits_per_sample: int = BITS_PER_SAMPLE,
+        channels: int = CHANNELS
+    ):
+        import azure.cognitiveservices.speech as speechsdk
+
+        self._speechsdk = speechsdk
+        self.on_partial = on_partial
+        self.bytes_per_second = sample_rate * bits_per_sample // 8 * channels
+
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=sample_rate,
+            bits_per_sample=bits_per_sample,
+            channels=channels
+        )
+        self._stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        self.recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            audio_config=speechsdk.audio.AudioConfig(stream=self._stream)
+        )
+
+        self._segments: List[str] = []
+        self._hypothesis = ""
+        self._error: Optional[str] = None
+        self._done: Future = Future()
+        self._pending = None
+        self._closed = False
+        self._audio_bytes = 0
+        self._started_at = None
+        self._lock = threading.Lock()
+
+        self.recognizer.recognizing.connect(self._on_recognizing)
+        self.recognizer.recognized.connect(self._on_recognized)
+        self.recognizer.canceled.connect(self._on_canceled)
+        self.recognizer.session_stopped.connect(self._on_session_stopped)
+
+    # ---------- SDK 이벤트 ----------
+
+    def _on_recognizing(self, evt):
+        with self._lock:
+            self._hypothesis = evt.result.text
+        self._notify_partial()
+
+    def _on_recognized(self, evt):
+        if evt.result.reason == self._speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+            with self._lock:
+                self._segments.append(evt.result.text)
+                self._hypothesis = ""
+            self._notify_partial()
+
+    def _on_canceled(self, evt):
+        details = evt.cancellation_details
+        if details.reason == self._speechsdk.CancellationReason.Error:
+            self._error = f"{details.error_code}: {details.error_details}"
+            logger.error(f"❌ 연속 인식 오류: {self._error}")
+        self._complete()
+
+    def _on_session_stopped(self, evt):
+        self._complete()
+
+    def _notify_partial(self):
+        if self.on_partial is not None:
+            try:
+                self.on_partial(self.text)
+            except Exception as e:
+                logger.warning(f"⚠️  중간 인식 결과 전달 실패: {e}")
+
+    def _complete(self):
+        if not self._done.done():
+            self._done.set_result(None)
+            # 세션 자원 정리 (완료를 기다리지 않음)
+            self._pending = self.recognizer.stop_continuous_recognition_async()
+
+    # ---------- 입력 ----------
+
+    @property
+    def text(self) -> str:
+        """지금까지 인식된 전체 텍스트 (확정 문장 + 인식 중인 문장)"""
+        with self._lock:
+            parts = self._segments + ([self._hypothesis] if self._hypothesis else [])
+        return " ".join(parts)
+
+    def start(self):
+        """연속 인식 시작 (서비스 연결까지 대기)"""
+        self._started_at = time.perf_counter()
+        self.recognizer.start_continuous_recognition_async().get()
+
+    def write(self, chunk: bytes):
+        """PCM 조각 입력"""
+        if chunk and not self._closed:
+            self._stream.write(chunk)
+            self._audio_bytes += len(chunk)
+
+    def close(self):
+        """입력 종료 (남은 음성 인식 후 세션 종료 이벤트 발생)"""
+        if not self._closed:
+            self._closed = True
+            self._stream.close()
+
+    def cancel(self):
+        """입력 중단 후 결과를 기다리지 않고 세션 종료 (인식할 필요 없는 짧은 잡음 등)"""
+        self.close()
+        self._complete()
+
+    def _result(self) -> Optional[str]:
+        text = self.text.strip()
+        audio_seconds = self._audio_bytes / self.bytes_per_second
+        metrics.observe("stt_audio_seconds", audio_seconds)
+        if self._started_at is not None:
+            metrics.observe("stt_seconds", time.perf_counter() - self._started_at, mode="continuous")
+
+        if text:
+            logger.info(f"✅ 연속 인식 완료: {len(self._segments)}문장, {len(text)}자 (음성 {audio_seconds:.1f}초)")
+            return text
+        logger.warning(f"⚠️  인식된 음성 없음{f' ({self._error})' if self._error else ''}")
+        return None
+
+    def finish(self, timeout: float = DEFAULT_FINISH_TIMEOUT) -> Optional[str]:
+        """입력 종료 후 최종 텍스트 반환"""
+        self.close()
+        try:
+            self._done.result(timeout=timeout)
+        except Exception:
+            logger.warning(f"⚠️  연속 인식 종료 대기 시간 초과 ({timeout:g}초), 지금까지의 결과 사용")
+            self._complete()
+        return self._result()
+
+    async def afinish(self, timeout: float = DEFAULT_FINISH_TIMEOUT) -> Optional[str]:
+        """finish의 비동기 버전 (세션 종료 이벤트를 await, 스레드 블로킹 없음)"""
+        self.close()
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(self._done), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️  연속 인식 종료 대기 시간 초과 ({timeout:g}초), 지금까지의 결과 사용")
+            self._complete()
+        return self._result()
+
+
+# ============================================
+# 파일 입력
+# ============================================
+
+def open_recognizer_for_file(speech_config, audio_file: str, on_partial=None) -> Optional[ContinuousRecognizer]:
+    """PCM WAV 파일의 형식에 맞는 연속 인식기 생성 (PCM WAV가 아니면 None)"""
+    try:
+        with wave.open(audio_file, "rb") as wav:
+            if wav.getcomptype() != "NONE":
+                return None
+            return ContinuousRecognizer(
+                speech_config,
+                on_partial=on_partial,
+                sample_rate=wav.getframerate(),
+                bits_per_sample=wav.getsampwidth() * 8,
+                channels=wav.getnchannels()
+            )
+    except (wave.Error, EOFError):
+        return None
+
+
+def feed_wav_file(recognizer: ContinuousRecognizer, audio_file: str, chunk_bytes: int = CHUNK_BYTES * 10):
+    """WAV 파일을 조각 단위로 읽어 입력 (메모리 사용량은 조각 크기로 고정)"""
+    with wave.open(audio_file, "rb") as wav:
+        frame_bytes = wav.getsampwidth() * wav.getnchannels()
+        frames_per_chunk = max(1, chunk_bytes // frame_bytes)
+        while True:
+            chunk = wav.readframes(frames_per_chunk)
+            if not chunk:
+                break
+            recognizer.write(chunk)
+
+
+def transcribe_file(speech_config, audio_file: str, on_partial=None) -> Optional[str]:
+    """음성 파일 전체를 연속 인식 (PCM WAV는 조각 입력, 그 외 형식은 SDK 파일 입력)"""
+    recognizer = open_recognizer_for_file(speech_config, audio_file, on_partial)
+    if recognizer is None:
+        return _transcribe_compressed_file(speech_config, audio_file, on_partial)
+
+    recognizer.start()
+    feed_wav_file(recognizer, audio_file)
+    return recognizer.finish()
+
+
+async def atranscribe_file(speech_config, audio_file: str, on_partial=None) -> Optional[str]:
+    """transcribe_file의 비동기 버전 (파일 읽기/입력만 스레드에서, 결과는 이벤트로 await)"""
+    recognizer = open_recognizer_for_file(speech_config, audio_file, on_partial)
+    if recognizer is None:
+        return await asyncio.to_thread(_transcribe_compressed_file, speech_config, audio_file, on_partial)
+
+    def feed():
+        recognizer.start()
+        feed_wav_file(recognizer, audio_file)
+
+    await asyncio.to_thread(feed)
+    return await recognizer.afinish()
+
+
+def _transcribe_compressed_file(speech_config, audio_file: str, on_partial=None) -> Optional[str]:
+    """PCM WAV가 아닌 파일 (SDK가 파일에서 직접 읽음, 연속 인식)"""
+    import azure.cognitiveservices.speech as speechsdk
+
+    logger.info(f"🔄 PCM WAV가 아닌 음성 파일, SDK 파일 입력으로 연속 인식: {os.path.basename(audio_file)}")
+    recognizer = speechsdk.SpeechRecognizer(
+        speech_config=speech_config,
+        audio_config=speechsdk.audio.AudioConfig(filename=audio_file)
+    )
+    segments: List[str] = []
+    done = threading.Event()
+
+    def on_recognized(evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+            segments.append(evt.result.text)
+            if on_partial is not None:
+                on_partial(" ".join(segments))
+
+    recognizer.recognized.connect(on_recognized)
+    recognizer.canceled.connect(lambda evt: done.set())
+    recognizer.session_stopped.connect(lambda evt: done.set())
+
+    started = time.perf_counter()
+    recognizer.start_continuous_recognition_async().get()
+    done.wait(float(os.getenv("STT_FILE_TIMEOUT", 600)))
+    recognizer.stop_continuous_recognition_async().get()
+    metrics.observe("stt_seconds", time.perf_counter() - started, mode="file")
+
+    text = " ".join(segments).strip()
+    return text or None
@@ -109,7 +109,7 @@ def demo_conversational_generation():
                         break
                     
                     # 대화 히스토리 초기화
-                    generator.conversation_history = []
+                    generator.reset_conversation()
                     print_separator()
                     print("💬 새로운 대화를 시작합니다.\n")
         
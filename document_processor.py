@@ -10,7 +10,6 @@ from pathlib import Path
 import PyPDF2
 from pptx import Presentation
 from docx import Document
-from openai import AzureOpenAI
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
@@ -25,18 +24,18 @@ from azure.search.documents.indexes.models import (
 )
 from azure.core.credentials import AzureKeyCredential
 
+from llm_clients import get_client, chat_completion, create_embedding
+from rate_limiter import PRIORITY_BACKGROUND, priority_scope
+from tts_prerender import AUDIO_REF_FIELD, make_audio_ref, schedule_prerender
+
 
 class SemiconductorDocumentProcessor:
     """반도체 공정 문서 처리 및 지식 추출"""
     
     def __init__(self):
-        # Azure OpenAI 설정
-        self.openai_client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version="2024-02-15-preview",
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
+        # Azure OpenAI 설정 (공유 클라이언트)
         self.gpt_deployment = os.getenv("GPT_DEPLOYMENT_NAME", "gpt-4")
+        self.openai_client = get_client(self.gpt_deployment)
         
         # Azure AI Search 설정
         self.search_endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
@@ -186,17 +185,18 @@ JSON 형식으로 반환:
 """
             
             try:
-                response = self.openai_client.chat.completions.create(
-                    model=self.gpt_deployment,
+                content = chat_completion(
                     messages=[
                         {"role": "system", "content": "당신은 반도체 공정 전문가입니다. 수업자료에서 핵심 지식을 추출합니다."},
                         {"role": "user", "content": prompt}
                     ],
+                    deployment=self.gpt_deployment,
                     temperature=0.3,
-                    response_format={"type": "json_object"}
+                    response_format={"type": "json_object"},
+                    cache=True
                 )
                 
-                knowledge = json.loads(response.choices[0].message.content)
+                knowledge = json.loads(content)
                 
                 if knowledge.get('process_category'):
                     knowledge['original_content'] = chunk['content']
@@ -242,17 +242,17 @@ JSON 배열로 반환:
 """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_deployment,
+            content = chat_completion(
                 messages=[
                     {"role": "system", "content": "당신은 반도체 공학 교수입니다. 효과적인 학습 질문을 만듭니다."},
                     {"role": "user", "content": prompt}
                 ],
+                deployment=self.gpt_deployment,
                 temperature=0.7,
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             questions = result if isinstance(result, list) else result.get('questions', [])
             
             # 메타데이터 추가
@@ -268,11 +268,7 @@ JSON 배열로 반환:
     
     def get_embedding(self, text: str) -> List[float]:
         """텍스트 임베딩 생성"""
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        return create_embedding(text)
     
     def create_search_index(self):
         """반도체 지식 검색 인덱스 생성"""
@@ -304,7 +300,7 @@ JSON 배열로 반환:
         
         # 필드 정의
         fields = [
-            SimpleField(name="id", type=SearchFieldDataType.String, key=True),
+            SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True),
             SearchableField(name="question", type=SearchFieldDataType.String),
             SearchableField(name="answer", type=SearchFieldDataType.String),
             SearchableField(name="process_category", type=SearchFieldDataType.String, filterable=True),
@@ -312,6 +308,8 @@ JSON 배열로 반환:
             SimpleField(name="difficulty", type=SearchFieldDataType.String, filterable=True),
             SearchableField(name="theory", type=SearchFieldDataType.String),
             SearchableField(name="source", type=SearchFieldDataType.String),
+            # 사전 합성된 질문 음성 참조 (tts_prerender)
+            SimpleField(name=AUDIO_REF_FIELD, type=SearchFieldDataType.String),
             SearchField(
                 name="contentVector",
                 type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
@@ -364,8 +362,9 @@ JSON 배열로 반환:
             embedding_text = f"{q['question']} {q.get('answer', '')} {' '.join(q.get('keywords', []))}"
             embedding = self.get_embedding(embedding_text)
             
+            doc_id = str(start_id + i)
             doc = {
-                "id": str(start_id + i),
+                "id": doc_id,
                 "question": q['question'],
                 "answer": q.get('answer', ''),
                 "process_category": q.get('process_category', '이론'),
@@ -375,7 +374,8 @@ JSON 배열로 반환:
                 "source": q.get('source', ''),
                 "contentVector": embedding,
                 "keywords": q.get('keywords', []),
-                "related_concepts": q.get('related_concepts', [])
+                "related_concepts": q.get('related_concepts', []),
+                AUDIO_REF_FIELD: make_audio_ref(doc_id, q['question'])
             }
             documents.append(doc)
         
@@ -383,15 +383,19 @@ JSON 배열로 반환:
         result = search_client.upload_documents(documents=documents)
         
         success_count = sum(1 for r in result if r.succeeded)
+        
+        # 질문 음성은 백그라운드에서 미리 합성 (재생 시 합성 대기 없음)
+        schedule_prerender(documents)
         return {
             'success': success_count,
             'failed': len(result) - success_count,
             'total': len(documents)
         }
     
+    @priority_scope(PRIORITY_BACKGROUND)
     def process_course_materials(self, file_paths: List[str]) -> Dict:
         """
-        수업자료 일괄 처리
+        수업자료 일괄 처리 (LLM 호출은 background 우선순위)
         
         Args:
             file_paths: 수업자료 파일 경로 리스트
@@ -0,0 +1,463 @@
+"""
+검색 인덱스 스냅샷 내보내기/가져오기
+- Azure AI Search 인덱스(semiconductor-knowledge / interview-questions)의 문서와 벡터를
+  단일 NPZ 파일(float32 벡터 블록 + JSON 문서 블록)로 저장
+- 시작 시 벡터 블록을 메모리 매핑하여 Azure 없이 로컬 검색 제공
+- 스냅샷으로 빈 Azure 인덱스를 재임베딩 없이 채우기
+"""
+
+import os
+import json
+import struct
+import zipfile
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+DEFAULT_VECTOR_FIELD = "contentVector"
+
+# 검색 가능한 텍스트 필드 (두 인덱스 스키마 공통)
+TEXT_FIELDS = [
+    "question", "answer", "theory", "context", "sample_answer",
+    "process_category", "category", "question_type", "keywords",
+    "related_concepts", "tags"
+]
+
+
+def get_search_client(index_name: str):
+    """Azure AI Search 클라이언트 생성"""
+    from azure.search.documents import SearchClient
+    from azure.core.credentials import AzureKeyCredential
+
+    return SearchClient(
+        endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+        index_name=index_name,
+        credential=AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY"))
+    )
+
+
+def supports_id_cursor(index_name: str) -> bool:
+    """
+    인덱스 정의를 읽어 id 필드가 sortable + filterable인지 확인 (id 커서 페이지 사용 가능 여부)
+
+    이미 배포된 인덱스는 필드 속성을 바꿀 수 없으므로, 아니면(또는 확인 실패 시) skip 페이지로 대체
+    """
+    from azure.search.documents.indexes import SearchIndexClient
+    from azure.core.credentials import AzureKeyCredential
+
+    try:
+        index = SearchIndexClient(
+            endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+            credential=AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY"))
+        ).get_index(index_name)
+    except Exception as e:
+        logger.warning(f"⚠️  인덱스 정의 조회 실패, skip 페이지 사용: {e}")
+        return False
+
+    id_field = next((f for f in index.fields if f.name == "id"), None)
+    if id_field is not None and id_field.sortable and id_field.filterable:
+        return True
+    logger.warning(
+        f"⚠️  '{index_name}'의 id 필드가 sortable/filterable이 아니어서 skip 페이지 사용 "
+        f"(문서 100,000개 초과 시 실패 - 인덱스를 다시 생성하세요)"
+    )
+    return False
+
+
+def _json_block(data) -> np.ndarray:
+    """JSON 직렬화 데이터를 uint8 배열로 변환"""
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return np.frombuffer(raw, dtype=np.uint8)
+
+
+def _odata_string(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def iter_index_documents(
+    search_client,
+    select: Optional[List[str]] = None,
+    page_size: int = 1000,
+    id_cursor: bool = True
+) -> Iterator[Dict]:
+    """
+    인덱스 전체 문서를 id 순서로 페이지 단위 순회
+
+    skip 대신 id 커서(orderby="id" + filter="id gt '<마지막 id>'")로 페이지를 넘기므로
+    페이지 간 중복/누락이 없고 skip 상한(100,000)에 걸리지 않음
+    id_cursor=False면 skip/top 페이지 (id 필드가 sortable/filterable이 아닌 기존 인덱스,
+    supports_id_cursor 참고)
+    """
+    if select and "id" not in select:
+        select = ["id"] + list(select)
+
+    if not id_cursor:
+        yield from _iter_documents_by_skip(search_client, select, page_size)
+        return
+
+    last_id = None
+    while True:
+        page = list(search_client.search(
+            search_text="*",
+            filter=f"id gt {_odata_string(last_id)}" if last_id is not None else None,
+            order_by=["id asc"],
+            select=select,
+            top=page_size
+        ))
+        for result in page:
+            yield {k: v for k, v in dict(result).items() if not k.startswith("@search.")}
+
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def _iter_documents_by_skip(search_client, select: Optional[List[str]], page_size: int) -> Iterator[Dict]:
+    skip = 0
+    while True:
+        page = list(search_client.search(search_text="*", select=select, top=page_size, skip=skip))
+        for result in page:
+            yield {k: v for k, v in dict(result).items() if not k.startswith("@search.")}
+
+        skip += len(page)
+        if len(page) < page_size:
+            return
+
+
+def _read_json_block(block: np.ndarray):
+    return json.loads(bytes(block).decode("utf-8"))
+
+
+# ============================================
+# 내보내기
+# ============================================
+
+def export_index_snapshot(
+    output_path: str,
+    index_name: Optional[str] = None,
+    vector_field: str = DEFAULT_VECTOR_FIELD,
+    page_size: int = 1000
+) -> Dict:
+    """
+    인덱스 전체를 페이지 단위로 읽어 스냅샷 파일로 저장
+
+    Returns:
+        {'index_name', 'count', 'dim', 'path'}
+    """
+    index_name = index_name or os.getenv("AZURE_SEARCH_INDEX", "semiconductor-knowledge")
+    search_client = get_search_client(index_name)
+
+    documents = []
+    vectors = []
+
+    id_cursor = supports_id_cursor(index_name)
+    for doc in iter_index_documents(search_client, page_size=page_size, id_cursor=id_cursor):
+        vectors.append(doc.pop(vector_field, None))
+        documents.append(doc)
+        if len(documents) % page_size == 0:
+            logger.info(f"📦 스냅샷 페이지 수집: {len(documents)}개")
+
+    dim = next((len(v) for v in vectors if v), 0)
+    vector_block = np.zeros((len(documents), dim), dtype=np.float32)
+    has_vector = np.zeros(len(documents), dtype=bool)
+    for i, vector in enumerate(vectors):
+        if vector and len(vector) == dim:
+            vector_block[i] = vector
+            has_vector[i] = True
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "index_name": index_name,
+        "vector_field": vector_field,
+        "dim": dim,
+        "count": len(documents),
+        "created_at": datetime.now().isoformat()
+    }
+
+    write_snapshot(output_path, documents, vector_block, has_vector, meta)
+    logger.info(f"✅ 스냅샷 저장 완료: {output_path} ({len(documents)}개, {dim}차원)")
+
+    return {"index_name": index_name, "count": len(documents), "dim": dim, "path": output_path}
+
+
+def write_snapshot(
+    output_path: str,
+    documents: List[Dict],
+    vectors: np.ndarray,
+    has_vector: np.ndarray,
+    meta: Dict
+):
+    """
+    스냅샷 파일 쓰기
+
+    메모리 매핑이 가능하도록 압축하지 않은 NPZ(np.savez)로 저장하고,
+    임시 파일에 쓴 뒤 교체하여 부분 기록된 파일이 남지 않게 한다.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            vectors=np.ascontiguousarray(vectors, dtype=np.float32),
+            has_vector=has_vector.astype(bool),
+            documents=_json_block(documents),
+            meta=_json_block(meta)
+        )
+    os.replace(tmp_path, output_path)
+
+
+# ============================================
+# 가져오기 (메모리 매핑)
+# ============================================
+
+def _memmap_npz_member(path: str, member: str) -> Optional[np.ndarray]:
+    """
+    무압축 NPZ 내부의 .npy 배열을 복사 없이 메모리 매핑
+
+    압축된 파일 등 매핑할 수 없으면 None 반환
+    """
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(member)
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+
+    with open(path, "rb") as f:
+        # ZIP 로컬 파일 헤더: 30바이트 + 파일명 + extra 필드
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if dtype.hasobject:
+        return None
+    if not shape or 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C"
+    )
+
+
+def load_index_snapshot(path: str, mmap: bool = True) -> "LocalSearchIndex":
+    """스냅샷 파일을 로컬 검색 인덱스로 로드"""
+    with np.load(path, allow_pickle=False) as data:
+        meta = _read_json_block(data["meta"])
+        documents = _read_json_block(data["documents"])
+        has_vector = np.array(data["has_vector"])
+        vectors = None if mmap else np.array(data["vectors"])
+
+    if mmap:
+        vectors = _memmap_npz_member(path, "vectors.npy")
+        if vectors is None:
+            with np.load(path, allow_pickle=False) as data:
+                vectors = np.array(data["vectors"])
+
+    logger.info(
+        f"✅ 스냅샷 로드: {path} ({meta.get('index_name')}, "
+        f"{len(documents)}개, {'mmap' if isinstance(vectors, np.memmap) else 'memory'})"
+    )
+    return LocalSearchIndex(documents, vectors, has_vector, meta)
+
+
+class LocalSearchIndex:
+    """
+    스냅샷 기반 로컬 검색 인덱스
+
+    SearchClient.search와 같은 키워드 인자(search_text, filter, top, select,
+    vector_queries)를 받아 dict 결과를 반환하므로 clients['search']에 그대로 사용 가능
+    """
+
+    def __init__(self, documents: List[Dict], vectors: np.ndarray, has_vector: np.ndarray, meta: Dict):
+        self.documents = documents
+        self.vectors = vectors
+        self.has_vector = has_vector
+        self.meta = meta
+        self.index_name = meta.get("index_name", "local")
+        self._norms = None
+        self._texts = [self._document_text(doc) for doc in documents]
+
+    @staticmethod
+    def _document_text(doc: Dict) -> str:
+        parts = []
+        for field in TEXT_FIELDS:
+            value = doc.get(field)
+            if isinstance(value, list):
+                parts.extend(str(v) for v in value)
+            elif value:
+                parts.append(str(value))
+        return " ".join(parts).lower()
+
+    @staticmethod
+    def _parse_filter(filter_expression: Optional[str]) -> List[tuple]:
+        """단순 필터만 지원: field eq 'value' [and ...]"""
+        conditions = []
+        if not filter_expression:
+            return conditions
+
+        for clause in filter_expression.split(" and "):
+            tokens = clause.strip().split(" eq ", 1)
+            if len(tokens) != 2:
+                raise ValueError(f"지원하지 않는 필터: {clause}")
+            conditions.append((tokens[0].strip(), tokens[1].strip().strip("'")))
+        return conditions
+
+    def _keyword_scores(self, search_text: Optional[str]) -> np.ndarray:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        if not search_text or search_text.strip() == "*":
+            scores += 1.0
+            return scores
+
+        terms = [t for t in search_text.lower().split() if t]
+        for i, text in enumerate(self._texts):
+            scores[i] = sum(text.count(term) for term in terms)
+        return scores
+
+    def _vector_scores(self, vector) -> np.ndarray:
+        """코사인 유사도 (벡터 없는 문서는 0)"""
+        if self._norms is None:
+            norms = np.linalg.norm(self.vectors, axis=1)
+            self._norms = np.where(norms > 0, norms, 1.0)
+
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query) or 1.0
+        scores = (self.vectors @ query) / (self._norms * query_norm)
+        return np.where(self.has_vector, scores, 0.0).astype(np.float32)
+
+    def search(
+        self,
+        search_text: Optional[str] = None,
+        filter: Optional[str] = None,
+        top: int = 50,
+        select: Optional[List[str]] = None,
+        vector_queries: Optional[list] = None,
+        **kwargs
+    ) -> List[Dict]:
+        """키워드 + 벡터 하이브리드 검색"""
+        scores = self._keyword_scores(search_text)
+
+        for vector_query in vector_queries or []:
+            if len(self.documents) and self.vectors.shape[1] == len(vector_query.vector):
+                scores = scores + self._vector_scores(vector_query.vector)
+
+        conditions = self._parse_filter(filter)
+        if conditions:
+            mask = np.array([
+                all(str(doc.get(field)) == value for field, value in conditions)
+                for doc in self.documents
+            ], dtype=bool)
+            scores = np.where(mask, scores, 0.0)
+
+        candidates = np.flatnonzero(scores > 0)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")][:top]
+
+        results = []
+        for i in order:
+            doc = self.documents[i]
+            item = {k: doc.get(k) for k in select} if select else dict(doc)
+            item["@search.score"] = float(scores[i])
+            results.append(item)
+        return results
+
+    def get_vector(self, i: int) -> Optional[List[float]]:
+        if not self.has_vector[i]:
+            return None
+        return np.asarray(self.vectors[i], dtype=np.float32).tolist()
+
+
+# ============================================
+# Azure 인덱스 시딩
+# ============================================
+
+def seed_index_from_snapshot(
+    snapshot_path: str,
+    index_name: Optional[str] = None,
+    batch_size: int = 500
+) -> Dict:
+    """
+    스냅샷의 문서와 벡터를 (빈) Azure 인덱스에 업로드 - 재임베딩 불필요
+
+    인덱스는 미리 생성되어 있어야 함 (setup_search_index / document_processor 참고)
+    """
+    local_index = load_index_snapshot(snapshot_path)
+    index_name = index_name or local_index.index_name
+    vector_field = local_index.meta.get("vector_field", DEFAULT_VECTOR_FIELD)
+    search_client = get_search_client(index_name)
+
+    success_count = 0
+    total = len(local_index.documents)
+
+    for start in range(0, total, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, total)):
+            doc = dict(local_index.documents[i])
+            vector = local_index.get_vector(i)
+            if vector is not None:
+                doc[vector_field] = vector
+            batch.append(doc)
+
+        result = search_client.upload_documents(documents=batch)
+        success_count += sum(1 for r in result if r.succeeded)
+        logger.info(f"📤 시딩 진행: {min(start + batch_size, total)}/{total}")
+
+    return {
+        'success': success_count,
+        'failed': total - success_count,
+        'total': total
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="검색 인덱스 스냅샷 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Azure 인덱스 → 스냅샷 파일")
+    export_parser.add_argument("--index", default=None, help="인덱스 이름 (기본: AZURE_SEARCH_INDEX)")
+    export_parser.add_argument("--output", required=True, help="출력 파일 경로 (.npz)")
+    export_parser.add_argument("--page-size", type=int, default=1000)
+
+    seed_parser = subparsers.add_parser("seed", help="스냅샷 파일 → Azure 인덱스")
+    seed_parser.add_argument("snapshot", help="스냅샷 파일 경로")
+    seed_parser.add_argument("--index", default=None, help="대상 인덱스 (기본: 스냅샷의 인덱스)")
+    seed_parser.add_argument("--batch-size", type=int, default=500)
+
+    info_parser = subparsers.add_parser("info", help="스냅샷 정보 출력")
+    info_parser.add_argument("snapshot", help="스냅샷 파일 경로")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        result = export_index_snapshot(args.output, args.index, page_size=args.page_size)
+    elif args.command == "seed":
+        result = seed_index_from_snapshot(args.snapshot, args.index, args.batch_size)
+    else:
+        result = load_index_snapshot(args.snapshot).meta
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
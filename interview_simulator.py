@@ -7,33 +7,40 @@ Azure 기반 모의 면접 시뮬레이션 시스템
 
 import os
 import json
+import logging
 import base64
+import shutil
 from io import BytesIO
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import gradio as gr
 import azure.cognitiveservices.speech as speechsdk
-from openai import AzureOpenAI
 from azure.search.documents import SearchClient
 from azure.search.documents.models import VectorizedQuery
 from azure.core.credentials import AzureKeyCredential
+
+from audio_ingest import transcribe_wav_file
+from llm_clients import get_client, chat_completion, create_embedding
+from speech_backend import SpeechBackend, create_speech_backend
+from tts_cache import get_tts_cache, make_audio_key
 from PIL import Image
 import requests
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
+
 class InterviewSimulator:
     def __init__(self):
         # Azure Speech Service 설정
         self.speech_key = os.getenv("AZURE_SPEECH_KEY")
         self.speech_region = os.getenv("AZURE_SPEECH_REGION")
         self.custom_voice_name = os.getenv("CUSTOM_VOICE_NAME")  # 예: "YourCustomVoice"
+        self._speech_config = None
+        self._speech = None
         
-        # Azure OpenAI 설정
-        self.openai_client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version="2024-02-15-preview",
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
+        # Azure OpenAI 설정 (공유 클라이언트)
         self.gpt_deployment = os.getenv("GPT_DEPLOYMENT_NAME", "gpt-4")
+        self.openai_client = get_client(self.gpt_deployment)
         self.dalle_deployment = os.getenv("DALLE_DEPLOYMENT_NAME", "dall-e-3")
         
         # Azure AI Search 설정 (RAG)
@@ -48,46 +55,47 @@ class InterviewSimulator:
         self.current_question_context = None
         
     def initialize_speech_config(self):
-        """Speech 설정 초기화"""
-        speech_config = speechsdk.SpeechConfig(
-            subscription=self.speech_key,
-            region=self.speech_region
-        )
-        # Custom Voice 설정
-        speech_config.speech_synthesis_voice_name = self.custom_voice_name
-        return speech_config
+        """Speech 설정 초기화 (최초 1회 생성 후 재사용)"""
+        if self._speech_config is None:
+            speech_config = speechsdk.SpeechConfig(
+                subscription=self.speech_key,
+                region=self.speech_region
+            )
+            # Custom Voice 설정
+            speech_config.speech_synthesis_voice_name = self.custom_voice_name
+            speech_config.speech_recognition_language = "ko-KR"
+            self._speech_config = speech_config
+        return self._speech_config
+    
+    def speech_backend(self) -> Optional[SpeechBackend]:
+        """음성 백엔드 (최초 1회 생성 후 재사용, SPEECH_BACKEND=fake면 Azure 없이 동작, 설정이 없으면 None)"""
+        if self._speech is None:
+            self._speech = create_speech_backend(
+                self.initialize_speech_config() if self.speech_key else None,
+                voice=self.custom_voice_name,
+                # 출력 형식 미지정 → SDK 기본 WAV
+                output_format="wav"
+            )
+        return self._speech
     
     def speech_to_text(self, audio_file) -> str:
-        """음성을 텍스트로 변환 (STT)"""
-        speech_config = speechsdk.SpeechConfig(
-            subscription=self.speech_key,
-            region=self.speech_region
-        )
-        speech_config.speech_recognition_language = "ko-KR"
-        
-        audio_config = speechsdk.audio.AudioConfig(filename=audio_file)
-        speech_recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config,
-            audio_config=audio_config
-        )
-        
-        result = speech_recognizer.recognize_once_async().get()
-        
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            return result.text
+        """음성을 텍스트로 변환 (STT, 연속 인식으로 긴 답변도 끝까지)"""
+        # SpeechRecognizer는 입력 파일에 묶이므로 매번 생성, SpeechConfig는 공유
+        # 앞뒤 무음/긴 쉼은 제거 후 업로드 (PCM WAV가 아니면 파일 그대로)
+        speech = self.speech_backend()
+        if speech is None:
+            logger.warning("⚠️  Speech 클라이언트가 없습니다")
+            return "음성 인식 실패: 음성 서비스가 설정되지 않았습니다"
+        
+        text = transcribe_wav_file(speech, audio_file)
+        
+        if text:
+            return text
         else:
-            return f"음성 인식 실패: {result.reason}"
+            return "음성 인식 실패: 인식된 음성이 없습니다"
     
     def text_to_speech(self, text: str, output_file: str = "output.wav"):
-        """텍스트를 Custom Voice로 음성 변환 (TTS)"""
-        speech_config = self.initialize_speech_config()
-        audio_config = speechsdk.audio.AudioOutputConfig(filename=output_file)
-        
-        speech_synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config,
-            audio_config=audio_config
-        )
-        
+        """텍스트를 Custom Voice로 음성 변환 (TTS, 같은 SSML은 캐시된 음성 복사)"""
         # SSML을 사용하여 더 자연스러운 음성 생성
         ssml = f"""
         <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='ko-KR'>
@@ -99,21 +107,34 @@ class InterviewSimulator:
         </speak>
         """
         
-        result = speech_synthesizer.speak_ssml_async(ssml).get()
+        speech = self.speech_backend()
+        if speech is None:
+            logger.warning("⚠️  Speech 클라이언트가 없습니다")
+            return None
+        
+        cache = get_tts_cache()
+        cache_key = make_audio_key(text, speech.voice, ssml=ssml)
+        cached = cache.get(cache_key) if cache else None
+        if cached:
+            shutil.copyfile(cached, output_file)
+            return output_file
+        
+        # 사전 연결된 합성기 풀에서 합성 (Azure 백엔드)
+        audio_data = speech.synthesize(ssml, ssml=True)
         
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+        if audio_data is not None:
+            with open(output_file, "wb") as f:
+                f.write(audio_data)
+            if cache:
+                cache.put_bytes(cache_key, audio_data)
             return output_file
         else:
-            print(f"TTS 실패: {result.reason}")
+            logger.warning("⚠️  TTS 실패")
             return None
     
     def get_embedding(self, text: str) -> List[float]:
         """텍스트 임베딩 생성"""
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        return create_embedding(text)
     
     def search_interview_questions(self, query: str, top_k: int = 3) -> List[Dict]:
         """RAG: 벡터 검색으로 관련 면접 질문 검색"""
@@ -155,21 +176,19 @@ class InterviewSimulator:
 matplotlib를 사용하여 그래프를 생성하고, 실행 가능한 코드만 반환하세요.
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        return chat_completion(
             messages=[
                 {"role": "system", "content": "당신은 데이터 시각화 전문가입니다."},
                 {"role": "user", "content": prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.7
         )
-        
-        return response.choices[0].message.content
     
     def generate_image(self, prompt: str) -> str:
         """DALL-E로 이미지 생성"""
         try:
-            result = self.openai_client.images.generate(
+            result = get_client(self.dalle_deployment).images.generate(
                 model=self.dalle_deployment,
                 prompt=prompt,
                 n=1,
@@ -232,17 +251,17 @@ JSON 형식으로 응답:
 }}
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        content = chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.7,
             response_format={"type": "json_object"}
         )
         
-        question_data = json.loads(response.choices[0].message.content)
+        question_data = json.loads(content)
         
         # 4. 시각자료 생성 (필요한 경우)
         visualization_url = None
@@ -289,24 +308,25 @@ JSON 형식으로 응답:
 }}
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        content = chat_completion(
             messages=[
                 {"role": "system", "content": "당신은 면접 평가 전문가입니다."},
                 {"role": "user", "content": prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.7,
             response_format={"type": "json_object"}
         )
         
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
 
 
 # Question Generator 임포트
-from question_generator import QuestionGenerator
+from question_generator import QuestionGenerator, RequirementsConversation
 
 # Gradio 인터페이스 구성
 def create_gradio_interface():
+    # 클라이언트를 담은 객체는 공유, 대화/점수 등은 사용자 세션별 gr.State로 분리
     simulator = InterviewSimulator()
     question_gen = QuestionGenerator()
     
@@ -318,12 +338,11 @@ def create_gradio_interface():
             self.total_score = 0
             self.feedback_history = []
             self.question_requirements = None
-            self.gen_conversation = []
+            self.conversation = RequirementsConversation()
     
-    state = SessionState()
-    
-    def start_interview(profile, difficulty, use_viz):
+    def start_interview(profile, difficulty, use_viz, state):
         """면접 시작"""
+        state = state or SessionState()
         state.current_question = simulator.generate_interview_question(
             profile, difficulty, use_viz
         )
@@ -331,8 +350,8 @@ def create_gradio_interface():
         
         question_text = state.current_question["question"]
         
-        # TTS로 음성 생성
-        audio_file = f"question_{state.question_count}.wav"
+        # TTS로 음성 생성 (세션마다 다른 파일)
+        audio_file = f"question_{id(state)}_{state.question_count}.wav"
         simulator.text_to_speech(question_text, audio_file)
         
         # 시각자료가 있으면 표시
@@ -343,11 +362,15 @@ def create_gradio_interface():
             f"{question_text}\n\n"
             f"*선택 이유: {state.current_question['rationale']}*",
             audio_file,
-            viz_url if viz_url else None
+            viz_url if viz_url else None,
+            state
         )
     
-    def process_answer(audio_input, text_input):
+    def process_answer(audio_input, text_input, state):
         """답변 처리 및 평가"""
+        if not state or not state.current_question:
+            return "❌ 먼저 면접을 시작하세요.", None, "", state
+        
         # 음성 또는 텍스트 입력 처리
         if audio_input:
             answer_text = simulator.speech_to_text(audio_input)
@@ -375,7 +398,7 @@ def create_gradio_interface():
 피드백: {evaluation['feedback']}
 """
         
-        feedback_audio = f"feedback_{state.question_count}.wav"
+        feedback_audio = f"feedback_{id(state)}_{state.question_count}.wav"
         simulator.text_to_speech(feedback_text, feedback_audio)
         
         return (
@@ -387,17 +410,18 @@ def create_gradio_interface():
             f"**피드백:**\n{evaluation['feedback']}\n\n"
             f"**제안 답변:**\n{evaluation['suggested_answer']}",
             feedback_audio,
-            f"현재까지 평균 점수: {state.total_score / state.question_count:.1f}점"
+            f"현재까지 평균 점수: {state.total_score / state.question_count:.1f}점",
+            state
         )
     
     # === 질문 생성 관련 함수 ===
     
-    def chat_generate_questions(user_message, chat_history):
-        """대화형 질문 생성"""
-        result = question_gen.chat_for_requirements(user_message)
+    def chat_generate_questions(user_message, chat_history, state):
+        """대화형 질문 생성 (세션별 대화 상태 사용)"""
+        state = state or SessionState()
+        result = question_gen.chat_for_requirements(user_message, conversation=state.conversation)
         
         bot_response = result['response']
-        state.gen_conversation.append((user_message, bot_response))
         
         # 정보 수집 완료 여부 확인
         if result.get('is_complete'):
@@ -406,19 +430,21 @@ def create_gradio_interface():
                 chat_history + [[user_message, bot_response]],
                 "",
                 True,  # 생성 버튼 활성화
-                f"✅ 정보 수집 완료! 총 {result['collected_info'].get('question_count', 20)}개 질문을 생성합니다."
+                f"✅ 정보 수집 완료! 총 {result['collected_info'].get('question_count', 20)}개 질문을 생성합니다.",
+                state
             )
         else:
             return (
                 chat_history + [[user_message, bot_response]],
                 "",
                 False,  # 생성 버튼 비활성화
-                "💬 대화를 계속하세요..."
+                "💬 대화를 계속하세요...",
+                state
             )
     
-    def execute_question_generation():
+    def execute_question_generation(state):
         """실제 질문 생성 및 업로드"""
-        if not state.question_requirements:
+        if not state or not state.question_requirements:
             return "❌ 먼저 대화를 통해 요구사항을 수집하세요.", ""
         
         try:
@@ -511,6 +537,8 @@ def create_gradio_interface():
     
     # Gradio UI 구성
     with gr.Blocks(title="AI 모의 면접 시뮬레이터", theme=gr.themes.Soft()) as demo:
+        session_state = gr.State(None)
+        
         gr.Markdown("""
         # 🎤 AI 모의 면접 시뮬레이터
         ### Azure Custom Voice 기반 실전 면접 연습
@@ -575,23 +603,24 @@ def create_gradio_interface():
                         analyze_result = gr.Markdown()
                 
                 # 이벤트 핸들러
-                def send_and_update(msg, history):
-                    return chat_generate_questions(msg, history)
+                def send_and_update(msg, history, state):
+                    return chat_generate_questions(msg, history, state)
                 
                 gen_send_btn.click(
                     fn=send_and_update,
-                    inputs=[gen_input, gen_chatbot],
-                    outputs=[gen_chatbot, gen_input, gen_button, gen_status]
+                    inputs=[gen_input, gen_chatbot, session_state],
+                    outputs=[gen_chatbot, gen_input, gen_button, gen_status, session_state]
                 )
                 
                 gen_input.submit(
                     fn=send_and_update,
-                    inputs=[gen_input, gen_chatbot],
-                    outputs=[gen_chatbot, gen_input, gen_button, gen_status]
+                    inputs=[gen_input, gen_chatbot, session_state],
+                    outputs=[gen_chatbot, gen_input, gen_button, gen_status, session_state]
                 )
                 
                 gen_button.click(
                     fn=execute_question_generation,
+                    inputs=[session_state],
                     outputs=[gen_result, gen_preview]
                 )
                 
@@ -687,14 +716,14 @@ def create_gradio_interface():
                 # 이벤트 핸들러
                 start_btn.click(
                     fn=start_interview,
-                    inputs=[profile_input, difficulty_select, use_visualization],
-                    outputs=[question_display, question_audio, question_image]
+                    inputs=[profile_input, difficulty_select, use_visualization, session_state],
+                    outputs=[question_display, question_audio, question_image, session_state]
                 )
                 
                 submit_btn.click(
                     fn=process_answer,
-                    inputs=[answer_audio, answer_text],
-                    outputs=[evaluation_display, feedback_audio, score_display]
+                    inputs=[answer_audio, answer_text, session_state],
+                    outputs=[evaluation_display, feedback_audio, score_display, session_state]
                 )
     
     return demo
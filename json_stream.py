@@ -0,0 +1,239 @@
+"""
+스트리밍 JSON 파서
+- 토큰 스트림을 받으면서 지금까지의 부분 객체를 복원 (점수를 먼저 표시)
+- 코드 블록(```json) 감싸기, 응답 잘림(max_tokens) 등은 로컬에서 보정
+  → 한 글자 오류로 유료 응답 전체를 버리거나 재요청하지 않음
+"""
+
+import json
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+_WHITESPACE = " \t\r\n"
+
+
+class _Level:
+    """열린 컨테이너 하나의 파싱 상태"""
+
+    __slots__ = ("kind", "state", "member_start")
+
+    def __init__(self, kind: str):
+        self.kind = kind                          # '{' / '['
+        self.state = "key" if kind == "{" else "value"
+        self.member_start: Optional[int] = None   # 미완성 멤버를 잘라낼 위치
+
+
+class StreamingJSONParser:
+    """
+    증분 JSON 파서
+
+    feed()로 텍스트 조각을 넣고, 값 하나가 완성될 때마다 True를 반환.
+    snapshot()은 현재까지 도착한 완성된 값만으로 만든 부분 객체를 반환
+    (문자열 값은 도착한 만큼 포함).
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None       # 첫 '{' / '[' 위치
+        self._end: Optional[int] = None         # 최상위 값이 닫힌 위치
+        self._stack: List[_Level] = []
+        self._in_string = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._escape_start: Optional[int] = None
+        self._unicode_remaining = 0
+        self._token_start: Optional[int] = None  # 진행 중인 숫자/리터럴
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buffer)
+
+    def feed(self, chunk: str) -> bool:
+        """텍스트 조각 추가 → 새로 완성된 값이 있으면 True"""
+        if not chunk or self.complete:
+            return False
+
+        advanced = False
+        base = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+
+        for offset, ch in enumerate(chunk):
+            if self._scan(ch, base + offset):
+                advanced = True
+            if self.complete:
+                break
+        return advanced
+
+    def _value_done(self):
+        top = self._stack[-1] if self._stack else None
+        if top is not None:
+            top.state = "after"
+            top.member_start = None
+
+    def _scan(self, ch: str, pos: int) -> bool:
+        """문자 하나 처리 → 값이 완성되면 True"""
+        if self._start is None:
+            # 코드 블록 표시나 설명 문장 등 JSON 앞부분은 건너뜀
+            if ch in _CLOSERS:
+                self._start = pos
+                self._stack.append(_Level(ch))
+            return False
+
+        if self._in_string:
+            if self._unicode_remaining:
+                self._unicode_remaining -= 1
+                if not self._unicode_remaining:
+                    self._escape_start = None
+            elif self._escape_start is not None:
+                if ch == "u":
+                    self._unicode_remaining = 4
+                else:
+                    self._escape_start = None
+            elif ch == "\\":
+                self._escape_start = pos
+            elif ch == '"':
+                self._in_string = False
+                top = self._stack[-1]
+                if self._string_is_key:
+                    top.state = "colon"
+                    return False
+                self._value_done()
+                return True
+            return False
+
+        top = self._stack[-1]
+
+        # 진행 중인 숫자/리터럴 종료 확인
+        if self._token_start is not None:
+            if ch in _WHITESPACE or ch in ",]}":
+                self._token_start = None
+                self._value_done()
+                advanced = True
+            else:
+                return False
+        else:
+            advanced = False
+
+        if ch in _WHITESPACE:
+            return advanced
+
+        if ch == '"':
+            self._in_string = True
+            self._string_start = pos
+            self._string_is_key = top.kind == "{" and top.state == "key"
+            if top.member_start is None:
+                top.member_start = pos
+            return advanced
+
+        if ch in _CLOSERS:
+            if top.member_start is None:
+                top.member_start = pos
+            self._stack.append(_Level(ch))
+            return advanced
+
+        if ch in "}]":
+            self._stack.pop()
+            if not self._stack:
+                self._end = pos + 1
+            else:
+                self._value_done()
+            return True
+
+        if ch == ":":
+            top.state = "value"
+            return advanced
+
+        if ch == ",":
+            top.state = "key" if top.kind == "{" else "value"
+            top.member_start = None
+            return advanced
+
+        # 숫자 / true / false / null 시작
+        self._token_start = pos
+        if top.member_start is None:
+            top.member_start = pos
+        return advanced
+
+    def repaired_text(self) -> Optional[str]:
+        """현재 버퍼를 유효한 JSON 문자열로 보정 (JSON 시작 전이면 None)"""
+        if self._start is None:
+            return None
+
+        text = self.text
+        if self.complete:
+            return text[self._start:self._end]
+
+        cut = len(text)
+        suffix = ""
+        top = self._stack[-1]
+
+        if self._in_string:
+            if self._string_is_key:
+                cut = top.member_start
+            else:
+                # 값 문자열은 도착한 만큼 살려서 닫음 (미완성 이스케이프는 제거)
+                if self._escape_start is not None:
+                    cut = self._escape_start
+                suffix = '"'
+        elif self._token_start is not None or top.state in ("colon", "value") and top.member_start is not None:
+            # 미완성 숫자/리터럴, 값이 없는 키는 멤버째 제거
+            cut = top.member_start
+
+        head = text[self._start:cut]
+        if not suffix:
+            head = head.rstrip(_WHITESPACE)
+            if head.endswith(","):
+                head = head[:-1]
+
+        closers = "".join(_CLOSERS[level.kind] for level in reversed(self._stack))
+        return head + suffix + closers
+
+    def snapshot(self) -> Optional[Any]:
+        """현재까지의 부분 객체 (복원 불가 시 None)"""
+        repaired = self.repaired_text()
+        if repaired is None:
+            return None
+        try:
+            return json.loads(repaired)
+        except json.JSONDecodeError:
+            return None
+
+    def result(self) -> Any:
+        """최종 객체 (잘린 응답은 보정된 부분 객체)"""
+        repaired = self.repaired_text()
+        if repaired is None:
+            raise json.JSONDecodeError("JSON 시작을 찾을 수 없습니다", self.text, 0)
+        return json.loads(repaired)
+
+
+def loads_tolerant(text: str) -> Any:
+    """코드 블록/앞뒤 설명/잘림을 허용하는 json.loads"""
+    return loads_partial(text)[0]
+
+
+def loads_partial(text: str) -> Tuple[Any, bool]:
+    """loads_tolerant와 같되 (객체, 응답이 끝까지 닫혔는지) 반환 - 잘린 마지막 항목 판별용"""
+    try:
+        return json.loads(text), True
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    parser = StreamingJSONParser()
+    parser.feed(text or "")
+    return parser.result(), parser.complete
+
+
+def iter_partial_json(chunks: Iterable[str]) -> Iterator[Any]:
+    """텍스트 조각 스트림 → 값이 완성될 때마다 부분 객체 반환"""
+    parser = StreamingJSONParser()
+    for chunk in chunks:
+        if parser.feed(chunk):
+            partial = parser.snapshot()
+            if partial is not None:
+                yield partial
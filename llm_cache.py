@@ -0,0 +1,169 @@
+"""
+결정적(저온도) LLM 응답 캐시
+- 키: (배포, 메시지, temperature, response_format) 해시
+- 메모리 LRU + 디스크 2단계, TTL 만료
+- 적중/미스 횟수를 metrics에 기록
+
+LLM_CACHE_ENABLED=true 일 때만 동작 (opt-in)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    deployment: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    response_format: Optional[Dict] = None
+) -> str:
+    """요청 내용의 SHA-256 해시"""
+    payload = json.dumps(
+        {
+            "deployment": deployment,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format
+        },
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """메모리 LRU + 디스크 응답 캐시"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 86400,
+        cache_dir: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """
+        캐시 조회 (메모리 → 디스크 순, 디스크 적중 시 메모리로 승격)
+        allow_stale=True면 TTL이 지난 항목도 반환 (LLM 장애 시 대체 응답용)
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, content = entry
+                if allow_stale or not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    metrics.increment("llm_cache_hits", tier="memory")
+                    return content
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                if allow_stale or not self._expired(record["created_at"]):
+                    self._remember(key, record["created_at"], record["content"])
+                    metrics.increment("llm_cache_hits", tier="disk")
+                    return record["content"]
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"⚠️  디스크 캐시 읽기 실패: {e}")
+
+        metrics.increment("llm_cache_misses")
+        return None
+
+    def _remember(self, key: str, created_at: float, content: str):
+        with self._lock:
+            self._memory[key] = (created_at, content)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def set(self, key: str, content: str):
+        """캐시 저장 (디스크는 임시 파일 교체 방식)"""
+        created_at = time.time()
+        self._remember(key, created_at, content)
+
+        if not self.cache_dir:
+            return
+
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": created_at, "content": content}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️  디스크 캐시 쓰기 실패: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """환경 설정에 따른 공유 캐시 (비활성화 시 None)"""
+    global _cache
+
+    if os.getenv("LLM_CACHE_ENABLED", "false").lower() != "true":
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 512)),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL", 86400)),
+                    cache_dir=os.getenv("LLM_CACHE_DIR", ".cache/llm") or None
+                )
+                logger.info(f"✅ LLM 응답 캐시 활성화 (디스크: {_cache.cache_dir or '사용 안 함'})")
+    return _cache
+
+
+def is_cacheable(temperature: float) -> bool:
+    """캐시 대상 여부 (결정적으로 볼 수 있는 낮은 temperature만)"""
+    return temperature <= float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", 0.3))
+
+
+def cache_stats() -> Dict:
+    """캐시 적중률 조회"""
+    memory_hits = metrics.get_counter("llm_cache_hits", tier="memory")
+    disk_hits = metrics.get_counter("llm_cache_hits", tier="disk")
+    misses = metrics.get_counter("llm_cache_misses")
+    total = memory_hits + disk_hits + misses
+
+    return {
+        "memory_hits": memory_hits,
+        "disk_hits": disk_hits,
+        "misses": misses,
+        "hit_rate": round((memory_hits + disk_hits) / total, 4) if total else 0.0
+    }
@@ -0,0 +1,901 @@
+"""
+공유 LLM 클라이언트 레지스트리
+- 프로세스 전체에서 (Azure)OpenAI 동기/비동기 클라이언트를 재사용
+- httpx 커넥션 풀 + keep-alive 튜닝으로 TLS 재연결 비용 제거
+- 배포(deployment)별 엔드포인트/키/API 버전 설정
+- 모든 호출은 배포별 레이트 리미터(rate_limiter)를 거침
+- LLM_ROUTES 설정 시 작업(task)별로 가장 건강한 배포/리전으로 라우팅(llm_router)
+- 호출별 마감 시간, p95 기반 헤지 요청, 배포별 서킷 브레이커(circuit_breaker)로 꼬리 지연 제한
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+import metrics
+from circuit_breaker import CircuitOpenError, get_circuit_breaker
+from llm_router import failover_attempts, get_router, is_retryable_error
+from rate_limiter import PRIORITY_INTERACTIVE, current_priority, estimate_tokens, get_rate_limiter
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_VERSION = "2024-02-15-preview"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+HEDGE_POLL_SECONDS = 0.05
+
+_lock = threading.Lock()
+_sync_clients: Dict[tuple, object] = {}
+_async_clients: Dict[tuple, object] = {}
+_json_mode_unsupported = set()
+
+
+# ============================================
+# 설정
+# ============================================
+
+def _pool_limits() -> httpx.Limits:
+    """커넥션 풀 설정 (환경 변수로 조정 가능)"""
+    return httpx.Limits(
+        max_connections=int(os.getenv('LLM_MAX_CONNECTIONS', 100)),
+        max_keepalive_connections=int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', 20)),
+        keepalive_expiry=float(os.getenv('LLM_KEEPALIVE_EXPIRY', 60))
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.getenv('LLM_REQUEST_TIMEOUT', 60)),
+        connect=float(os.getenv('LLM_CONNECT_TIMEOUT', 10))
+    )
+
+
+def _default_endpoint_config() -> Dict:
+    """기본 엔드포인트: Azure OpenAI 우선, 없으면 일반 OpenAI"""
+    azure_endpoint = os.getenv('AZURE_OPENAI_ENDPOINT')
+    azure_key = os.getenv('AZURE_OPENAI_KEY')
+
+    if azure_endpoint and azure_key:
+        return {
+            'provider': 'azure',
+            'endpoint': azure_endpoint,
+            'api_key': azure_key,
+            'api_version': os.getenv('AZURE_OPENAI_API_VERSION', DEFAULT_API_VERSION)
+        }
+
+    openai_key = os.getenv('OPENAI_API_KEY')
+    if openai_key:
+        return {
+            'provider': 'openai',
+            'endpoint': None,
+            'api_key': openai_key,
+            'api_version': None
+        }
+
+    return {}
+
+
+def _deployment_overrides() -> Dict[str, Dict]:
+    """
+    배포별 설정
+
+    AZURE_OPENAI_DEPLOYMENT_CONFIG (JSON) 예시:
+        {"gpt-4o": {"endpoint": "https://eastus.openai.azure.com/",
+                    "api_key_env": "AZURE_OPENAI_KEY_EASTUS",
+                    "api_version": "2024-06-01"},
+         "gpt-4o-swc": {"deployment": "gpt-4o",
+                        "endpoint": "https://swedencentral.openai.azure.com/",
+                        "api_key_env": "AZURE_OPENAI_KEY_SWC"}}
+    "deployment" 지정 시 키는 라우팅 대상 이름이 되고 실제 배포명은 해당 값 사용
+    DALL-E 전용 엔드포인트(AZURE_DALLE_ENDPOINT)도 배포 설정으로 등록됨
+    """
+    overrides = {}
+
+    raw = os.getenv('AZURE_OPENAI_DEPLOYMENT_CONFIG')
+    if raw:
+        try:
+            overrides.update(json.loads(raw))
+        except json.JSONDecodeError as e:
+            logger.warning(f"⚠️  AZURE_OPENAI_DEPLOYMENT_CONFIG 파싱 실패: {e}")
+
+    dalle_endpoint = os.getenv('AZURE_DALLE_ENDPOINT')
+    dalle_key = os.getenv('AZURE_DALLE_API_KEY')
+    if dalle_endpoint and dalle_key:
+        dalle_deployment = os.getenv('AZURE_DALLE_DEPLOYMENT_NAME', 'dall-e-3')
+        overrides.setdefault(dalle_deployment, {
+            'endpoint': dalle_endpoint,
+            'api_key': dalle_key,
+            'api_version': DEFAULT_API_VERSION
+        })
+
+    return overrides
+
+
+def get_deployment_config(deployment: Optional[str] = None) -> Dict:
+    """배포 이름에 해당하는 엔드포인트 설정 반환 (없으면 기본 엔드포인트)"""
+    config = dict(_default_endpoint_config())
+
+    override = _deployment_overrides().get(deployment) if deployment else None
+    if override:
+        config['provider'] = override.get('provider', 'azure')
+        config['endpoint'] = override.get('endpoint', config.get('endpoint'))
+        if override.get('api_key_env'):
+            config['api_key'] = os.getenv(override['api_key_env'])
+        elif override.get('api_key'):
+            config['api_key'] = override['api_key']
+        config['api_version'] = override.get('api_version', config.get('api_version') or DEFAULT_API_VERSION)
+        config['deployment'] = override.get('deployment', deployment)
+
+    return config
+
+
+def resolve_deployment_name(deployment: Optional[str]) -> Optional[str]:
+    """라우팅 대상 이름 → API 호출 시 사용할 실제 배포명"""
+    return get_deployment_config(deployment).get('deployment', deployment)
+
+
+def get_provider() -> Optional[str]:
+    """기본 엔드포인트 종류 ('azure' / 'openai' / None)"""
+    return _default_endpoint_config().get('provider')
+
+
+# ============================================
+# 클라이언트 레지스트리
+# ============================================
+
+def _client_key(config: Dict) -> tuple:
+    return (config.get('provider'), config.get('endpoint'), config.get('api_version'), config.get('api_key'))
+
+
+def _build_client(config: Dict, use_async: bool):
+    from openai import AzureOpenAI, AsyncAzureOpenAI, OpenAI, AsyncOpenAI
+
+    if use_async:
+        http_client = httpx.AsyncClient(limits=_pool_limits(), timeout=_timeout())
+    else:
+        http_client = httpx.Client(limits=_pool_limits(), timeout=_timeout())
+
+    if config['provider'] == 'azure':
+        client_class = AsyncAzureOpenAI if use_async else AzureOpenAI
+        return client_class(
+            api_key=config['api_key'],
+            api_version=config['api_version'],
+            azure_endpoint=config['endpoint'],
+            http_client=http_client,
+            max_retries=int(os.getenv('LLM_MAX_RETRIES', 2))
+        )
+
+    client_class = AsyncOpenAI if use_async else OpenAI
+    return client_class(
+        api_key=config['api_key'],
+        http_client=http_client,
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', 2))
+    )
+
+
+def _get_or_create(registry: Dict, deployment: Optional[str], use_async: bool):
+    config = get_deployment_config(deployment)
+    if not config.get('api_key'):
+        raise ValueError("OpenAI API 키가 설정되지 않았습니다")
+
+    key = _client_key(config)
+    client = registry.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = registry.get(key)
+        if client is None:
+            client = _build_client(config, use_async)
+            registry[key] = client
+            logger.info(
+                f"✅ {'비동기' if use_async else '동기'} LLM 클라이언트 생성 "
+                f"({config['provider']}, {config.get('endpoint') or 'api.openai.com'})"
+            )
+    return client
+
+
+def get_client(deployment: Optional[str] = None):
+    """배포에 맞는 공유 동기 클라이언트 (AzureOpenAI / OpenAI)"""
+    return _get_or_create(_sync_clients, deployment, use_async=False)
+
+
+def get_async_client(deployment: Optional[str] = None):
+    """배포에 맞는 공유 비동기 클라이언트 (AsyncAzureOpenAI / AsyncOpenAI)"""
+    return _get_or_create(_async_clients, deployment, use_async=True)
+
+
+def close_clients():
+    """동기 클라이언트 커넥션 정리 (프로세스 종료 시)"""
+    with _lock:
+        for client in _sync_clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _sync_clients.clear()
+        _async_clients.clear()
+
+
+# ============================================
+# 호출 헬퍼
+# ============================================
+
+def _cache_lookup(messages, deployment, temperature, response_format, cache):
+    """캐시 조회 → (캐시 객체, 키, 적중 값)"""
+    if not cache:
+        return None, None, None
+
+    from llm_cache import get_response_cache, is_cacheable, make_cache_key
+    response_cache = get_response_cache()
+    if response_cache is None or not is_cacheable(temperature):
+        return None, None, None
+
+    cache_key = make_cache_key(deployment, messages, temperature, response_format)
+    return response_cache, cache_key, response_cache.get(cache_key)
+
+
+def _rate_limit(deployment, messages, max_tokens, priority):
+    """호출 전 한도 확보 → (리미터, 추정 비용)"""
+    limiter = get_rate_limiter(deployment)
+    if limiter is None:
+        return None, 0
+    cost = estimate_tokens(messages, max_tokens)
+    limiter.acquire(cost, priority)
+    return limiter, cost
+
+
+async def _arate_limit(deployment, messages, max_tokens, priority):
+    limiter = get_rate_limiter(deployment)
+    if limiter is None:
+        return None, 0
+    cost = estimate_tokens(messages, max_tokens)
+    await limiter.aacquire(cost, priority)
+    return limiter, cost
+
+
+def _settle(limiter, cost, response):
+    """실제 사용량(usage)으로 리미터 추정치 보정"""
+    if limiter is None:
+        return
+    usage = getattr(response, 'usage', None)
+    limiter.settle(cost, getattr(usage, 'total_tokens', None))
+
+
+async def _asettle(limiter, cost, response):
+    if limiter is None:
+        return
+    usage = getattr(response, 'usage', None)
+    await limiter.asettle(cost, getattr(usage, 'total_tokens', None))
+
+
+def _completion_kwargs(deployment, max_tokens, response_format) -> Dict:
+    kwargs = {}
+    if max_tokens is not None:
+        kwargs['max_tokens'] = max_tokens
+    if response_format is not None and deployment not in _json_mode_unsupported:
+        kwargs['response_format'] = response_format
+    return kwargs
+
+
+def _drop_unsupported_response_format(deployment, kwargs: Dict, error: Exception) -> bool:
+    """
+    구버전 모델(gpt-4 0613 등)이 response_format을 거부하면 이후 해당 배포는
+    일반 텍스트 모드로 호출 (JSON은 json_stream에서 관대하게 파싱)
+    """
+    if 'response_format' not in kwargs or 'response_format' not in str(error):
+        return False
+    kwargs.pop('response_format')
+    _json_mode_unsupported.add(deployment)
+    logger.warning(f"⚠️  {deployment} 배포가 JSON 모드를 지원하지 않아 일반 모드로 재시도합니다")
+    return True
+
+
+def _create(deployment, messages, temperature, kwargs: Dict, stream: bool = False):
+    create = get_client(deployment).chat.completions.create
+    model = resolve_deployment_name(deployment)
+    if stream:
+        kwargs = dict(kwargs, stream=True)
+    try:
+        return create(model=model, messages=messages, temperature=temperature, **kwargs)
+    except Exception as e:
+        if not _drop_unsupported_response_format(deployment, kwargs, e):
+            raise
+        return create(model=model, messages=messages, temperature=temperature, **kwargs)
+
+
+async def _acreate(deployment, messages, temperature, kwargs: Dict, stream: bool = False):
+    create = get_async_client(deployment).chat.completions.create
+    model = resolve_deployment_name(deployment)
+    if stream:
+        kwargs = dict(kwargs, stream=True)
+    try:
+        return await create(model=model, messages=messages, temperature=temperature, **kwargs)
+    except Exception as e:
+        if not _drop_unsupported_response_format(deployment, kwargs, e):
+            raise
+        return await create(model=model, messages=messages, temperature=temperature, **kwargs)
+
+
+class DeadlineExceeded(TimeoutError):
+    """호출 마감 시간 초과"""
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """동기 호출의 마감/헤지 처리를 위한 공유 스레드 풀"""
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('LLM_CALL_MAX_WORKERS', 64)),
+                    thread_name_prefix="llm-call"
+                )
+    return _hedge_executor
+
+
+def _deadline_at(deadline: Optional[float], priority: Optional[str]) -> Optional[float]:
+    """
+    호출 마감 시각 (monotonic)
+    미지정 시 interactive 호출만 LLM_CALL_DEADLINE 적용 (background는 요청별 타임아웃만)
+    """
+    if deadline is None:
+        if (priority or current_priority()) != PRIORITY_INTERACTIVE:
+            return None
+        deadline = float(os.getenv('LLM_CALL_DEADLINE', 30))
+    return time.monotonic() + deadline if deadline > 0 else None
+
+
+class _AttemptClock:
+    """
+    시도 하나의 마감 시각과 실제 요청 전송 시각
+    레이트 리미터 대기 등 로컬 대기는 대상 지연 시간/오류로 기록하지 않기 위해 구분
+    """
+
+    __slots__ = ("deadline_at", "sent_at", "recorded")
+
+    def __init__(self, deadline_at: Optional[float]):
+        self.deadline_at = deadline_at
+        self.sent_at: Optional[float] = None
+        self.recorded = False
+
+    def send(self, kwargs: Dict):
+        """
+        요청 직전 호출: 남은 시간을 요청 타임아웃으로 전달하고 전송 시각 기록
+        레이트 리미터 대기 후 이미 마감이 지났으면 호출하지 않음 (전송 전이므로 대상 오류로 기록되지 않음)
+        """
+        if self.deadline_at is not None:
+            remaining = self.deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("LLM 호출 마감 시간 초과 (요청 전 대기)")
+            kwargs['timeout'] = remaining
+        self.sent_at = time.monotonic()
+
+    def elapsed(self) -> Optional[float]:
+        """전송 후 경과 초 (아직 전송 전이면 None)"""
+        if self.sent_at is None:
+            return None
+        return time.monotonic() - self.sent_at
+
+
+def _hedge_delay(target: str, priority: Optional[str], task: Optional[str]) -> Optional[float]:
+    """
+    헤지(중복) 요청 대기 시간 = 대상/작업의 최근 p95 응답 시간 (전송 후 전체 응답까지)
+    interactive 호출만, 샘플이 충분할 때만 (LLM_HEDGE_ENABLED=false로 비활성화)
+    """
+    if os.getenv('LLM_HEDGE_ENABLED', 'true').lower() == 'false':
+        return None
+    if (priority or current_priority()) != PRIORITY_INTERACTIVE:
+        return None
+    labels = {"target": target, "task": task or "default"}
+    if metrics.sample_count("llm_target_latency_seconds", **labels) < int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20)):
+        return None
+    return metrics.percentile("llm_target_latency_seconds", 95, **labels)
+
+
+def _plan_targets(deployment: str, task: Optional[str]) -> List[str]:
+    """
+    호출 대상 순서 (라우터 미설정 시 deployment 하나)
+    회로가 열린 대상은 제외 → 모두 열려 있으면 즉시 CircuitOpenError
+    """
+    router = get_router()
+    if router is None:
+        candidates = [deployment]
+    else:
+        candidates = router.candidates(task, deployment)
+
+    targets = [t for t in candidates if not _breaker_open(t)]
+    if not targets:
+        metrics.increment("llm_fail_fast", task=task or "default")
+        raise CircuitOpenError(f"{', '.join(candidates)} 회로 열림")
+    return targets[:1 + (failover_attempts() if router else 0)]
+
+
+def _breaker_open(target: str) -> bool:
+    breaker = get_circuit_breaker(target)
+    return breaker is not None and breaker.is_open()
+
+
+def _begin_attempt(target: str, task: Optional[str], attempt: int):
+    breaker = get_circuit_breaker(target)
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(f"{target} 회로 열림")
+    router = get_router()
+    if router is not None:
+        router.record_route(task, target, attempt)
+
+
+def _record_outcome(
+    target: str,
+    task: Optional[str],
+    clock: _AttemptClock,
+    error: Optional[Exception] = None,
+    stream: bool = False
+):
+    """
+    대상별 지연 시간/오류를 라우터와 서킷 브레이커에 반영
+    요청을 보내기 전(레이트 리미터 대기, 전송 전 마감)의 실패는 서비스 문제가 아니므로 기록하지 않음
+    스트림은 연결(첫 응답 헤더)까지만 측정되므로 전체 응답 시간과 별도 지표로 기록
+    """
+    elapsed = clock.elapsed()
+    if elapsed is None or clock.recorded:
+        return
+    # 마감 초과로 먼저 기록된 요청이 나중에 끝나도 다시 기록하지 않음
+    clock.recorded = True
+
+    router = get_router()
+    breaker = get_circuit_breaker(target)
+
+    if error is None:
+        if stream:
+            metrics.observe("llm_target_connect_seconds", elapsed, target=target)
+        else:
+            metrics.observe("llm_target_latency_seconds", elapsed, target=target, task=task or "default")
+        if router is not None:
+            router.record_success(target, None if stream else elapsed)
+        if breaker is not None:
+            breaker.record_success()
+        return
+
+    if router is not None:
+        router.record_failure(target, error)
+    if breaker is not None:
+        # 요청 자체의 문제(400 등)는 배포 장애로 보지 않음
+        if is_retryable_error(error) or isinstance(error, (DeadlineExceeded, TimeoutError)):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+
+def _attempt(target: str, task: Optional[str], call: Callable, attempt: int, clock: _AttemptClock, stream: bool):
+    _begin_attempt(target, task, attempt)
+    try:
+        result = call(target, clock)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        _record_outcome(target, task, clock, e, stream)
+        raise
+    _record_outcome(target, task, clock, stream=stream)
+    return result
+
+
+async def _aattempt(target: str, task: Optional[str], call: Callable, attempt: int, clock: _AttemptClock, stream: bool):
+    _begin_attempt(target, task, attempt)
+    try:
+        result = await call(target, clock)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        _record_outcome(target, task, clock, e, stream)
+        raise
+    _record_outcome(target, task, clock, stream=stream)
+    return result
+
+
+def _wait_timeout(*moments: Optional[float]) -> Optional[float]:
+    """가장 가까운 시각(마감/헤지)까지 남은 초 (없으면 무기한)"""
+    moments = [m for m in moments if m is not None]
+    if not moments:
+        return None
+    return max(0.0, min(moments) - time.monotonic())
+
+
+def _should_fail_over(error: Exception) -> bool:
+    return is_retryable_error(error) or isinstance(error, CircuitOpenError)
+
+
+class _HedgeSchedule:
+    """
+    헤지 시각 = 첫 요청의 실제 전송 시각 + p95
+    첫 요청이 레이트 리미터에서 대기 중이면 전송될 때까지 짧은 간격으로 다시 확인
+    """
+
+    def __init__(self, clock: _AttemptClock, delay: Optional[float]):
+        self.clock = clock
+        self.delay = delay
+        self.fired = False
+
+    @property
+    def pending(self) -> bool:
+        return self.delay is not None and not self.fired
+
+    def next_check(self) -> Optional[float]:
+        """다음에 깨어나 확인할 시각 (헤지 예정이 없으면 None)"""
+        if not self.pending:
+            return None
+        if self.clock.sent_at is None:
+            return time.monotonic() + HEDGE_POLL_SECONDS
+        return self.clock.sent_at + self.delay
+
+    def due(self, now: float) -> bool:
+        return self.pending and self.clock.sent_at is not None and now >= self.clock.sent_at + self.delay
+
+
+def _expire_pending(pending: Dict, task: Optional[str], start: float):
+    """마감 시각 초과: 전송된 요청만 대상 오류로 기록하고 DeadlineExceeded"""
+    for target, clock, stream in pending.values():
+        _record_outcome(target, task, clock, DeadlineExceeded(), stream)
+    metrics.increment("llm_deadline_exceeded", task=task or "default")
+    raise DeadlineExceeded(f"LLM 호출 마감 시간 초과 ({time.monotonic() - start:.1f}초)")
+
+
+def _execute(
+    deployment: str,
+    task: Optional[str],
+    call: Callable,
+    priority: Optional[str] = None,
+    deadline: Optional[float] = None,
+    hedge: bool = True,
+    stream: bool = False
+):
+    """
+    call(대상, _AttemptClock) 실행 - call은 레이트 리미터 대기 후 요청 직전에 clock.send(kwargs) 호출
+    - 라우터가 고른 대상 순서대로, 재시도 가능한 오류는 다음 대상으로 전환
+    - 응답이 전송 후 대상의 p95보다 늦으면 다음 대상(없으면 같은 대상)에 헤지 요청 → 먼저 온 응답 채택
+    - 마감 시각까지 응답이 없으면 DeadlineExceeded
+    """
+    targets = _plan_targets(deployment, task)
+    deadline_at = _deadline_at(deadline, priority)
+    executor = _get_hedge_executor()
+    start = time.monotonic()
+
+    queue = list(targets)
+    pending: Dict = {}
+    attempt = 0
+    last_error: Optional[Exception] = None
+
+    def launch(target: str) -> _AttemptClock:
+        nonlocal attempt
+        clock = _AttemptClock(deadline_at)
+        future = executor.submit(contextvars.copy_context().run, _attempt, target, task, call, attempt, clock, stream)
+        pending[future] = (target, clock, stream)
+        attempt += 1
+        return clock
+
+    schedule = _HedgeSchedule(launch(queue.pop(0)), _hedge_delay(targets[0], priority, task) if hedge else None)
+    primary = next(iter(pending))
+
+    while pending:
+        done, _ = wait(list(pending), timeout=_wait_timeout(deadline_at, schedule.next_check()), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                last_error = e
+                if not _should_fail_over(e):
+                    raise
+                if queue:
+                    launch(queue.pop(0))
+                continue
+
+            if schedule.fired:
+                metrics.increment("llm_hedge_wins", task=task or "default", winner="primary" if future is primary else "hedge")
+            # 동기 호출은 중단할 수 없으므로 남은 요청의 결과는 버림
+            for other in pending:
+                other.cancel()
+            metrics.observe("llm_call_seconds", time.monotonic() - start, task=task or "default")
+            return result
+
+        now = time.monotonic()
+        if deadline_at is not None and now >= deadline_at and pending:
+            _expire_pending(pending, task, start)
+
+        if schedule.due(now):
+            schedule.fired = True
+            if pending:
+                metrics.increment("llm_hedged_requests", task=task or "default")
+                launch(queue.pop(0) if queue else targets[0])
+
+    raise last_error
+
+
+async def _aexecute(
+    deployment: str,
+    task: Optional[str],
+    call: Callable,
+    priority: Optional[str] = None,
+    deadline: Optional[float] = None,
+    hedge: bool = True,
+    stream: bool = False
+):
+    """_execute의 비동기 버전 (call은 코루틴 함수, 진 요청은 취소)"""
+    targets = _plan_targets(deployment, task)
+    deadline_at = _deadline_at(deadline, priority)
+    start = time.monotonic()
+
+    queue = list(targets)
+    pending: Dict = {}
+    attempt = 0
+    last_error: Optional[Exception] = None
+
+    def launch(target: str) -> _AttemptClock:
+        nonlocal attempt
+        clock = _AttemptClock(deadline_at)
+        task_ = asyncio.ensure_future(_aattempt(target, task, call, attempt, clock, stream))
+        pending[task_] = (target, clock, stream)
+        attempt += 1
+        return clock
+
+    schedule = _HedgeSchedule(launch(queue.pop(0)), _hedge_delay(targets[0], priority, task) if hedge else None)
+    primary = next(iter(pending))
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                list(pending), timeout=_wait_timeout(deadline_at, schedule.next_check()), return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for future in done:
+                pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    if not _should_fail_over(e):
+                        raise
+                    if queue:
+                        launch(queue.pop(0))
+                    continue
+
+                if schedule.fired:
+                    metrics.increment("llm_hedge_wins", task=task or "default", winner="primary" if future is primary else "hedge")
+                metrics.observe("llm_call_seconds", time.monotonic() - start, task=task or "default")
+                return result
+
+            now = time.monotonic()
+            if deadline_at is not None and now >= deadline_at and pending:
+                _expire_pending(pending, task, start)
+
+            if schedule.due(now):
+                schedule.fired = True
+                if pending:
+                    metrics.increment("llm_hedged_requests", task=task or "default")
+                    launch(queue.pop(0) if queue else targets[0])
+    finally:
+        for future in pending:
+            future.cancel()
+
+    raise last_error
+
+
+def _stale_fallback(response_cache, cache_key, error: Exception) -> Optional[str]:
+    """호출 실패/회로 열림 시 만료된 캐시 응답이라도 있으면 대신 반환"""
+    if not cache_key:
+        return None
+    content = response_cache.get(cache_key, allow_stale=True)
+    if content is not None:
+        metrics.increment("llm_fallbacks", source="stale_cache")
+        logger.warning(f"⚠️  LLM 호출 실패({type(error).__name__}), 캐시된 응답으로 대체")
+    return content
+
+
+def chat_completion(
+    messages: List[Dict[str, str]],
+    deployment: str,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Dict] = None,
+    cache: bool = False,
+    priority: Optional[str] = None,
+    task: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> str:
+    """
+    Chat Completion 호출 후 응답 텍스트 반환
+
+    cache=True이고 LLM_CACHE_ENABLED 설정 시, 낮은 temperature 호출은
+    응답 캐시(llm_cache)를 먼저 조회
+    priority: 'interactive' / 'background' (미지정 시 priority_scope 값)
+    task: 라우팅 작업 이름 ('question_generation', 'evaluation' 등, LLM_ROUTES 키)
+    deadline: 전체 호출 마감 초 (미지정 시 interactive는 LLM_CALL_DEADLINE)
+    호출 실패/회로 열림 시 만료된 캐시 응답이 있으면 대신 반환
+    """
+    response_cache, cache_key, cached = _cache_lookup(messages, deployment, temperature, response_format, cache)
+    if cached is not None:
+        return cached
+
+    def call(target, clock):
+        kwargs = _completion_kwargs(target, max_tokens, response_format)
+        limiter, cost = _rate_limit(target, messages, max_tokens, priority)
+        clock.send(kwargs)
+        response = _create(target, messages, temperature, kwargs)
+        _settle(limiter, cost, response)
+        return response
+
+    try:
+        response = _execute(deployment, task, call, priority, deadline)
+    except Exception as e:
+        stale = _stale_fallback(response_cache, cache_key, e)
+        if stale is None:
+            raise
+        return stale
+    content = response.choices[0].message.content
+
+    if cache_key and content:
+        response_cache.set(cache_key, content)
+    return content
+
+
+def chat_completion_stream(
+    messages: List[Dict[str, str]],
+    deployment: str,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Dict] = None,
+    cache: bool = False,
+    priority: Optional[str] = None,
+    task: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> Iterator[str]:
+    """
+    Chat Completion 스트리밍 호출 - 응답 텍스트 조각(delta)을 순서대로 반환
+
+    캐시 적중 시 전체 응답을 한 번에 반환하고, 미스 시 스트림 완료 후 저장
+    """
+    response_cache, cache_key, cached = _cache_lookup(messages, deployment, temperature, response_format, cache)
+    if cached is not None:
+        yield cached
+        return
+
+    def call(target, clock):
+        kwargs = _completion_kwargs(target, max_tokens, response_format)
+        # 스트림은 연결(첫 응답 헤더)까지를 대상 연결 시간으로 기록, 이후 조각 사이 대기도 남은 시간으로 제한
+        _rate_limit(target, messages, max_tokens, priority)
+        clock.send(kwargs)
+        return _create(target, messages, temperature, kwargs, stream=True)
+
+    try:
+        # 스트림은 헤지하지 않음 (두 스트림을 동시에 받아 버리는 비용이 큼)
+        stream = _execute(deployment, task, call, priority, deadline, hedge=False, stream=True)
+    except Exception as e:
+        stale = _stale_fallback(response_cache, cache_key, e)
+        if stale is None:
+            raise
+        yield stale
+        return
+
+    parts = []
+    for chunk in stream:
+        # Azure는 콘텐츠 필터 결과만 담긴 빈 choices 청크를 보낼 수 있음
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    if cache_key and parts:
+        response_cache.set(cache_key, "".join(parts))
+
+
+async def achat_completion(
+    messages: List[Dict[str, str]],
+    deployment: str,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Dict] = None,
+    cache: bool = False,
+    priority: Optional[str] = None,
+    task: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> str:
+    """chat_completion의 비동기 버전 (공유 비동기 클라이언트 사용)"""
+    response_cache, cache_key, cached = _cache_lookup(messages, deployment, temperature, response_format, cache)
+    if cached is not None:
+        return cached
+
+    async def call(target, clock):
+        kwargs = _completion_kwargs(target, max_tokens, response_format)
+        limiter, cost = await _arate_limit(target, messages, max_tokens, priority)
+        clock.send(kwargs)
+        response = await _acreate(target, messages, temperature, kwargs)
+        await _asettle(limiter, cost, response)
+        return response
+
+    try:
+        response = await _aexecute(deployment, task, call, priority, deadline)
+    except Exception as e:
+        stale = _stale_fallback(response_cache, cache_key, e)
+        if stale is None:
+            raise
+        return stale
+    content = response.choices[0].message.content
+
+    if cache_key and content:
+        response_cache.set(cache_key, content)
+    return content
+
+
+async def achat_completion_stream(
+    messages: List[Dict[str, str]],
+    deployment: str,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Dict] = None,
+    cache: bool = False,
+    priority: Optional[str] = None,
+    task: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> AsyncIterator[str]:
+    """chat_completion_stream의 비동기 버전"""
+    response_cache, cache_key, cached = _cache_lookup(messages, deployment, temperature, response_format, cache)
+    if cached is not None:
+        yield cached
+        return
+
+    async def call(target, clock):
+        kwargs = _completion_kwargs(target, max_tokens, response_format)
+        await _arate_limit(target, messages, max_tokens, priority)
+        clock.send(kwargs)
+        return await _acreate(target, messages, temperature, kwargs, stream=True)
+
+    try:
+        stream = await _aexecute(deployment, task, call, priority, deadline, hedge=False, stream=True)
+    except Exception as e:
+        stale = _stale_fallback(response_cache, cache_key, e)
+        if stale is None:
+            raise
+        yield stale
+        return
+
+    parts = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    if cache_key and parts:
+        response_cache.set(cache_key, "".join(parts))
+
+
+def create_embedding(
+    text: str,
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    priority: Optional[str] = None
+) -> List[float]:
+    """텍스트 임베딩 생성"""
+    limiter, cost = _rate_limit(model, [{"content": text}], 1, priority)
+    response = get_client(model).embeddings.create(
+        model=model,
+        input=text
+    )
+    _settle(limiter, cost, response)
+    return response.data[0].embedding
@@ -0,0 +1,215 @@
+"""
+다중 배포/리전 LLM 라우터
+- 대상(target)별 최근 지연 시간, 오류율, 429(쓰로틀링)를 추적
+- 작업(task)별 선호 대상 목록 중 현재 가장 건강한 대상으로 요청 전송
+  (예: 질문 생성은 경량 모델, 평가는 고성능 모델)
+- 429/5xx/연결 오류 시 다음 대상으로 전환
+- 라우팅 결정과 대상별 상태를 metrics에 기록
+
+LLM_ROUTES (JSON) 설정 시에만 동작. 예:
+    {"question_generation": ["gpt-4o-mini-eastus", "gpt-4o-mini-swc"],
+     "evaluation": ["gpt-4o-eastus", "gpt-4o-swc"],
+     "default": ["gpt-4o-eastus"]}
+대상 이름은 AZURE_OPENAI_DEPLOYMENT_CONFIG의 키 (엔드포인트/키/실제 배포명 지정)
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+TASK_QUESTION_GENERATION = "question_generation"
+TASK_EVALUATION = "evaluation"
+TASK_PROFILE_ANALYSIS = "profile_analysis"
+TASK_CHAT = "chat"
+
+HEALTH_WINDOW = 50
+DEFAULT_THROTTLE_COOLDOWN = 10.0
+PREFERENCE_WEIGHT = 0.25
+ERROR_WEIGHT = 5.0
+
+_RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "InternalServerError",
+    "ConnectError",
+    "ReadTimeout",
+    "TimeoutException",
+}
+
+
+def error_status(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+
+def is_throttle_error(error: Exception) -> bool:
+    return error_status(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """다른 대상으로 재시도할 만한 오류 (쓰로틀링, 서버 오류, 연결/타임아웃)"""
+    status = error_status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in _RETRYABLE_ERROR_NAMES
+
+
+def _retry_after(error: Exception) -> float:
+    """429 응답의 Retry-After 헤더 (없으면 기본 대기)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", DEFAULT_THROTTLE_COOLDOWN))
+    except (TypeError, ValueError):
+        return DEFAULT_THROTTLE_COOLDOWN
+
+
+class TargetHealth:
+    """대상 하나의 최근 상태 (지연 시간/결과 창, 쓰로틀링 해제 시각)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = deque(maxlen=HEALTH_WINDOW)
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: Optional[float], outcome: str, cooldown: float = 0.0):
+        with self._lock:
+            if latency is not None and outcome == "ok":
+                self.latencies.append(latency)
+            self.outcomes.append(outcome)
+            if cooldown:
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            values = list(self.latencies)
+        return float(np.percentile(values, q)) if values else None
+
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self.outcomes)
+        if not outcomes:
+            return 0.0
+        return sum(1 for o in outcomes if o != "ok") / len(outcomes)
+
+    def throttled(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def to_dict(self) -> Dict:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+            "throttled": self.throttled(),
+            "samples": len(self.outcomes)
+        }
+
+
+class LLMRouter:
+    """작업별 선호 대상 목록 + 대상별 상태 기반 라우팅"""
+
+    def __init__(self, routes: Dict[str, List[str]], explore_rate: float = 0.05):
+        self.routes = routes
+        self.explore_rate = explore_rate
+        self._health: Dict[str, TargetHealth] = {}
+        self._lock = threading.Lock()
+
+    def health(self, target: str) -> TargetHealth:
+        health = self._health.get(target)
+        if health is None:
+            with self._lock:
+                health = self._health.setdefault(target, TargetHealth(target))
+        return health
+
+    def _score(self, target: str, rank: int) -> float:
+        """낮을수록 좋음: 예상 지연 × 선호 순위 가중 × 오류율 가중 (측정값 없는 대상은 0 → 한 번 시도)"""
+        health = self.health(target)
+        latency = health.latency_percentile(50)
+        if latency is None:
+            return 0.0
+        return latency * (1 + PREFERENCE_WEIGHT * rank) * (1 + ERROR_WEIGHT * health.error_rate())
+
+    def candidates(self, task: Optional[str], fallback: str) -> List[str]:
+        """작업에 대한 대상 목록을 현재 상태 기준으로 정렬 (쓰로틀링 중인 대상은 뒤로)"""
+        targets = self.routes.get(task or "default") or self.routes.get("default") or [fallback]
+
+        scored = []
+        for rank, target in enumerate(targets):
+            score = self._score(target, rank)
+            metrics.set_gauge("llm_target_score", round(score, 4), target=target)
+            scored.append((self.health(target).throttled(), score, rank, target))
+        ordered = [target for _, _, _, target in sorted(scored)]
+
+        # 오래된 통계가 고정되지 않도록 가끔 차순위 대상을 먼저 시도
+        available = [t for t in ordered[1:] if not self.health(t).throttled()]
+        if available and random.random() < self.explore_rate:
+            probe = random.choice(available)
+            ordered.remove(probe)
+            ordered.insert(0, probe)
+            metrics.increment("llm_route_explorations", task=task or "default", target=probe)
+
+        return ordered
+
+    def record_route(self, task: Optional[str], target: str, attempt: int):
+        metrics.increment("llm_route_decisions", task=task or "default", target=target)
+        if attempt:
+            metrics.increment("llm_route_failovers", task=task or "default", target=target)
+            logger.warning(f"⚠️  LLM 라우팅 전환: {task or 'default'} → {target} ({attempt}번째 재시도)")
+
+    def record_success(self, target: str, latency: float):
+        self.health(target).record(latency, "ok")
+
+    def record_failure(self, target: str, error: Exception):
+        if is_throttle_error(error):
+            self.health(target).record(None, "throttled", cooldown=_retry_after(error))
+            metrics.increment("llm_target_errors", target=target, kind="throttled")
+        else:
+            self.health(target).record(None, "error")
+            metrics.increment("llm_target_errors", target=target, kind="error")
+
+    def snapshot(self) -> Dict:
+        return {name: health.to_dict() for name, health in self._health.items()}
+
+
+_router: Optional[LLMRouter] = None
+_router_loaded = False
+_router_lock = threading.Lock()
+
+
+def get_router() -> Optional[LLMRouter]:
+    """LLM_ROUTES 설정에 따른 공유 라우터 (미설정 시 None)"""
+    global _router, _router_loaded
+
+    if not _router_loaded:
+        with _router_lock:
+            if not _router_loaded:
+                raw = os.getenv("LLM_ROUTES")
+                if raw:
+                    try:
+                        routes = json.loads(raw)
+                        _router = LLMRouter(routes, float(os.getenv("LLM_ROUTER_EXPLORE_RATE", 0.05)))
+                        logger.info(f"✅ LLM 라우터 활성화: {', '.join(f'{k}={v}' for k, v in routes.items())}")
+                    except (json.JSONDecodeError, AttributeError) as e:
+                        logger.warning(f"⚠️  LLM_ROUTES 파싱 실패: {e}")
+                _router_loaded = True
+    return _router
+
+
+def failover_attempts() -> int:
+    """실패 시 다른 대상으로 재시도할 횟수"""
+    return int(os.getenv("LLM_ROUTER_FAILOVER", 1))
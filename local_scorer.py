@@ -0,0 +1,189 @@
+"""
+로컬 임시 채점
+- GPT 평가를 기다리는 동안 수 ms 안에 표시할 임시 점수 계산
+- GPT 호출 실패/시간 초과 시 대체 평가로도 사용
+- 특징: 참고 답변과의 표현 겹침, 지식 인덱스의 keywords / related_concepts 포함률,
+        답변 길이, 문장/연결어 구조, 실무·수치 언급
+- 결과는 GPT 평가와 같은 형식 (scores / total_score / strengths / improvements ...)
+"""
+
+import re
+import time
+from typing import Dict, List, Set, Tuple
+
+import metrics
+
+KEYWORD_PREFIX = "핵심 키워드:"
+CONCEPT_PREFIX = "관련 개념:"
+
+# GPT 평가 기준과 같은 배점
+MAX_SCORES = {
+    "accuracy": 30,
+    "depth": 25,
+    "structure": 20,
+    "application": 15,
+    "communication": 10
+}
+
+IDEAL_MIN_CHARS = 150
+IDEAL_MAX_CHARS = 800
+
+_CONNECTIVES = (
+    "첫째", "둘째", "셋째", "먼저", "다음으로", "마지막으로", "따라서", "그러므로", "왜냐하면",
+    "때문에", "반면", "하지만", "그러나", "또한", "결론적으로", "즉", "예를 들어", "예를 들면"
+)
+_APPLICATION_CUES = (
+    "실무", "현장", "공정", "장비", "수율", "불량", "양산", "실험", "측정", "경험", "프로젝트",
+    "최적화", "조건", "개선", "예를 들어", "실제로", "사례"
+)
+_NUMBER_WITH_UNIT = re.compile(r"\d+(?:\.\d+)?\s*(?:nm|㎚|um|μm|mm|°C|℃|도|K|Torr|torr|mTorr|Pa|%|W|V|eV|sccm|초|분)")
+_SENTENCE_SPLIT = re.compile(r"[.!?。？！]+|\n+")
+
+
+def _normalize(text: str) -> str:
+    """비교용 정규화 (소문자, 공백/기호 제거)"""
+    return re.sub(r"[\W_]+", "", text or "").lower()
+
+
+def _bigrams(text: str) -> Set[str]:
+    normalized = _normalize(text)
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+
+def parse_references(context: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    검색 컨텍스트 → (참고 답변 목록, 핵심 키워드, 관련 개념)
+    컨텍스트 형식: "Q: ...\\nA: ...\\n핵심 키워드: a, b\\n관련 개념: c, d" 블록의 나열
+    """
+    answers, keywords, concepts = [], [], []
+    current_answer = None
+
+    for line in (context or "").splitlines():
+        stripped = line.strip()
+        if stripped.startswith(KEYWORD_PREFIX):
+            keywords.extend(t.strip() for t in stripped[len(KEYWORD_PREFIX):].split(","))
+            current_answer = None
+        elif stripped.startswith(CONCEPT_PREFIX):
+            concepts.extend(t.strip() for t in stripped[len(CONCEPT_PREFIX):].split(","))
+            current_answer = None
+        elif stripped.startswith("A:"):
+            current_answer = [stripped[2:].strip()]
+            answers.append(current_answer)
+        elif stripped.startswith("Q:") or not stripped:
+            current_answer = None
+        elif current_answer is not None:
+            current_answer.append(stripped)
+
+    def unique(terms: List[str]) -> List[str]:
+        seen, result = set(), []
+        for term in terms:
+            key = _normalize(term)
+            if key and key not in seen:
+                seen.add(key)
+                result.append(term)
+        return result
+
+    return [" ".join(a) for a in answers], unique(keywords), unique(concepts)
+
+
+def _coverage(answer: str, terms: List[str]) -> Tuple[float, List[str], List[str]]:
+    """용어 포함률 → (비율, 포함된 용어, 누락된 용어)"""
+    if not terms:
+        return 0.0, [], []
+    normalized = _normalize(answer)
+    hit = [t for t in terms if _normalize(t) in normalized]
+    missed = [t for t in terms if t not in hit]
+    return len(hit) / len(terms), hit, missed
+
+
+def _reference_overlap(answer: str, references: List[str]) -> float:
+    """참고 답변의 글자 bigram 중 답변에 등장한 비율 (가장 가까운 참고 답변 기준)"""
+    answer_bigrams = _bigrams(answer)
+    best = 0.0
+    for reference in references:
+        reference_bigrams = _bigrams(reference)
+        if reference_bigrams:
+            best = max(best, len(answer_bigrams & reference_bigrams) / len(reference_bigrams))
+    return best
+
+
+def _length_factor(length: int) -> float:
+    if length >= IDEAL_MIN_CHARS:
+        # 지나치게 긴 답변은 약간 감점
+        return 1.0 if length <= IDEAL_MAX_CHARS else max(0.7, IDEAL_MAX_CHARS / length)
+    return length / IDEAL_MIN_CHARS
+
+
+def score_answer(question: str, answer: str, context: str) -> Dict:
+    """답변 로컬 채점 (GPT 평가와 같은 형식, provisional=True)"""
+    start = time.perf_counter()
+
+    references, keywords, concepts = parse_references(context)
+    answer = (answer or "").strip()
+    length = len(answer)
+
+    keyword_ratio, keyword_hit, keyword_missed = _coverage(answer, keywords)
+    concept_ratio, concept_hit, concept_missed = _coverage(answer, concepts)
+    overlap = min(1.0, _reference_overlap(answer, references) * 2)  # 표현이 달라도 절반 겹치면 만점
+
+    # 참고 자료에 키워드/개념이 없으면 참고 답변 겹침으로 대신함
+    if not keywords:
+        keyword_ratio = overlap
+    if not concepts:
+        concept_ratio = overlap
+
+    length_factor = _length_factor(length)
+    sentences = [s for s in _SENTENCE_SPLIT.split(answer) if len(s.strip()) >= 5]
+    connectives = [c for c in _CONNECTIVES if c in answer]
+    structure_ratio = min(1.0, 0.4 * min(len(sentences), 4) / 4 + 0.4 * min(len(connectives), 3) / 3 + 0.2 * length_factor)
+
+    application_cues = [c for c in _APPLICATION_CUES if c in answer]
+    numbers = _NUMBER_WITH_UNIT.findall(answer)
+    application_ratio = min(1.0, 0.6 * min(len(application_cues), 3) / 3 + 0.4 * min(len(numbers), 2) / 2)
+
+    avg_sentence = length / len(sentences) if sentences else length
+    readability = 1.0 if 15 <= avg_sentence <= 120 else 0.6
+    communication_ratio = 0.5 * length_factor + 0.5 * readability * (1.0 if sentences else 0.3)
+
+    ratios = {
+        "accuracy": 0.6 * keyword_ratio + 0.4 * overlap,
+        "depth": 0.6 * concept_ratio + 0.4 * length_factor,
+        "structure": structure_ratio,
+        "application": application_ratio,
+        "communication": communication_ratio
+    }
+    scores = {key: round(MAX_SCORES[key] * min(1.0, ratio)) for key, ratio in ratios.items()}
+
+    strengths, improvements = [], []
+    if keyword_hit:
+        strengths.append(f"핵심 키워드 사용: {', '.join(keyword_hit[:5])}")
+    if keyword_missed:
+        improvements.append(f"누락된 핵심 키워드: {', '.join(keyword_missed[:5])}")
+    if concept_hit:
+        strengths.append(f"관련 개념 언급: {', '.join(concept_hit[:3])}")
+    if length < IDEAL_MIN_CHARS:
+        improvements.append(f"답변이 짧습니다 ({length}자) - 원리와 근거를 더 설명해보세요")
+    if len(connectives) >= 2:
+        strengths.append("연결어를 사용한 논리적 구성")
+    elif len(sentences) >= 2:
+        improvements.append("'첫째/따라서/예를 들어' 등으로 논리 흐름을 드러내보세요")
+    if numbers:
+        strengths.append(f"구체적 수치 제시: {', '.join(numbers[:3])}")
+    if not application_cues:
+        improvements.append("실제 공정/장비/실험 사례와 연결해보세요")
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("local_score_seconds", elapsed)
+
+    return {
+        "scores": scores,
+        "total_score": sum(scores.values()),
+        "strengths": strengths or ["답변을 제출했습니다"],
+        "improvements": improvements,
+        "detailed_feedback": (
+            f"핵심 키워드 {len(keyword_hit)}/{len(keywords)}개, 관련 개념 {len(concept_hit)}/{len(concepts)}개를 포함한 "
+            f"{length}자 답변입니다. 키워드·구조 기반 자동 채점 결과로, 내용의 정확성은 확인하지 않았습니다."
+        ),
+        "recommended_topics": concept_missed[:3],
+        "provisional": True
+    }
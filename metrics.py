@@ -0,0 +1,114 @@
+"""
+프로세스 내 성능 지표 수집
+- 카운터 (호출 수, 캐시 적중 등)
+- 지연 시간 분포 (최근 N개 샘플 기준 p50/p95/p99)
+- snapshot()으로 현재 값을 조회하여 로그/UI에 노출
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+SAMPLE_WINDOW = 1000
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_samples: Dict[str, deque] = {}
+_gauges: Dict[str, float] = {}
+
+
+def _metric_key(name: str, labels: Dict) -> str:
+    """name{k=v,...} 형식의 지표 키"""
+    if not labels:
+        return name
+    label_text = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_text}}}"
+
+
+def increment(name: str, value: float = 1, **labels):
+    """카운터 증가"""
+    key = _metric_key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels):
+    """현재 값 기록 (큐 길이, 상태 등)"""
+    with _lock:
+        _gauges[_metric_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels):
+    """지연 시간 등 분포 샘플 기록"""
+    key = _metric_key(name, labels)
+    with _lock:
+        samples = _samples.get(key)
+        if samples is None:
+            samples = _samples[key] = deque(maxlen=SAMPLE_WINDOW)
+        samples.append(value)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """with 블록 실행 시간을 초 단위로 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def get_counter(name: str, **labels) -> float:
+    with _lock:
+        return _counters.get(_metric_key(name, labels), 0)
+
+
+def percentile(name: str, q: float, **labels) -> Optional[float]:
+    """최근 샘플의 백분위수 (샘플 없으면 None)"""
+    with _lock:
+        samples = _samples.get(_metric_key(name, labels))
+        values = list(samples) if samples else None
+    if not values:
+        return None
+    return float(np.percentile(values, q))
+
+
+def sample_count(name: str, **labels) -> int:
+    with _lock:
+        samples = _samples.get(_metric_key(name, labels))
+        return len(samples) if samples else 0
+
+
+def snapshot() -> Dict:
+    """전체 지표 조회"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        samples = {key: list(values) for key, values in _samples.items()}
+
+    distributions = {}
+    for key, values in samples.items():
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        distributions[key] = {
+            "count": len(values),
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(max(values)), 4)
+        }
+
+    return {"counters": counters, "gauges": gauges, "distributions": distributions}
+
+
+def reset():
+    """전체 지표 초기화"""
+    with _lock:
+        _counters.clear()
+        _samples.clear()
+        _gauges.clear()
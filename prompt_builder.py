@@ -0,0 +1,161 @@
+"""
+프롬프트 조립 및 토큰 예산 관리
+- 정적 지시문을 항상 첫 system 메시지로 배치 → 제공자 측 프롬프트 캐시(prefix) 적중
+- 요청마다 달라지는 내용(RAG 컨텍스트, 프로필 등)은 뒤쪽 메시지로 분리
+- 컨텍스트를 호출별 토큰 예산에 맞게 잘라 지연 시간/비용을 일정하게 유지
+- 호출별 보정 전/후 토큰 수를 로그와 metrics에 기록
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4
+MIN_PARTIAL_ITEM_TOKENS = 50
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """tiktoken 인코더 (미설치/다운로드 실패 시 None → 근사치 사용)"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.debug(f"tiktoken 사용 불가, 토큰 수 근사치 사용: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수 (tiktoken 없으면 ASCII 4자당 1토큰, 한글 등은 글자당 1토큰)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """토큰 수 상한에 맞게 텍스트 뒷부분 절단"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens]) + "…"
+
+    # 근사치 모드: 글자 단위로 누적
+    used = 0.0
+    for i, ch in enumerate(text):
+        used += 0.25 if ord(ch) < 128 else 1
+        if used > max_tokens:
+            return text[:i] + "…"
+    return text
+
+
+def fit_to_budget(items: List[str], budget: int) -> List[str]:
+    """
+    관련도 순으로 정렬된 항목을 예산 안에서 앞에서부터 채택
+    예산을 넘는 항목은 남은 예산이 충분하면 잘라서 포함
+    """
+    kept = []
+    remaining = budget
+    for item in items:
+        if not item:
+            continue
+        tokens = count_tokens(item)
+        if tokens <= remaining:
+            kept.append(item)
+            remaining -= tokens
+            continue
+        if remaining >= MIN_PARTIAL_ITEM_TOKENS:
+            kept.append(truncate_to_tokens(item, remaining))
+        break
+    return kept
+
+
+def default_context_budget() -> int:
+    return int(os.getenv("PROMPT_CONTEXT_BUDGET", 1500))
+
+
+class PromptBuilder:
+    """
+    [정적 지시문(system)] → [요청별 컨텍스트(system)] → [요청(user)] 순서로 메시지 구성
+
+    사용 예:
+        builder = PromptBuilder(INSTRUCTIONS, label="study_question")
+        builder.add_context("참고 자료", knowledge_texts)
+        messages = builder.build("질문을 1개 생성해주세요.")
+    """
+
+    def __init__(self, instructions: str, label: str = "prompt", context_budget: Optional[int] = None):
+        self.instructions = instructions.strip()
+        self.label = label
+        self.context_budget = default_context_budget() if context_budget is None else context_budget
+        self._sections: List[Tuple[str, List[str], Optional[int]]] = []
+        self._kept: Dict[str, List[str]] = {}
+
+    def add_context(self, title: str, items: List[str], budget: Optional[int] = None) -> "PromptBuilder":
+        """
+        컨텍스트 섹션 추가 (추가한 순서가 우선순위)
+        budget 지정 시 해당 섹션 전용 예산, 아니면 공용 예산에서 차감
+        """
+        self._sections.append((title, [item for item in items if item], budget))
+        return self
+
+    def context_text(self, title: str) -> str:
+        """build() 이후 예산에 맞게 잘린 섹션 본문"""
+        return "\n\n".join(self._kept.get(title, []))
+
+    def build(self, request: str) -> List[Dict[str, str]]:
+        remaining = self.context_budget
+        blocks = []
+        context_before = 0
+        context_after = 0
+
+        for title, items, section_budget in self._sections:
+            context_before += sum(count_tokens(item) for item in items)
+
+            budget = section_budget if section_budget is not None else remaining
+            kept = fit_to_budget(items, budget)
+            used = sum(count_tokens(item) for item in kept)
+            if section_budget is None:
+                remaining -= used
+
+            self._kept[title] = kept
+            context_after += used
+            if kept:
+                blocks.append(f"## {title}\n" + "\n\n".join(kept))
+
+        messages = [{"role": "system", "content": self.instructions}]
+        if blocks:
+            messages.append({"role": "system", "content": "\n\n".join(blocks)})
+        messages.append({"role": "user", "content": request})
+
+        total_after = count_message_tokens(messages)
+        total_before = total_after - context_after + context_before
+        logger.info(
+            f"🧮 프롬프트 토큰 [{self.label}]: {total_before} → {total_after} "
+            f"(컨텍스트 {context_before} → {context_after}, 예산 {self.context_budget})"
+        )
+        metrics.observe("prompt_tokens", total_after, label=self.label)
+        if total_before > total_after:
+            metrics.increment("prompt_tokens_trimmed", total_before - total_after, label=self.label)
+
+        return messages
@@ -4,51 +4,31 @@
 """
 
 import os
+import re
+import logging
 import json
+import math
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from openai import AzureOpenAI
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
 
+import metrics
+from json_stream import loads_partial
+from llm_clients import get_client, chat_completion, create_embedding
+from llm_router import TASK_CHAT, TASK_QUESTION_GENERATION
+from prompt_builder import count_message_tokens
+from rate_limiter import PRIORITY_BACKGROUND, priority_scope
 
-class QuestionGenerator:
-    """대화형 면접 질문 자동 생성기"""
-    
-    def __init__(self):
-        # Azure OpenAI 설정
-        self.openai_client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version="2024-02-15-preview",
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
-        self.gpt_deployment = os.getenv("GPT_DEPLOYMENT_NAME", "gpt-4")
-        
-        # Azure AI Search 설정
-        self.search_client = SearchClient(
-            endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
-            index_name=os.getenv("AZURE_SEARCH_INDEX", "interview-questions"),
-            credential=AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY"))
-        )
-        
-        self.conversation_history = []
-    
-    def chat_for_requirements(self, user_message: str) -> Dict:
-        """
-        사용자와 대화하면서 질문 생성 요구사항 수집
-        
-        Returns:
-            {
-                'response': '사용자에게 보여줄 응답',
-                'is_complete': 충분한 정보를 수집했는지,
-                'requirements': 수집된 요구사항 딕셔너리
-            }
-        """
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
-        
-        system_prompt = """
+logger = logging.getLogger(__name__)
+
+
+# 생성 질문 형식의 필드 (잘린 응답의 마지막 항목이 완성됐는지 판별)
+QUESTION_FIELDS = ("question", "category", "context", "sample_answer", "tags", "evaluation_criteria")
+
+
+REQUIREMENTS_INSTRUCTIONS = """
 당신은 면접 질문 큐레이터입니다. 사용자와 대화하면서 다음 정보를 수집하세요:
 
 1. **직무/분야**: 어떤 직무의 면접인가? (예: 백엔드 개발자, 데이터 사이언티스트, PM)
@@ -60,7 +40,7 @@ class QuestionGenerator:
 
 **대화 전략**:
 - 자연스럽게 필요한 정보를 물어보세요
-- 이미 제공된 정보는 다시 묻지 마세요
+- 이미 제공된 정보는 다시 묻지 마세요 ("지금까지 수집된 정보"에 있는 항목 포함)
 - 모든 정보가 수집되면 요약하고 확인을 요청하세요
 
 **응답 형식** (JSON):
@@ -78,57 +58,147 @@ class QuestionGenerator:
     "next_question": "다음에 물어볼 것 (is_complete가 false일 때)"
 }
 """
+
+
+class RequirementsConversation:
+    """
+    요구사항 수집 대화 상태 (사용자 세션별)
+    - 최근 대화만 토큰 예산(CHAT_HISTORY_TOKEN_BUDGET) 안에서 유지
+    - 밀려난 대화는 누적된 collected_info로 압축되어 프롬프트에 포함
+      → 대화가 길어져도 턴당 프롬프트 크기와 지연 시간이 일정
+    """
+    
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", 800))
+        self.turns: List[Dict[str, str]] = []
+        self.collected_info: Dict = {}
+        self.compacted_turns = 0
+    
+    def add(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+        self._compact()
+    
+    def merge_info(self, info: Optional[Dict]):
+        """이번 턴에서 확인된 값만 덮어쓰기 (null/빈 값은 기존 값 유지)"""
+        for key, value in (info or {}).items():
+            if value not in (None, "", [], {}):
+                self.collected_info[key] = value
+    
+    def _compact(self):
+        """예산을 넘는 오래된 턴 제거 (최신 사용자 메시지는 항상 유지, 첫 턴은 user로 시작)"""
+        while len(self.turns) > 1 and count_message_tokens(self.turns) > self.token_budget:
+            self.turns.pop(0)
+            self.compacted_turns += 1
+        while len(self.turns) > 1 and self.turns[0]["role"] != "user":
+            self.turns.pop(0)
+            self.compacted_turns += 1
+    
+    def build_messages(self, instructions: str) -> List[Dict[str, str]]:
+        """[정적 지시문] → [수집된 정보 요약] → [최근 대화] 순서로 메시지 구성"""
+        messages = [{"role": "system", "content": instructions.strip()}]
+        if self.collected_info or self.compacted_turns:
+            messages.append({
+                "role": "system",
+                "content": (
+                    f"## 지금까지 수집된 정보 (이전 대화 {self.compacted_turns}턴 요약)\n"
+                    + json.dumps(self.collected_info, ensure_ascii=False)
+                )
+            })
+        messages.extend(self.turns)
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                *self.conversation_history
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-        
-        result = json.loads(response.choices[0].message.content)
+        metrics.observe("requirements_prompt_tokens", count_message_tokens(messages))
+        return messages
+
+
+class QuestionGenerator:
+    """대화형 면접 질문 자동 생성기"""
+    
+    def __init__(self):
+        # Azure OpenAI 설정 (공유 클라이언트)
+        self.gpt_deployment = os.getenv("GPT_DEPLOYMENT_NAME", "gpt-4")
+        self.openai_client = get_client(self.gpt_deployment)
         
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": response.choices[0].message.content
-        })
+        # Azure AI Search 설정
+        self.search_client = SearchClient(
+            endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+            index_name=os.getenv("AZURE_SEARCH_INDEX", "interview-questions"),
+            credential=AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY"))
+        )
         
-        return result
+        # CLI/단일 사용자용 기본 대화 (웹 UI는 세션별 RequirementsConversation 전달)
+        self.conversation = RequirementsConversation()
     
-    def generate_questions(self, requirements: Dict) -> List[Dict]:
+    def reset_conversation(self):
+        """기본 대화 초기화"""
+        self.conversation = RequirementsConversation()
+    
+    def chat_for_requirements(
+        self,
+        user_message: str,
+        conversation: Optional["RequirementsConversation"] = None
+    ) -> Dict:
         """
-        수집된 요구사항을 바탕으로 면접 질문 생성
+        사용자와 대화하면서 질문 생성 요구사항 수집
         
         Args:
-            requirements: chat_for_requirements에서 수집된 정보
+            user_message: 사용자 메시지
+            conversation: 사용자 세션별 대화 상태 (없으면 기본 대화 사용)
         
         Returns:
-            생성된 질문 리스트
+            {
+                'response': '사용자에게 보여줄 응답',
+                'is_complete': 충분한 정보를 수집했는지,
+                'collected_info': 지금까지 누적된 요구사항 딕셔너리
+            }
         """
-        position = requirements.get('position', '개발자')
-        experience = requirements.get('experience_level', '주니어')
-        tech_stack = requirements.get('tech_stack', '일반')
-        count = requirements.get('question_count', 20)
-        difficulty_ratio = requirements.get('difficulty_ratio', {"easy": 3, "medium": 5, "hard": 2})
-        focus_areas = requirements.get('focus_areas', ['기술역량', '소프트스킬'])
+        conversation = conversation or self.conversation
+        # 호출/파싱이 실패하면 사용자 턴을 되돌림 (compact로 밀려난 턴 포함 → 재시도 시 중복 없음)
+        saved_turns, saved_compacted = list(conversation.turns), conversation.compacted_turns
+        conversation.add("user", user_message)
         
-        # 난이도별 질문 개수 계산
-        total_ratio = sum(difficulty_ratio.values())
-        easy_count = int(count * difficulty_ratio['easy'] / total_ratio)
-        medium_count = int(count * difficulty_ratio['medium'] / total_ratio)
-        hard_count = count - easy_count - medium_count
+        try:
+            content = chat_completion(
+                messages=conversation.build_messages(REQUIREMENTS_INSTRUCTIONS),
+                deployment=self.gpt_deployment,
+                temperature=0.7,
+                response_format={"type": "json_object"},
+                task=TASK_CHAT
+            )
+            result = json.loads(content)
+        except Exception:
+            conversation.turns, conversation.compacted_turns = saved_turns, saved_compacted
+            raise
         
-        all_questions = []
+        # 전체 JSON 대신 사용자에게 보인 응답만 기록 (수집 정보는 collected_info로 별도 유지)
+        conversation.merge_info(result.get('collected_info'))
+        conversation.add("assistant", result.get('response') or content)
+        result['collected_info'] = dict(conversation.collected_info)
         
-        # 각 난이도별로 질문 생성
-        for difficulty, num in [('하', easy_count), ('중', medium_count), ('상', hard_count)]:
-            if num == 0:
-                continue
-                
-            prompt = f"""
+        return result
+    
+    def _generate_question_batch(
+        self,
+        num: int,
+        difficulty: str,
+        position: str,
+        experience: str,
+        tech_stack: str,
+        focus_areas: List[str],
+        batch_index: int = 0,
+        batch_total: int = 1
+    ) -> List[Dict]:
+        """난이도 하나에 대한 질문 묶음 생성 (하위 요청 1건)"""
+        # 같은 난이도를 여러 요청으로 나눌 때는 배치마다 중점 영역을 달리해 중복 감소
+        batch_guide = ""
+        if batch_total > 1:
+            batch_focus = focus_areas[batch_index % len(focus_areas)] if focus_areas else "전체"
+            batch_guide = f"""
+**배치 정보**: {batch_total}개 중 {batch_index + 1}번째 묶음
+- 이번 묶음은 '{batch_focus}' 영역을 우선적으로 다루세요
+- 다른 묶음과 겹치지 않도록 서로 다른 주제/상황을 선택하세요
+"""
+        
+        prompt = f"""
 다음 조건에 맞는 면접 질문 {num}개를 생성하세요:
 
 **면접 대상**:
@@ -137,7 +207,7 @@ class QuestionGenerator:
 - 기술 스택: {tech_stack}
 - 난이도: {difficulty}
 - 중점 영역: {', '.join(focus_areas)}
-
+{batch_guide}
 **질문 생성 가이드라인**:
 1. 실제 면접에서 나올 법한 현실적인 질문
 2. 지원자의 경력 수준에 맞는 깊이
@@ -162,38 +232,161 @@ JSON 배열로 반환:
   }}
 ]
 """
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_deployment,
-                messages=[
-                    {"role": "system", "content": "당신은 전문 면접 설계자입니다. 현실적이고 평가 가능한 면접 질문을 만듭니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                response_format={"type": "json_object"}
+        
+        content = chat_completion(
+            messages=[
+                {"role": "system", "content": "당신은 전문 면접 설계자입니다. 현실적이고 평가 가능한 면접 질문을 만듭니다."},
+                {"role": "user", "content": prompt}
+            ],
+            deployment=self.gpt_deployment,
+            temperature=0.8,
+            response_format={"type": "json_object"},
+            task=TASK_QUESTION_GENERATION
+        )
+        
+        # 응답이 잘려도 완성된 질문까지는 살림 (필드가 빠진 잘린 마지막 항목은 제외)
+        result, complete = loads_partial(content)
+        if isinstance(result, dict):
+            questions = result.get('questions', [])
+        else:
+            questions = result if isinstance(result, list) else []
+        if not isinstance(questions, list):
+            questions = []
+        if not complete and questions:
+            last = questions[-1]
+            if not isinstance(last, dict) or any(field not in last for field in QUESTION_FIELDS):
+                questions = questions[:-1]
+        questions = [q for q in questions if isinstance(q, dict) and q.get('question')][:num]
+        
+        # 난이도 추가
+        for q in questions:
+            q['difficulty'] = difficulty
+            q['position'] = position
+            q['experience_level'] = experience
+            q['tech_stack'] = tech_stack
+        
+        return questions
+    
+    @staticmethod
+    def _deduplicate_questions(questions: List[Dict]) -> List[Dict]:
+        """공백/문장부호/대소문자를 무시한 질문 문장 기준 중복 제거 (먼저 나온 것 유지)"""
+        seen = set()
+        unique = []
+        for q in questions:
+            key = re.sub(r'[\W_]+', '', q['question']).lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(q)
+        return unique
+    
+    def _run_question_batches(
+        self,
+        batches: List[tuple],
+        indices: List[int],
+        results: List[Optional[List[Dict]]],
+        max_workers: int,
+        position: str,
+        experience: str,
+        tech_stack: str,
+        focus_areas: List[str]
+    ) -> tuple:
+        """하위 요청 indices를 동시에 실행해 results에 채우고 (실패한 인덱스, 오류) 반환"""
+        failed, errors = [], []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(indices))) as executor:
+            # 우선순위(priority_scope) 등 컨텍스트 변수를 작업 스레드로 전달
+            futures = {
+                i: executor.submit(
+                    contextvars.copy_context().run,
+                    self._generate_question_batch,
+                    batches[i][0], batches[i][1], position, experience, tech_stack, focus_areas,
+                    batches[i][2], batches[i][3]
+                )
+                for i in indices
+            }
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️  질문 배치 생성 실패: {e}")
+                    failed.append(i)
+                    errors.append(e)
+        return failed, errors
+    
+    @priority_scope(PRIORITY_BACKGROUND)
+    def generate_questions(self, requirements: Dict) -> List[Dict]:
+        """
+        수집된 요구사항을 바탕으로 면접 질문 생성 (LLM 호출은 background 우선순위)
+        
+        난이도별 요청을 최대 QUESTION_BATCH_SIZE개 단위의 하위 요청으로 나눠
+        동시에 실행한 뒤 병합/중복 제거
+        
+        Args:
+            requirements: chat_for_requirements에서 수집된 정보
+        
+        Returns:
+            생성된 질문 리스트
+        """
+        position = requirements.get('position', '개발자')
+        experience = requirements.get('experience_level', '주니어')
+        tech_stack = requirements.get('tech_stack', '일반')
+        count = requirements.get('question_count', 20)
+        difficulty_ratio = requirements.get('difficulty_ratio', {"easy": 3, "medium": 5, "hard": 2})
+        focus_areas = requirements.get('focus_areas', ['기술역량', '소프트스킬'])
+        
+        # 난이도별 질문 개수 계산
+        total_ratio = sum(difficulty_ratio.values())
+        easy_count = int(count * difficulty_ratio['easy'] / total_ratio)
+        medium_count = int(count * difficulty_ratio['medium'] / total_ratio)
+        hard_count = count - easy_count - medium_count
+        
+        # 하위 요청 구성 (난이도 × 배치)
+        batch_size = max(1, int(os.getenv("QUESTION_BATCH_SIZE", 8)))
+        batches = []
+        for difficulty, num in [('하', easy_count), ('중', medium_count), ('상', hard_count)]:
+            batch_total = math.ceil(num / batch_size)
+            for batch_index in range(batch_total):
+                size = min(batch_size, num - batch_index * batch_size)
+                batches.append((size, difficulty, batch_index, batch_total))
+        
+        if not batches:
+            return []
+        
+        max_workers = min(len(batches), int(os.getenv("QUESTION_GEN_MAX_WORKERS", 6)))
+        logger.info(f"질문 {count}개 생성: {len(batches)}개 하위 요청 (동시 {max_workers}개)")
+        
+        results = [None] * len(batches)
+        pending = list(range(len(batches)))
+        errors = []
+        # 실패한 하위 요청은 한 번만 다시 시도 (일시적 오류로 질문 수가 줄지 않도록)
+        for attempt in range(2):
+            if attempt:
+                logger.info(f"🔁 실패한 하위 요청 {len(pending)}개 재시도")
+            pending, errors = self._run_question_batches(
+                batches, pending, results, max_workers,
+                position, experience, tech_stack, focus_areas
             )
-            
-            result = json.loads(response.choices[0].message.content)
-            questions = result if isinstance(result, list) else result.get('questions', [])
-            
-            # 난이도 추가
-            for q in questions:
-                q['difficulty'] = difficulty
-                q['position'] = position
-                q['experience_level'] = experience
-                q['tech_stack'] = tech_stack
-            
-            all_questions.extend(questions)
+            if not pending:
+                break
+        
+        if len(pending) == len(batches):
+            raise errors[0]
+        
+        # 병합 (난이도/배치 순서 유지) 및 중복 제거
+        merged = [q for questions in results if questions for q in questions]
+        all_questions = self._deduplicate_questions(merged)
+        
+        if len(all_questions) < len(merged):
+            logger.info(f"중복 질문 {len(merged) - len(all_questions)}개 제거")
+        if len(all_questions) < count:
+            metrics.increment("question_generation_shortfall", count - len(all_questions))
+            logger.warning(f"⚠️  요청 {count}개 중 {len(all_questions)}개 생성")
         
         return all_questions
     
     def get_embedding(self, text: str) -> List[float]:
         """텍스트 임베딩 생성"""
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        return create_embedding(text)
     
     def upload_to_search(self, questions: List[Dict]) -> Dict:
         """
@@ -330,17 +523,18 @@ JSON 배열로 반환:
 ]
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        content = chat_completion(
             messages=[
                 {"role": "system", "content": "당신은 문서 분석 및 면접 질문 생성 전문가입니다."},
                 {"role": "user", "content": prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.8,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            task=TASK_QUESTION_GENERATION
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(content)
         questions = result if isinstance(result, list) else result.get('questions', [])
         
         return questions
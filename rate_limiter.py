@@ -0,0 +1,316 @@
+"""
+LLM 호출 토큰 버킷 레이트 리미터
+- 배포(deployment)별 TPM/RPM 버킷, 요청 전 토큰 비용 추정
+- 우선순위: interactive(학습/면접 응답) > background(자료 처리, 대량 생성)
+  background는 예약분(LLM_RATE_LIMIT_INTERACTIVE_RESERVE)을 남겨두고만 소비
+- LLM_RATE_LIMIT_STATE_DIR 설정 시 파일 잠금으로 여러 프로세스(워커) 간 버킷 공유
+- 대기 시간/거절 횟수를 metrics에 기록
+
+LLM_RATE_LIMIT_TPM 또는 LLM_RATE_LIMIT_RPM 설정 시에만 동작
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import metrics
+from prompt_builder import count_message_tokens
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+DEFAULT_COMPLETION_TOKENS = 500
+MAX_SLEEP_SECONDS = 1.0
+
+_current_priority = contextvars.ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+class RateLimitExceeded(Exception):
+    """최대 대기 시간 안에 호출 한도를 확보하지 못함"""
+
+
+# ============================================
+# 우선순위 / 비용 추정
+# ============================================
+
+@contextmanager
+def priority_scope(priority: str):
+    """
+    블록(또는 데코레이터로 감싼 함수) 안의 LLM 호출 우선순위 지정
+
+    예: @priority_scope(PRIORITY_BACKGROUND)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> int:
+    """요청 1건의 예상 토큰 비용 (프롬프트 + 최대 응답 길이)"""
+    return count_message_tokens(messages) + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+# ============================================
+# 버킷 상태 저장소
+# ============================================
+
+class _MemoryState:
+    """프로세스 내 버킷 상태"""
+
+    def __init__(self, tokens: float, requests: float):
+        self._state = {"tokens": tokens, "requests": requests, "updated": time.monotonic()}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            yield self._state
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic()
+
+
+class _FileState:
+    """파일 잠금 기반 공유 버킷 상태 (여러 프로세스 간)"""
+
+    def __init__(self, path: str, tokens: float, requests: float):
+        self.path = path
+        self._initial = {"tokens": tokens, "requests": requests}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @contextmanager
+    def locked(self):
+        with self._lock, open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else None
+                except json.JSONDecodeError:
+                    state = None
+                if state is None:
+                    state = dict(self._initial, updated=self.now())
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def now() -> float:
+        # 프로세스 간 비교가 가능해야 하므로 벽시계 사용
+        return time.time()
+
+
+# ============================================
+# 토큰 버킷
+# ============================================
+
+class TokenBucketLimiter:
+    """분당 토큰(TPM) + 분당 요청(RPM) 이중 토큰 버킷"""
+
+    def __init__(
+        self,
+        name: str,
+        tokens_per_minute: Optional[float] = None,
+        requests_per_minute: Optional[float] = None,
+        interactive_reserve: float = 0.2,
+        state_dir: Optional[str] = None
+    ):
+        self.name = name
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.interactive_reserve = interactive_reserve
+
+        initial_tokens = tokens_per_minute or 0
+        initial_requests = requests_per_minute or 0
+        if state_dir and fcntl is not None:
+            safe_name = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in name)
+            self._state = _FileState(os.path.join(state_dir, f"{safe_name}.json"), initial_tokens, initial_requests)
+        else:
+            if state_dir:
+                logger.warning("⚠️  fcntl을 사용할 수 없어 프로세스 내 레이트 리미터로 동작합니다")
+            self._state = _MemoryState(initial_tokens, initial_requests)
+
+        self._waiting_interactive = 0
+        self._waiting_lock = threading.Lock()
+
+    def _refill(self, state: Dict, now: float):
+        elapsed = max(0.0, now - state["updated"])
+        if self.tokens_per_minute:
+            state["tokens"] = min(self.tokens_per_minute, state["tokens"] + elapsed * self.tokens_per_minute / 60)
+        if self.requests_per_minute:
+            state["requests"] = min(self.requests_per_minute, state["requests"] + elapsed * self.requests_per_minute / 60)
+        state["updated"] = now
+
+    def _try_take(self, cost: int, priority: str) -> float:
+        """버킷에서 비용 차감 시도 → 0이면 성공, 아니면 재시도까지 대기할 초"""
+        background = priority == PRIORITY_BACKGROUND
+
+        # 대기 중인 interactive 요청이 있으면 background는 양보
+        if background and self._waiting_interactive:
+            return 0.05
+
+        reserve = self.interactive_reserve if background else 0.0
+
+        with self._state.locked() as state:
+            self._refill(state, self._state.now())
+
+            waits = []
+            if self.tokens_per_minute:
+                # 버킷보다 큰 요청도 가득 찼을 때는 통과하도록 상한 적용
+                need = min(cost + self.tokens_per_minute * reserve, self.tokens_per_minute)
+                if state["tokens"] < need:
+                    waits.append((need - state["tokens"]) * 60 / self.tokens_per_minute)
+            if self.requests_per_minute:
+                need = 1 + self.requests_per_minute * reserve
+                if state["requests"] < need:
+                    waits.append((need - state["requests"]) * 60 / self.requests_per_minute)
+
+            if waits:
+                return max(waits)
+
+            if self.tokens_per_minute:
+                state["tokens"] -= cost
+            if self.requests_per_minute:
+                state["requests"] -= 1
+
+            metrics.set_gauge("llm_rate_limit_available_tokens", round(state["tokens"]), deployment=self.name)
+            return 0.0
+
+    async def _atry_take(self, cost: int, priority: str) -> float:
+        """_try_take의 비동기 버전 (공유 파일 잠금은 블로킹이므로 이벤트 루프 밖에서 시도)"""
+        if isinstance(self._state, _FileState):
+            return await asyncio.to_thread(self._try_take, cost, priority)
+        return self._try_take(cost, priority)
+
+    def _max_wait(self, priority: str) -> float:
+        if priority == PRIORITY_BACKGROUND:
+            return float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_BACKGROUND", 600))
+        return float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_INTERACTIVE", 30))
+
+    @contextmanager
+    def _waiting(self, priority: str):
+        if priority != PRIORITY_INTERACTIVE:
+            yield
+            return
+        with self._waiting_lock:
+            self._waiting_interactive += 1
+        try:
+            yield
+        finally:
+            with self._waiting_lock:
+                self._waiting_interactive -= 1
+
+    def _reject(self, priority: str, waited: float):
+        metrics.increment("llm_rate_limit_rejections", deployment=self.name, priority=priority)
+        logger.warning(f"⚠️  LLM 호출 한도 초과 ({self.name}, {priority}, {waited:.1f}초 대기)")
+        raise RateLimitExceeded(f"{self.name} 호출 한도 초과 ({waited:.1f}초 대기)")
+
+    def acquire(self, cost: int, priority: Optional[str] = None) -> float:
+        """비용만큼 한도를 확보할 때까지 대기 → 대기한 초 (최대 대기 초과 시 RateLimitExceeded)"""
+        priority = priority or current_priority()
+        max_wait = self._max_wait(priority)
+        start = time.monotonic()
+
+        wait = self._try_take(cost, priority)
+        if wait:
+            with self._waiting(priority):
+                while wait:
+                    waited = time.monotonic() - start
+                    if waited + wait > max_wait:
+                        self._reject(priority, waited)
+                    time.sleep(min(wait, MAX_SLEEP_SECONDS))
+                    wait = self._try_take(cost, priority)
+
+        waited = time.monotonic() - start
+        metrics.observe("llm_rate_limit_wait_seconds", waited, priority=priority)
+        return waited
+
+    async def aacquire(self, cost: int, priority: Optional[str] = None) -> float:
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않고 대기)"""
+        priority = priority or current_priority()
+        max_wait = self._max_wait(priority)
+        start = time.monotonic()
+
+        wait = await self._atry_take(cost, priority)
+        if wait:
+            with self._waiting(priority):
+                while wait:
+                    waited = time.monotonic() - start
+                    if waited + wait > max_wait:
+                        self._reject(priority, waited)
+                    await asyncio.sleep(min(wait, MAX_SLEEP_SECONDS))
+                    wait = await self._atry_take(cost, priority)
+
+        waited = time.monotonic() - start
+        metrics.observe("llm_rate_limit_wait_seconds", waited, priority=priority)
+        return waited
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """응답의 실제 사용량으로 추정치 보정 (남은 만큼 반환, 초과분 추가 차감)"""
+        if not actual or not self.tokens_per_minute:
+            return
+        with self._state.locked() as state:
+            state["tokens"] = min(self.tokens_per_minute, state["tokens"] + estimated - actual)
+
+    async def asettle(self, estimated: int, actual: Optional[int]):
+        """settle의 비동기 버전"""
+        if isinstance(self._state, _FileState):
+            await asyncio.to_thread(self.settle, estimated, actual)
+        else:
+            self.settle(estimated, actual)
+
+
+_limiters: Dict[str, TokenBucketLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(deployment: Optional[str]) -> Optional[TokenBucketLimiter]:
+    """배포별 공유 리미터 (한도 미설정 시 None)"""
+    tpm = os.getenv("LLM_RATE_LIMIT_TPM")
+    rpm = os.getenv("LLM_RATE_LIMIT_RPM")
+    if not tpm and not rpm:
+        return None
+
+    name = deployment or "default"
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                limiter = _limiters[name] = TokenBucketLimiter(
+                    name,
+                    tokens_per_minute=float(tpm) if tpm else None,
+                    requests_per_minute=float(rpm) if rpm else None,
+                    interactive_reserve=float(os.getenv("LLM_RATE_LIMIT_INTERACTIVE_RESERVE", 0.2)),
+                    state_dir=os.getenv("LLM_RATE_LIMIT_STATE_DIR") or None
+                )
+                logger.info(f"✅ LLM 레이트 리미터 활성화 ({name}: TPM={tpm or '-'}, RPM={rpm or '-'})")
+    return limiter
@@ -6,22 +6,22 @@
 import os
 import json
 import re
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from openai import AzureOpenAI
 import PyPDF2
 from docx import Document
 
+from llm_clients import get_client, chat_completion
+from llm_router import TASK_PROFILE_ANALYSIS, TASK_QUESTION_GENERATION
+
 
 class ResumeAnalyzer:
     def __init__(self):
-        self.openai_client = AzureOpenAI(
-            # 현재 Azure 설정과 일치
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version="2024-02-15-preview",
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
         # AZURE_OPENAI_DEPLOYMENT를 사용하도록 수정
         self.gpt_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
+        # 공유 클라이언트 (프로세스 전체에서 커넥션 재사용)
+        self.openai_client = get_client(self.gpt_deployment)
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """PDF에서 텍스트 추출"""
@@ -93,17 +93,19 @@ JSON 형식으로 반환:
 """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_deployment,
+            content = chat_completion(
                 messages=[
                     {"role": "system", "content": "당신은 반도체 공학 커리어 컨설턴트입니다. 이력서를 면밀히 분석합니다."},
                     {"role": "user", "content": prompt}
                 ],
+                deployment=self.gpt_deployment,
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                cache=True,
+                task=TASK_PROFILE_ANALYSIS
             )
             
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
         
         except Exception as e:
             print(f"이력서 분석 오류: {e}")
@@ -150,17 +152,19 @@ JSON 형식으로 반환:
 """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_deployment,
+            content = chat_completion(
                 messages=[
                     {"role": "system", "content": "당신은 심리학과 커리어 개발 전문가입니다."},
                     {"role": "user", "content": prompt}
                 ],
+                deployment=self.gpt_deployment,
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                cache=True,
+                task=TASK_PROFILE_ANALYSIS
             )
             
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
         
         except Exception as e:
             print(f"자소서 분석 오류: {e}")
@@ -216,17 +220,18 @@ JSON 배열로 반환:
 """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_deployment,
+            content = chat_completion(
                 messages=[
                     {"role": "system", "content": "당신은 반도체 기업 면접관이자 교육자입니다. 학생의 잠재력을 평가하는 효과적인 질문을 만듭니다."},
                     {"role": "user", "content": prompt}
                 ],
+                deployment=self.gpt_deployment,
                 temperature=0.8,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                task=TASK_QUESTION_GENERATION
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             questions = result if isinstance(result, list) else result.get('questions', [])
             
             # 메타데이터 추가
@@ -274,57 +279,93 @@ JSON 배열로 반환:
 """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.gpt_deployment,
+            content = chat_completion(
                 messages=[
                     {"role": "system", "content": "당신은 경험 기반 면접 전문가입니다."},
                     {"role": "user", "content": prompt}
                 ],
+                deployment=self.gpt_deployment,
                 temperature=0.7,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                task=TASK_QUESTION_GENERATION
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             return result if isinstance(result, list) else result.get('questions', [])
         
         except Exception as e:
             print(f"심층 질문 생성 오류: {e}")
             return []
     
+    def _extract_text(self, file_path: str) -> Optional[str]:
+        """확장자에 맞게 텍스트 추출 (지원하지 않는 형식이면 None)"""
+        ext = file_path.lower().split('.')[-1]
+        if ext == 'pdf':
+            return self.extract_text_from_pdf(file_path)
+        elif ext == 'docx':
+            return self.extract_text_from_docx(file_path)
+        return None
+    
+    def _analyze_document(self, file_path: Optional[str], text: Optional[str], analyze) -> Dict:
+        """텍스트 추출 → 분석 (문서 하나의 독립 파이프라인)"""
+        if file_path:
+            extracted = self._extract_text(file_path)
+            if extracted is not None:
+                text = extracted
+        
+        return analyze(text) if text else {}
+    
+    def _generate_profile_questions(self, resume_data: Dict, statement_data: Dict, num_questions: int) -> Dict:
+        """맞춤형 질문 + 주요 경험별 심층 질문 동시 생성"""
+        experiences = [e for e in resume_data.get('semiconductor_experience', []) if isinstance(e, dict)][:3]
+        
+        with ThreadPoolExecutor(max_workers=1 + len(experiences)) as executor:
+            personalized_future = executor.submit(
+                contextvars.copy_context().run,
+                self.generate_personalized_questions, resume_data, statement_data, num_questions
+            )
+            deep_dive_futures = [
+                executor.submit(contextvars.copy_context().run, self.generate_experience_deep_dive_questions, experience)
+                for experience in experiences
+            ]
+            
+            return {
+                'personalized_questions': personalized_future.result(),
+                'deep_dive_questions': {
+                    experience.get('title', f'경험 {i + 1}'): future.result()
+                    for i, (experience, future) in enumerate(zip(experiences, deep_dive_futures))
+                }
+            }
+    
     def create_student_profile(
         self,
         resume_path: Optional[str] = None,
         statement_path: Optional[str] = None,
         resume_text: Optional[str] = None,
-        statement_text: Optional[str] = None
+        statement_text: Optional[str] = None,
+        include_questions: bool = False,
+        num_questions: int = 15
     ) -> Dict:
         """
         학생 프로필 생성 (종합 분석)
-        """
-        # 텍스트 추출
-        if resume_path:
-            ext = resume_path.lower().split('.')[-1]
-            if ext == 'pdf':
-                resume_text = self.extract_text_from_pdf(resume_path)
-            elif ext == 'docx':
-                resume_text = self.extract_text_from_docx(resume_path)
-        
-        if statement_path:
-            ext = statement_path.lower().split('.')[-1]
-            if ext == 'pdf':
-                statement_text = self.extract_text_from_pdf(statement_path)
-            elif ext == 'docx':
-                statement_text = self.extract_text_from_docx(statement_path)
-        
-        # 분석
-        resume_data = {}
-        statement_data = {}
         
-        if resume_text:
-            resume_data = self.analyze_resume(resume_text)
+        이력서/자소서는 서로 독립적이므로 텍스트 추출과 분석을 문서별로 동시에 실행하고,
+        두 분석 결과가 필요한 요약/질문 생성만 그 뒤에 실행
         
-        if statement_text:
-            statement_data = self.analyze_personal_statement(statement_text)
+        Args:
+            include_questions: True면 맞춤형 질문과 경험별 심층 질문까지 생성
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            resume_future = executor.submit(
+                contextvars.copy_context().run,
+                self._analyze_document, resume_path, resume_text, self.analyze_resume
+            )
+            statement_future = executor.submit(
+                contextvars.copy_context().run,
+                self._analyze_document, statement_path, statement_text, self.analyze_personal_statement
+            )
+            resume_data = resume_future.result()
+            statement_data = statement_future.result()
         
         # 종합 프로필
         profile = {
@@ -336,6 +377,10 @@ JSON 배열로 반환:
         # 요약
         profile['summary'] = self.create_profile_summary(resume_data, statement_data)
         
+        # 맞춤형 질문 (두 분석 결과에 의존)
+        if include_questions and (resume_data or statement_data):
+            profile.update(self._generate_profile_questions(resume_data, statement_data, num_questions))
+        
         return profile
     
     def create_profile_summary(self, resume_data: Dict, statement_data: Dict) -> str:
@@ -8,11 +8,12 @@ import json
 from typing import List, Dict, Optional
 import gradio as gr
 import azure.cognitiveservices.speech as speechsdk
-from openai import AzureOpenAI
 from azure.search.documents import SearchClient
 from azure.search.documents.models import VectorizedQuery
 from azure.core.credentials import AzureKeyCredential
 
+from llm_clients import get_client, chat_completion, create_embedding
+
 from document_processor import SemiconductorDocumentProcessor
 from resume_analyzer import ResumeAnalyzer
 
@@ -26,13 +27,9 @@ class SemiconductorSimulator:
         self.speech_region = os.getenv("AZURE_SPEECH_REGION")
         self.custom_voice_name = os.getenv("CUSTOM_VOICE_NAME")
         
-        # Azure OpenAI
-        self.openai_client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version="2024-02-15-preview",
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
+        # Azure OpenAI (공유 클라이언트)
         self.gpt_deployment = os.getenv("GPT_DEPLOYMENT_NAME", "gpt-4")
+        self.openai_client = get_client(self.gpt_deployment)
         self.dalle_deployment = os.getenv("DALLE_DEPLOYMENT_NAME", "dall-e-3")
         
         # Azure AI Search
@@ -104,11 +101,7 @@ class SemiconductorSimulator:
     
     def get_embedding(self, text: str) -> List[float]:
         """텍스트 임베딩 생성"""
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        return create_embedding(text)
     
     def search_knowledge(
         self, 
@@ -203,17 +196,17 @@ JSON 형식:
 }}
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        content = chat_completion(
             messages=[
                 {"role": "system", "content": "당신은 반도체 공학 교수입니다."},
                 {"role": "user", "content": prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.7,
             response_format={"type": "json_object"}
         )
         
-        question_data = json.loads(response.choices[0].message.content)
+        question_data = json.loads(content)
         question_data['search_context'] = search_results
         
         return question_data
@@ -287,17 +280,17 @@ JSON 형식:
 }}
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        content = chat_completion(
             messages=[
                 {"role": "system", "content": "당신은 반도체 기업 면접관입니다."},
                 {"role": "user", "content": prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.7,
             response_format={"type": "json_object"}
         )
         
-        question_data = json.loads(response.choices[0].message.content)
+        question_data = json.loads(content)
         question_data['search_context'] = search_results
         
         return question_data
@@ -351,24 +344,24 @@ JSON 형식:
 }}
 """
         
-        response = self.openai_client.chat.completions.create(
-            model=self.gpt_deployment,
+        content = chat_completion(
             messages=[
                 {"role": "system", "content": "당신은 반도체 공학 교수이자 평가 전문가입니다."},
                 {"role": "user", "content": prompt}
             ],
+            deployment=self.gpt_deployment,
             temperature=0.3,
             response_format={"type": "json_object"}
         )
         
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
     
     def generate_process_diagram(self, process_name: str) -> Optional[str]:
         """공정 다이어그램 생성 (DALL-E)"""
         try:
             prompt = f"Technical diagram of {process_name} semiconductor fabrication process, cross-section view, labeled, educational style, clean and professional"
             
-            result = self.openai_client.images.create(
+            result = get_client(self.dalle_deployment).images.create(
                 model=self.dalle_deployment,
                 prompt=prompt,
                 n=1,
@@ -13,13 +13,30 @@
 
 import os
 import sys
+import json
+import time
+import random
+import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 import gradio as gr
 
+import metrics
+from audio_ingest import LiveTranscriber, atranscribe_pcm, atranscribe_wav_file, parse_gradio_audio, transcribe_wav_file
+from continuous_stt import SAMPLE_RATE
+from json_stream import StreamingJSONParser, loads_tolerant
+from local_scorer import CONCEPT_PREFIX, KEYWORD_PREFIX, score_answer
+from llm_router import TASK_EVALUATION, TASK_PROFILE_ANALYSIS, TASK_QUESTION_GENERATION, get_router
+from prompt_builder import PromptBuilder, default_context_budget, fit_to_budget
+from speech_backend import create_speech_backend, speech_settings_from_env
+from speech_pipeline import stream_with_speech
+from tts_cache import DEFAULT_TTS_OUTPUT_FORMAT, TTS_OUTPUT_FORMATS, get_tts_cache, make_audio_key
+from tts_prerender import AUDIO_REF_FIELD, find_prerendered, load_prerendered, make_audio_ref
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -30,6 +47,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 평가/프로필 분석 응답은 JSON 모드로 요청
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# 검색으로 본 문제 은행 질문 → 사전 합성 음성 참조 (최근 항목만 유지)
+MAX_QUESTION_AUDIO_REFS = 2000
+
 
 # ============================================
 # Azure 클라이언트 초기화
@@ -41,65 +64,38 @@ def initialize_azure_clients():
     clients = {}
     environment = os.getenv('ENVIRONMENT', 'local')
     
-    # 1. OpenAI 클라이언트
+    # 1. OpenAI 클라이언트 (공유 레지스트리: 커넥션 풀 재사용)
     try:
-        # Azure OpenAI 우선 시도
-        azure_endpoint = os.getenv('AZURE_OPENAI_ENDPOINT')
-        azure_key = os.getenv('AZURE_OPENAI_KEY')
-        
-        if azure_endpoint and azure_key:
-            from openai import AzureOpenAI
-            clients['openai'] = AzureOpenAI(
-                api_key=azure_key,
-                # AZURE_OPENAI_API_VERSION은 Azure에 설정이 없으므로, 기본값을 사용하거나 제거하는 것이 좋습니다.
-                api_version=os.getenv('AZURE_OPENAI_API_VERSION', '2024-02-15-preview'), 
-                azure_endpoint=azure_endpoint
-            )
-            clients['openai_type'] = 'azure'
-            clients['gpt_model'] = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4') 
-            logger.info("✅ Azure OpenAI 클라이언트 초기화 성공")
-        
+        from llm_clients import get_client, get_provider
+        
+        # Azure OpenAI 우선, 없으면 일반 OpenAI API
+        provider = get_provider()
+        if provider == 'azure':
+            clients['gpt_model'] = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
+        elif provider == 'openai':
+            clients['gpt_model'] = 'gpt-4o-mini'
         else:
-            # 일반 OpenAI API
-            openai_key = os.getenv('OPENAI_API_KEY')
-            if openai_key:
-                from openai import OpenAI
-                clients['openai'] = OpenAI(api_key=openai_key)
-                clients['openai_type'] = 'openai'
-                clients['gpt_model'] = 'gpt-4o-mini'
-                logger.info("✅ OpenAI 클라이언트 초기화 성공")
-            else:
-                raise ValueError("OpenAI API 키가 설정되지 않았습니다")
+            raise ValueError("OpenAI API 키가 설정되지 않았습니다")
+        
+        clients['openai'] = get_client(clients['gpt_model'])
+        clients['openai_type'] = provider
+        logger.info(f"✅ {'Azure OpenAI' if provider == 'azure' else 'OpenAI'} 클라이언트 초기화 성공")
     
     except Exception as e:
         logger.error(f"❌ OpenAI 클라이언트 초기화 실패: {e}")
         clients['openai'] = None
     
-    # 2. Speech 클라이언트
+    # 2. Speech 클라이언트 (음성/출력 형식 설정은 사전 합성과 공유)
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        
-        speech_key = os.getenv('AZURE_SPEECH_KEY')
-        speech_region = os.getenv('AZURE_SPEECH_REGION', 'koreacentral')
-        
-        if speech_key and speech_region:
-            speech_config = speechsdk.SpeechConfig(
-                subscription=speech_key,
-                region=speech_region
-            )
-            
-            # 기본 한국어 음성 설정
-            voice_name = os.getenv('AZURE_SPEECH_VOICE_NAME', 'ko-KR-SunHiNeural')
-            speech_config.speech_synthesis_voice_name = voice_name
-            
-            # STT 설정 (한국어)
-            speech_config.speech_recognition_language = "ko-KR"
-            
-            clients['speech_config'] = speech_config
-            clients['speech_voice'] = voice_name
-            logger.info(f"✅ Azure Speech 클라이언트 초기화 성공 (음성: {voice_name})")
-        else:
+        settings = speech_settings_from_env()
+        if settings is None:
             raise ValueError("Azure Speech 키가 설정되지 않았습니다")
+        
+        speech_config, voice_name, output_format = settings
+        clients['speech_config'] = speech_config
+        clients['speech_voice'] = voice_name
+        clients['speech_format'] = output_format
+        logger.info(f"✅ Azure Speech 클라이언트 초기화 성공 (음성: {voice_name})")
     
     except Exception as e:
         logger.error(f"❌ Azure Speech 클라이언트 초기화 실패: {e}")
@@ -122,6 +118,19 @@ def initialize_azure_clients():
                 credential=AzureKeyCredential(search_key)
             )
             clients['search_index'] = index_name # 👈 AZURE_SEARCH_INDEX 사용
+            
+            # 비동기 경로용 aio 클라이언트 (aiohttp 필요)
+            try:
+                from azure.search.documents.aio import SearchClient as AsyncSearchClient
+                clients['search_async'] = AsyncSearchClient(
+                    endpoint=search_endpoint,
+                    index_name=index_name,
+                    credential=AzureKeyCredential(search_key)
+                )
+            except ImportError as e:
+                logger.warning(f"⚠️  비동기 Search 클라이언트 사용 불가: {e}")
+                clients['search_async'] = None
+            
             logger.info(f"✅ Azure AI Search 클라이언트 초기화 성공 (인덱스: {index_name})")
         else:
             raise ValueError("Azure Search 키가 설정되지 않았습니다")
@@ -130,19 +139,33 @@ def initialize_azure_clients():
         logger.error(f"❌ Azure AI Search 클라이언트 초기화 실패: {e}")
         clients['search'] = None
     
+    # 3-1. 로컬 스냅샷 인덱스 (Azure Search 없을 때 또는 SEARCH_BACKEND=local)
+    snapshot_path = os.getenv('LOCAL_INDEX_SNAPSHOT')
+    use_local = os.getenv('SEARCH_BACKEND', 'azure').lower() == 'local'
+    if snapshot_path and (use_local or not clients.get('search')):
+        try:
+            from index_snapshot import load_index_snapshot
+            
+            if not os.path.exists(snapshot_path):
+                raise FileNotFoundError(snapshot_path)
+            
+            local_index = load_index_snapshot(snapshot_path)
+            clients['search'] = local_index
+            clients['search_async'] = None
+            clients['search_index'] = local_index.index_name
+            logger.info(f"✅ 로컬 스냅샷 인덱스 사용: {snapshot_path} ({len(local_index.documents)}개 문서)")
+        except Exception as e:
+            logger.warning(f"⚠️  로컬 스냅샷 인덱스 로드 실패: {e}")
+    
     # 4. DALL-E 클라이언트 (선택사항)
     try:
         dalle_endpoint = os.getenv('AZURE_DALLE_ENDPOINT')
         dalle_key = os.getenv('AZURE_DALLE_API_KEY')
         
         if dalle_endpoint and dalle_key:
-            from openai import AzureOpenAI
-            clients['dalle'] = AzureOpenAI(
-                api_key=dalle_key,
-                api_version="2024-02-15-preview",
-                azure_endpoint=dalle_endpoint
-            )
+            from llm_clients import get_client
             clients['dalle_model'] = os.getenv('AZURE_DALLE_DEPLOYMENT_NAME', 'dall-e-3')
+            clients['dalle'] = get_client(clients['dalle_model'])
             logger.info("✅ DALL-E 클라이언트 초기화 성공")
         else:
             logger.info("ℹ️  DALL-E 설정 없음 (선택사항)")
@@ -155,6 +178,140 @@ def initialize_azure_clients():
     return clients
 
 
+# ============================================
+# 정적 지시문 (프롬프트 첫 메시지 - 요청별 내용 없음)
+# ============================================
+
+STUDY_QUESTION_INSTRUCTIONS = """당신은 반도체 공정 전문가입니다.
+학생의 학습을 돕기 위해 요청된 주제, 난이도, 질문 유형에 맞는 질문을 생성하세요.
+
+난이도 가이드:
+- 기초: 기본 개념과 정의를 확인하는 질문
+- 중급: 원리와 메커니즘을 설명할 수 있는지 확인하는 질문
+- 고급: 실무 적용과 문제 해결 능력을 평가하는 질문
+
+질문 유형 가이드:
+- 개념이해: 핵심 개념과 용어의 정의를 설명하도록
+- 원리설명: 물리/화학적 원리와 메커니즘을 설명하도록
+- 응용: 실제 공정에서의 응용 사례와 효과를 설명하도록
+- 비교: 다른 공정/기술과 비교 분석하도록
+- 실무: 실무에서 발생하는 문제와 해결 방법을 다루도록
+
+질문은 구체적이고 명확하게 작성하세요. 반도체 공정에 대한 전문적인 질문을 만들어주세요."""
+
+INTERVIEW_PROFILE_INSTRUCTIONS = """당신은 반도체 기업의 면접관입니다.
+함께 제공되는 학생 프로필을 바탕으로 맞춤형 면접 질문을 생성하세요.
+
+질문 생성 가이드:
+1. 학생의 구체적인 경험(프로젝트, 인턴 등)을 언급하며 질문
+2. 관심 분야와 기술 스킬을 연결하여 심화 질문
+3. 실제 경험에서 배운 점을 확인하는 질문
+4. 이론과 실무를 연결하는 질문
+
+예시:
+- "ITO 박막 프로젝트에서 RF 파워를 어떻게 최적화했나요?"
+- "MEMS 센서 제작 시 RIE 식각에서 어떤 어려움이 있었나요?"
+- "ALD 공정에 관심이 많다고 했는데, CVD와 비교하여 장단점을 설명해주세요."
+
+질문은 구체적이고 학생의 경험을 직접 언급해야 합니다."""
+
+INTERVIEW_GENERAL_INSTRUCTIONS = """당신은 반도체 기업의 면접관입니다.
+학부 수준의 지원자에게 적합한 기술 면접 질문을 생성하세요.
+
+질문은 다음을 평가할 수 있어야 합니다:
+- 반도체 공정에 대한 이론적 지식
+- 문제 해결 능력
+- 실무 적용 가능성
+- 학습 태도
+
+구체적인 공정 파라미터나 메커니즘을 포함한 질문을 만드세요."""
+
+EVALUATION_INSTRUCTIONS = """당신은 반도체 공정 전문가이자 교육자입니다.
+학생의 답변을 다음 5가지 기준으로 평가하세요:
+
+1. 정확성 (30점): 기술적 정확도, 용어 사용, 수치 정확성
+2. 깊이 (25점): 원리 이해도, 메커니즘 설명, 이론적 배경
+3. 구조 (20점): 논리적 흐름, 체계적 설명, 명확성
+4. 응용 (15점): 실무/실습 연결, 문제 해결 접근
+5. 의사소통 (10점): 표현력, 용어 정리, 설명 명확성
+
+다음 형식으로 JSON 응답하세요:
+{
+    "scores": {
+        "accuracy": <0-30>,
+        "depth": <0-25>,
+        "structure": <0-20>,
+        "application": <0-15>,
+        "communication": <0-10>
+    },
+    "total_score": <총점>,
+    "strengths": ["강점1", "강점2"],
+    "improvements": ["개선점1", "개선점2"],
+    "detailed_feedback": "상세 피드백",
+    "recommended_topics": ["복습 추천 주제1", "추천 주제2"]
+}"""
+
+PROFILE_ANALYSIS_INSTRUCTIONS = """당신은 반도체 분야 채용 전문가입니다.
+이력서와 자기소개서를 분석하여 다음 정보를 **매우 상세하게** 추출하세요:
+
+1. education: 대학, 학과, 학년, GPA (문자열)
+2. experiences: 프로젝트/인턴/실습 경험 목록 (리스트, 각 항목에 제목과 간단한 설명)
+3. projects: 구체적인 프로젝트 목록 (리스트, 프로젝트명과 사용 기술)
+4. skills: 기술 스킬 목록 (리스트)
+   - 증착 장비: 스퍼터링, CVD, ALD 등
+   - 식각 장비: RIE, 습식 식각 등
+   - 분석 장비: XRD, SEM, TEM, XPS 등
+   - 소프트웨어: MATLAB, Python 등
+5. interests: 관심 분야 목록 (리스트, 증착/식각/리소그래피 등)
+6. career_goal: 단기/장기 커리어 목표 (문자열)
+7. strengths: 강점 목록 (리스트)
+8. weaknesses: 보완이 필요한 부분 (리스트)
+
+**매우 중요**: 
+- 모든 리스트 항목은 구체적으로 작성
+- 프로젝트 경험은 반드시 포함 (예: "ITO 박막 증착 프로젝트")
+- 기술 스킬은 장비 이름까지 구체적으로 (예: "RF 스퍼터링", "RIE 식각")
+
+반드시 다음 형식의 JSON으로 응답하세요:
+{
+    "education": "서울대학교 재료공학부 3학년, GPA 3.82/4.3",
+    "experiences": [
+        "ITO 박막 증착 최적화 프로젝트 (RF 스퍼터링)",
+        "MEMS 압력센서 제작 실습",
+        "저온 ALD 공정 연구 (인턴)"
+    ],
+    "projects": [
+        "ITO 박막 증착 프로젝트",
+        "MEMS 센서 제작"
+    ],
+    "skills": [
+        "RF 스퍼터링",
+        "RIE 식각",
+        "XRD 분석",
+        "Python"
+    ],
+    "interests": [
+        "박막 증착",
+        "CVD 공정",
+        "공정 최적화"
+    ],
+    "career_goal": "대기업 공정 엔지니어 목표",
+    "strengths": ["끈기", "실험 설계"],
+    "weaknesses": ["영어 커뮤니케이션"]
+}"""
+
+PROFILE_DOCUMENT_TOKEN_BUDGET = 2000
+
+
+def _as_list(value) -> List[str]:
+    """인덱스 필드 값 → 문자열 목록 (컬렉션 필드 또는 쉼표 구분 문자열)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return [str(v) for v in value if v]
+
+
 # ============================================
 # SemiconductorSimulator 클래스
 # ============================================
@@ -179,110 +336,251 @@ class SemiconductorSimulator:
         # 세션 데이터 (메모리)
         self.current_session_qa = []  # 현재 세션의 Q&A 리스트
         
+        # 이력서 분석기 (최초 사용 시 생성 후 재사용)
+        self._resume_analyzer = None
+        
+        # 음성 백엔드 (Azure: 사전 연결된 합성기 풀 + 연속 인식, SPEECH_BACKEND=fake: 부하 테스트용)
+        self.speech = create_speech_backend(
+            self.clients.get('speech_config'),
+            voice=self.clients.get('speech_voice'),
+            output_format=self.clients.get('speech_format', DEFAULT_TTS_OUTPUT_FORMAT)
+        )
+        
+        # 문제 은행 질문 텍스트 → audio_ref (사전 합성된 음성 바로 재생)
+        self._question_audio_refs: "OrderedDict[str, str]" = OrderedDict()
+        
         logger.info("✅ 반도체 시뮬레이터 초기화 완료")
     
+    def get_resume_analyzer(self):
+        """ResumeAnalyzer 재사용 (클릭마다 새 클라이언트/TLS 연결 생성 방지)"""
+        if self._resume_analyzer is None:
+            from resume_analyzer import ResumeAnalyzer
+            self._resume_analyzer = ResumeAnalyzer()
+        return self._resume_analyzer
+    
     # ========================================
     # TTS/STT 기능
     # ========================================
     
+    def _tts_format(self) -> Tuple[str, str]:
+        """(출력 형식 이름, 파일 확장자)"""
+        return TTS_OUTPUT_FORMATS[self.speech.output_format]
+    
+    def _tts_cache_key(self, text: str) -> str:
+        return make_audio_key(text, self.speech.voice, output_format=self._tts_format()[0])
+    
+    def _synthesized_audio(self, audio_data: Optional[bytes]) -> Optional[bytes]:
+        """합성 결과 기록 (실패 시 None 그대로)"""
+        if audio_data is None:
+            return None
+        logger.info(f"✅ TTS 성공 (음성: {self.speech.voice or 'default'}, {len(audio_data) / 1024:.1f}KB)")
+        metrics.observe("tts_audio_bytes", len(audio_data))
+        return audio_data
+    
+    def _store_audio(self, text: str, audio_data: bytes) -> Optional[str]:
+        """음성 데이터를 TTS 캐시에 저장 → 캐시 파일 경로 (캐시 비활성화/실패 시 None)"""
+        cache = get_tts_cache()
+        if cache is None:
+            return None
+        try:
+            return cache.put_bytes(self._tts_cache_key(text), audio_data, suffix=self._tts_format()[1])
+        except OSError as e:
+            logger.warning(f"⚠️  TTS 캐시 저장 실패: {e}")
+            return None
+    
+    def _remember_question_audio(self, knowledge_items: List[Dict]):
+        """검색된 문제 은행 질문의 audio_ref 기록 (audio_ref 필드가 없는 문서는 id로 계산)"""
+        for item in knowledge_items:
+            audio_ref = item.get('audio_ref') or (make_audio_ref(item['id'], item['question']) if item.get('id') else None)
+            if audio_ref and item.get('question'):
+                self._question_audio_refs[item['question']] = audio_ref
+                self._question_audio_refs.move_to_end(item['question'])
+        while len(self._question_audio_refs) > MAX_QUESTION_AUDIO_REFS:
+            self._question_audio_refs.popitem(last=False)
+    
+    def _prerendered_question_file(self, text: str) -> Optional[str]:
+        audio_ref = self._question_audio_refs.get(text)
+        return find_prerendered(audio_ref, self.speech.voice, self._tts_format()[1]) if audio_ref else None
+    
+    def _prerendered_question_audio(self, text: str) -> Optional[bytes]:
+        """문제 은행 질문이면 사전 합성된 음성 (tts_prerender), 아니면 None"""
+        audio_ref = self._question_audio_refs.get(text)
+        if not audio_ref:
+            return None
+        audio = load_prerendered(audio_ref, self.speech.voice, self._tts_format()[1])
+        if audio:
+            logger.info(f"✅ 사전 합성 음성 사용: {text[:30]}...")
+        return audio
+    
     def text_to_speech(self, text: str) -> Optional[str]:
-        """텍스트를 음성으로 변환 (Azure Speech TTS)"""
+        """텍스트를 음성 파일로 변환 (Azure Speech TTS, 문제 은행 질문은 사전 합성 음성, 같은 텍스트는 캐시된 파일 재사용)"""
         
-        if not self.clients.get('speech_config'):
+        if self.speech is None:
             logger.warning("Speech 클라이언트가 없습니다")
             return None
         
         try:
-            import azure.cognitiveservices.speech as speechsdk
-            import tempfile
-            
-            # 오디오 설정
-            audio_filename = tempfile.mktemp(suffix=".wav")
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=audio_filename)
+            prerendered = self._prerendered_question_file(text)
+            if prerendered:
+                return prerendered
             
-            # Speech Synthesizer 생성
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.clients['speech_config'],
-                audio_config=audio_config
-            )
+            cache = get_tts_cache()
+            suffix = self._tts_format()[1]
+            if cache is not None:
+                cached = cache.get(self._tts_cache_key(text), suffix=suffix)
+                if cached:
+                    return cached
             
-            # 음성 합성
-            result = synthesizer.speak_text_async(text).get()
+            audio_data = self._synthesized_audio(self.speech.synthesize(text))
+            if audio_data is None:
+                return None
             
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                logger.info(f"✅ TTS 성공 (음성: {self.clients.get('speech_voice', 'default')})")
+            audio_filename = self._store_audio(text, audio_data)
+            if audio_filename:
                 return audio_filename
-            else:
-                logger.error(f"❌ TTS 실패: {result.reason}")
-                return None
+            
+            # 캐시를 쓰지 않을 때만 임시 파일로 저장
+            import tempfile
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as f:
+                f.write(audio_data)
+            return f.name
         
         except Exception as e:
             logger.error(f"❌ TTS 오류: {e}")
             return None
     
-    def speech_to_text(self, audio_file: str) -> Optional[str]:
-        """음성을 텍스트로 변환 (Azure Speech STT)"""
+    async def atext_to_speech(self, text: str) -> Optional[bytes]:
+        """
+        텍스트를 압축 음성 데이터(bytes)로 변환 - 파일을 거치지 않고 스트리밍 플레이어에 바로 전달
+        (완료 이벤트를 await, 스레드 블로킹 없음, 같은 텍스트는 캐시 재사용)
+        """
         
-        if not self.clients.get('speech_config'):
-            logger.warning("⚠️  Speech 클라이언트가 없습니다")
+        if self.speech is None:
+            logger.warning("Speech 클라이언트가 없습니다")
+            return None
+        
+        try:
+            prerendered = self._prerendered_question_audio(text)
+            if prerendered:
+                return prerendered
+            
+            cache = get_tts_cache()
+            if cache is not None:
+                cached = cache.get_bytes(self._tts_cache_key(text), suffix=self._tts_format()[1])
+                if cached:
+                    logger.info(f"✅ TTS 캐시 적중: {text[:30]}...")
+                    return cached
+            
+            audio_data = self._synthesized_audio(await self.speech.asynthesize(text))
+            if audio_data is not None:
+                self._store_audio(text, audio_data)
+            return audio_data
+        
+        except Exception as e:
+            logger.error(f"❌ TTS 오류: {e}")
             return None
+    
+    async def aspeak_stream(
+        self,
+        items: AsyncIterator,
+        text_of: Callable[[object], str]
+    ) -> AsyncIterator[Tuple[object, Optional[bytes]]]:
+        """
+        생성 스트림에 문장 단위 TTS를 겹쳐 실행 → (항목, 압축 음성 조각(bytes) 또는 None)
+        첫 문장이 완성되는 즉시 합성을 시작하여 GPT 생성과 TTS 지연이 겹치도록 함
+        """
+        
+        if self.speech is None:
+            async for item in items:
+                yield item, None
+            return
+        
+        async for item, segment in stream_with_speech(
+            items,
+            text_of,
+            self.atext_to_speech,
+            max_concurrency=int(os.getenv('TTS_MAX_CONCURRENCY', 3)),
+            # 문제 은행 질문이 그대로 나오면 (GPT 실패 시 대체 질문 등) 사전 합성 음성 재생
+            prerendered=self._prerendered_question_audio
+        ):
+            yield item, segment
+    
+    def _check_audio_file(self, audio_file: str) -> bool:
+        """음성 파일 검증 (인식할 수 없으면 False)"""
+        
+        if self.speech is None:
+            logger.warning("⚠️  Speech 클라이언트가 없습니다")
+            return False
         
         if not audio_file:
             logger.warning("⚠️  음성 파일이 없습니다")
-            return None
+            return False
+        
+        # 파일 존재 확인
+        if not os.path.exists(audio_file):
+            logger.error(f"❌ 음성 파일을 찾을 수 없음: {audio_file}")
+            return False
+        
+        logger.info(f"🎤 STT 시작: {audio_file} ({os.path.getsize(audio_file)} bytes)")
+        return True
+    
+    def speech_to_text(self, audio_file: str, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        음성을 텍스트로 변환 (Azure Speech 연속 인식 - 긴 답변도 끝까지 인식)
+        앞뒤 무음/긴 쉼은 제거 후 업로드, 발화가 거의 없으면 인식하지 않음
+        on_partial: 중간 인식 결과(지금까지의 전체 텍스트)를 받을 콜백
+        """
         
         try:
-            import azure.cognitiveservices.speech as speechsdk
-            import os
-            
-            # 파일 존재 확인
-            if not os.path.exists(audio_file):
-                logger.error(f"❌ 음성 파일을 찾을 수 없음: {audio_file}")
-                return None
-            
-            file_size = os.path.getsize(audio_file)
-            logger.info(f"🎤 STT 시작: {audio_file} ({file_size} bytes)")
-            
-            # 파일이 너무 작으면 (1KB 미만) 녹음 실패로 간주
-            if file_size < 1000:
-                logger.warning(f"⚠️  음성 파일이 너무 작음 ({file_size} bytes), 녹음이 제대로 안 된 것 같습니다")
+            if not self._check_audio_file(audio_file):
                 return None
             
-            # 오디오 설정
-            audio_config = speechsdk.audio.AudioConfig(filename=audio_file)
-            
-            # Speech Recognizer 생성
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.clients['speech_config'],
-                audio_config=audio_config
-            )
-            
             logger.info("🔄 음성 인식 중...")
-            
-            # 음성 인식 (타임아웃 10초)
-            result = recognizer.recognize_once_async().get()
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                recognized_text = result.text
-                logger.info(f"✅ STT 성공: '{recognized_text[:100]}...'")
-                return recognized_text
-            
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                logger.warning(f"⚠️  STT 실패: 음성을 인식할 수 없음 (NoMatch)")
-                logger.debug(f"NoMatch 상세: {result.no_match_details}")
+            return transcribe_wav_file(self.speech, audio_file, on_partial)
+        
+        except Exception as e:
+            logger.error(f"❌ STT 예외 발생: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            return None
+    
+    async def aspeech_to_text(self, audio_file: str, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """speech_to_text의 비동기 버전 (파일 읽기/무음 제거는 스레드에서, 인식 종료 이벤트를 await)"""
+        
+        try:
+            if not self._check_audio_file(audio_file):
                 return None
             
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = result.cancellation_details
-                logger.error(f"❌ STT 취소: {cancellation.reason}")
-                if cancellation.reason == speechsdk.CancellationReason.Error:
-                    logger.error(f"   오류 코드: {cancellation.error_code}")
-                    logger.error(f"   오류 메시지: {cancellation.error_details}")
+            logger.info("🔄 음성 인식 중...")
+            return await atranscribe_wav_file(self.speech, audio_file, on_partial)
+        
+        except Exception as e:
+            logger.error(f"❌ STT 예외 발생: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            return None
+    
+    async def atranscribe_answer(self, audio, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Gradio 음성 답변 → 텍스트
+        마이크 배열 (sample_rate, ndarray)은 16kHz PCM으로 변환·무음 제거 후 메모리에서 바로 인식 (임시 파일 없음),
+        파일 경로는 aspeech_to_text로 인식
+        """
+        
+        if self.speech is None:
+            logger.warning("⚠️  Speech 클라이언트가 없습니다")
+            return None
+        
+        try:
+            audio_file, pcm = await asyncio.to_thread(parse_gradio_audio, audio)
+            if audio_file:
+                return await self.aspeech_to_text(audio_file, on_partial)
+            if not pcm:
+                logger.warning("⚠️  인식할 음성이 없습니다")
                 return None
             
-            else:
-                logger.error(f"❌ STT 실패: {result.reason}")
-                return None
+            logger.info(f"🔄 음성 인식 중... ({len(pcm) / (2 * SAMPLE_RATE):.1f}초)")
+            return await atranscribe_pcm(self.speech, pcm, on_partial)
         
         except Exception as e:
             logger.error(f"❌ STT 예외 발생: {e}")
@@ -290,10 +588,76 @@ class SemiconductorSimulator:
             logger.debug(traceback.format_exc())
             return None
     
+    def create_live_transcriber(self) -> Optional[LiveTranscriber]:
+        """녹음 중 실시간 인식기 (Speech 클라이언트가 없으면 None)"""
+        if self.speech is None:
+            return None
+        return LiveTranscriber(self.speech)
+    
     # ========================================
     # RAG 검색 기능
     # ========================================
     
+    @staticmethod
+    def _build_search_filter(
+        process_filter: Optional[str],
+        difficulty_filter: Optional[str]
+    ) -> Optional[str]:
+        """검색 필터 구성"""
+        filters = []
+        if process_filter and process_filter != "전체":
+            filters.append(f"process_category eq '{process_filter}'")
+        if difficulty_filter and difficulty_filter != "전체":
+            filters.append(f"difficulty eq '{difficulty_filter}'")
+        
+        return " and ".join(filters) if filters else None
+    
+    @staticmethod
+    def _to_knowledge_items(results) -> List[Dict]:
+        """검색 결과 변환 (유연한 필드 처리)"""
+        knowledge_items = []
+        for result in results:
+            # 결과를 딕셔너리로 변환
+            if hasattr(result, '__dict__'):
+                result_dict = result.__dict__
+            else:
+                result_dict = dict(result)
+            
+            # 필드 이름 매핑 (다양한 필드명 지원)
+            item = {
+                'question': result_dict.get('question') or result_dict.get('Question') or result_dict.get('title') or '',
+                'answer': result_dict.get('answer') or result_dict.get('Answer') or result_dict.get('content') or '',
+                'process': result_dict.get('process_category') or result_dict.get('category') or result_dict.get('process') or '일반',
+                'difficulty': result_dict.get('difficulty') or result_dict.get('level') or '중급',
+                'type': result_dict.get('question_type') or result_dict.get('type') or '개념이해',
+                'keywords': _as_list(result_dict.get('keywords') or result_dict.get('tags')),
+                'related_concepts': _as_list(result_dict.get('related_concepts')),
+                'score': result_dict.get('@search.score', 1.0),
+                'id': result_dict.get('id'),
+                'audio_ref': result_dict.get(AUDIO_REF_FIELD)
+            }
+            
+            knowledge_items.append(item)
+        
+        return knowledge_items
+    
+    @staticmethod
+    def _knowledge_text(item: Dict) -> str:
+        """검색 결과 하나 → 프롬프트/채점용 참고 자료 텍스트 (키워드·관련 개념 포함)"""
+        lines = [f"Q: {item['question']}", f"A: {item['answer']}"]
+        if item.get('keywords'):
+            lines.append(f"{KEYWORD_PREFIX} {', '.join(item['keywords'])}")
+        if item.get('related_concepts'):
+            lines.append(f"{CONCEPT_PREFIX} {', '.join(item['related_concepts'])}")
+        return "\n".join(lines)
+    
+    def _log_search_result(self, query: str, knowledge_items: List[Dict]):
+        if knowledge_items:
+            logger.info(f"✅ 검색 성공: {len(knowledge_items)}개 결과 발견")
+            logger.debug(f"첫 번째 결과: {knowledge_items[0]['question'][:50]}...")
+        else:
+            logger.warning(f"⚠️  검색 결과 없음: '{query}'")
+    
     def search_knowledge(
         self,
         query: str,
@@ -308,18 +672,11 @@ class SemiconductorSimulator:
             return []
         
         try:
-            # 검색 필터 구성
-            filters = []
-            if process_filter and process_filter != "전체":
-                filters.append(f"process_category eq '{process_filter}'")
-            if difficulty_filter and difficulty_filter != "전체":
-                filters.append(f"difficulty eq '{difficulty_filter}'")
-            
-            filter_expression = " and ".join(filters) if filters else None
+            filter_expression = self._build_search_filter(process_filter, difficulty_filter)
             
             logger.info(f"🔍 검색 시작: query='{query}', filter={filter_expression}, top={top_k}")
             
-            # 검색 실행 (필터 없이 먼저 시도)
+            # 검색 실행 (필터 실패 시 필터 없이 재시도)
             if filter_expression:
                 try:
                     results = list(self.clients['search'].search(
@@ -339,33 +696,52 @@ class SemiconductorSimulator:
                     top=top_k
                 ))
             
-            # 결과 변환 (유연한 필드 처리)
-            knowledge_items = []
-            for result in results:
-                # 결과를 딕셔너리로 변환
-                if hasattr(result, '__dict__'):
-                    result_dict = result.__dict__
-                else:
-                    result_dict = dict(result)
-                
-                # 필드 이름 매핑 (다양한 필드명 지원)
-                item = {
-                    'question': result_dict.get('question') or result_dict.get('Question') or result_dict.get('title') or '',
-                    'answer': result_dict.get('answer') or result_dict.get('Answer') or result_dict.get('content') or '',
-                    'process': result_dict.get('process_category') or result_dict.get('category') or result_dict.get('process') or '일반',
-                    'difficulty': result_dict.get('difficulty') or result_dict.get('level') or '중급',
-                    'type': result_dict.get('question_type') or result_dict.get('type') or '개념이해',
-                    'score': result_dict.get('@search.score', 1.0)
-                }
-                
-                knowledge_items.append(item)
+            knowledge_items = self._to_knowledge_items(results)
+            self._remember_question_audio(knowledge_items)
+            self._log_search_result(query, knowledge_items)
+            return knowledge_items
+        
+        except Exception as e:
+            logger.error(f"❌ 검색 오류: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            return []
+    
+    async def asearch_knowledge(
+        self,
+        query: str,
+        process_filter: Optional[str] = None,
+        difficulty_filter: Optional[str] = None,
+        top_k: int = 5
+    ) -> List[Dict]:
+        """search_knowledge의 비동기 버전 (aio SearchClient 사용)"""
+        
+        search_async = self.clients.get('search_async')
+        if not search_async:
+            # 로컬 스냅샷 인덱스 등 메모리 내 검색은 동기 경로 사용
+            return self.search_knowledge(query, process_filter, difficulty_filter, top_k)
+        
+        async def run_search(filter_expression: Optional[str]) -> List:
+            kwargs = {'filter': filter_expression} if filter_expression else {}
+            results = await search_async.search(search_text=query, top=top_k, **kwargs)
+            return [result async for result in results]
+        
+        try:
+            filter_expression = self._build_search_filter(process_filter, difficulty_filter)
             
-            if knowledge_items:
-                logger.info(f"✅ 검색 성공: {len(knowledge_items)}개 결과 발견")
-                logger.debug(f"첫 번째 결과: {knowledge_items[0]['question'][:50]}...")
-            else:
-                logger.warning(f"⚠️  검색 결과 없음: '{query}'")
+            logger.info(f"🔍 비동기 검색 시작: query='{query}', filter={filter_expression}, top={top_k}")
             
+            try:
+                results = await run_search(filter_expression)
+            except Exception as filter_error:
+                if not filter_expression:
+                    raise
+                logger.warning(f"⚠️  필터 검색 실패, 필터 없이 재시도: {filter_error}")
+                results = await run_search(None)
+            
+            knowledge_items = self._to_knowledge_items(results)
+            self._remember_question_audio(knowledge_items)
+            self._log_search_result(query, knowledge_items)
             return knowledge_items
         
         except Exception as e:
@@ -378,135 +754,241 @@ class SemiconductorSimulator:
     # GPT 호출 기능
     # ========================================
     
-    def call_gpt(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> Optional[str]:
-        """GPT API 호출 (Azure/OpenAI 자동 구분)"""
+    def call_gpt(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        cache: bool = False,
+        response_format: Optional[Dict] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
+        """GPT API 호출 (Azure/OpenAI 자동 구분, cache=True면 응답 캐시 사용, task는 라우팅 작업 이름)"""
         
         if not self.clients.get('openai'):
             logger.error("OpenAI 클라이언트가 없습니다")
             return None
         
         try:
-            model = self.clients['gpt_model']
+            from llm_clients import chat_completion
             
-            response = self.clients['openai'].chat.completions.create(
-                model=model,
-                messages=messages,
+            return chat_completion(
+                messages,
+                deployment=self.clients['gpt_model'],
                 temperature=temperature,
-                max_tokens=2000
+                max_tokens=2000,
+                response_format=response_format,
+                cache=cache,
+                task=task
             )
+        
+        except Exception as e:
+            logger.error(f"❌ GPT 호출 오류: {e}")
+            return None
+    
+    async def acall_gpt(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        cache: bool = False,
+        response_format: Optional[Dict] = None,
+        task: Optional[str] = None
+    ) -> Optional[str]:
+        """call_gpt의 비동기 버전 (공유 비동기 클라이언트 사용)"""
+        
+        if not self.clients.get('openai'):
+            logger.error("OpenAI 클라이언트가 없습니다")
+            return None
+        
+        try:
+            from llm_clients import achat_completion
             
-            return response.choices[0].message.content
+            return await achat_completion(
+                messages,
+                deployment=self.clients['gpt_model'],
+                temperature=temperature,
+                max_tokens=2000,
+                response_format=response_format,
+                cache=cache,
+                task=task
+            )
         
         except Exception as e:
             logger.error(f"❌ GPT 호출 오류: {e}")
             return None
     
+    async def acall_gpt_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        cache: bool = False,
+        response_format: Optional[Dict] = None,
+        task: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """GPT API 스트리밍 호출 - 응답 텍스트 조각(delta)을 순서대로 반환"""
+        
+        if not self.clients.get('openai'):
+            logger.error("OpenAI 클라이언트가 없습니다")
+            return
+        
+        try:
+            from llm_clients import achat_completion_stream
+            
+            async for delta in achat_completion_stream(
+                messages,
+                deployment=self.clients['gpt_model'],
+                temperature=temperature,
+                max_tokens=2000,
+                response_format=response_format,
+                cache=cache,
+                task=task
+            ):
+                yield delta
+        
+        except Exception as e:
+            logger.error(f"❌ GPT 스트리밍 호출 오류: {e}")
+    
     # ========================================
     # 학습 모드 - 질문 생성
     # ========================================
     
-    def generate_study_question(
+    @staticmethod
+    def _pooled_question(knowledge: Optional[List[Dict]]) -> Optional[str]:
+        """GPT 호출 실패/회로 열림 시 검색된 문제 은행 질문으로 대체"""
+        
+        pool = [k['question'] for k in knowledge or [] if k.get('question')]
+        if not pool:
+            return None
+        
+        metrics.increment("llm_fallbacks", source="question_pool")
+        logger.warning(f"⚠️  GPT 질문 생성 실패, 문제 은행 질문으로 대체 ({len(pool)}개 후보)")
+        return random.choice(pool)
+    
+    @staticmethod
+    def _study_search_args(topic: str, difficulty: str) -> Dict:
+        return {'query': topic, 'difficulty_filter': difficulty, 'top_k': 3}
+    
+    def _build_study_messages(
         self,
         topic: str,
         difficulty: str,
-        question_type: str
-    ) -> Tuple[str, str]:
-        """학습 모드 질문 생성"""
-        
-        logger.info(f"📖 학습 질문 생성 시작: {topic} ({difficulty}, {question_type})")
+        question_type: str,
+        knowledge: Optional[List[Dict]] = None
+    ) -> Tuple[List[Dict[str, str]], str]:
+        """
+        학습 모드 프롬프트 구성 → (messages, context)
+        knowledge가 없으면 RAG 검색을 직접 수행 (비동기 경로는 미리 검색해서 전달)
+        """
         
         # RAG 검색
-        knowledge = self.search_knowledge(
-            query=topic,
-            difficulty_filter=difficulty,
-            top_k=3
-        )
+        if knowledge is None:
+            knowledge = self.search_knowledge(**self._study_search_args(topic, difficulty))
         
-        # 컨텍스트 구성
+        builder = PromptBuilder(STUDY_QUESTION_INSTRUCTIONS, label="study_question")
+        
+        # 컨텍스트 구성 (검색 순위대로 토큰 예산 안에서 채택)
         if knowledge:
-            context = "\n\n".join([
-                f"Q: {k['question']}\nA: {k['answer']}"
+            builder.add_context("참고 자료", [
+                self._knowledge_text(k)
                 for k in knowledge if k.get('question') and k.get('answer')
             ])
             logger.info(f"✅ RAG 컨텍스트 생성 완료 ({len(knowledge)}개 참조)")
+            basis = "참고 자료를 바탕으로"
         else:
             # RAG 결과가 없어도 GPT가 직접 질문 생성
-            context = f"주제: {topic}에 대한 질문을 생성합니다."
             logger.warning(f"⚠️  RAG 결과 없음, GPT가 직접 생성")
+            basis = "주제에 대한 일반적인 지식을 바탕으로"
         
-        # GPT 프롬프트
-        difficulty_guide = {
-            '기초': '기본 개념과 정의를 확인하는',
-            '중급': '원리와 메커니즘을 설명할 수 있는',
-            '고급': '실무 적용과 문제 해결 능력을 평가하는'
-        }
+        messages = builder.build(
+            f"주제: {topic}\n난이도: {difficulty}\n질문 유형: {question_type}\n\n"
+            f"{basis} {topic}에 대한 {difficulty} 난이도의 {question_type} 질문을 1개 생성해주세요."
+        )
+        context = builder.context_text("참고 자료") or f"주제: {topic}에 대한 질문을 생성합니다."
         
-        type_guide = {
-            '개념이해': '핵심 개념과 용어의 정의를 설명하도록',
-            '원리설명': '물리/화학적 원리와 메커니즘을 설명하도록',
-            '응용': '실제 공정에서의 응용 사례와 효과를 설명하도록',
-            '비교': '다른 공정/기술과 비교 분석하도록',
-            '실무': '실무에서 발생하는 문제와 해결 방법을 다루도록'
-        }
+        return messages, context
+    
+    def generate_study_question(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str
+    ) -> Tuple[str, str]:
+        """학습 모드 질문 생성"""
         
-        messages = [
-            {
-                "role": "system",
-                "content": f"""당신은 반도체 공정 전문가입니다.
-학생의 학습을 돕기 위해 {difficulty_guide.get(difficulty, '')} {type_guide.get(question_type, '')} 질문을 생성하세요.
-
-주제: {topic}
-난이도: {difficulty}
-질문 유형: {question_type}
-
-{'참고 자료:' if knowledge else '주제에 대한 일반적인 지식을 바탕으로'}
-{context}
-
-질문은 구체적이고 명확하게 작성하세요. 반도체 공정에 대한 전문적인 질문을 만들어주세요."""
-            },
-            {
-                "role": "user",
-                "content": f"{topic}에 대한 {difficulty} 난이도의 {question_type} 질문을 1개 생성해주세요."
-            }
-        ]
+        logger.info(f"📖 학습 질문 생성 시작: {topic} ({difficulty}, {question_type})")
         
-        question = self.call_gpt(messages, temperature=0.8)
+        knowledge = self.search_knowledge(**self._study_search_args(topic, difficulty))
+        messages, context = self._build_study_messages(topic, difficulty, question_type, knowledge)
+        question = self.call_gpt(messages, temperature=0.8, task=TASK_QUESTION_GENERATION)
         
         if question:
             logger.info(f"✅ 학습 질문 생성 완료")
             return question, context
+        
+        pooled = self._pooled_question(knowledge)
+        if pooled:
+            return pooled, context
+        logger.error(f"❌ 질문 생성 실패")
+        return "질문 생성에 실패했습니다. GPT API를 확인하세요.", context
+    
+    async def agenerate_study_question_stream(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """학습 모드 질문 생성 (스트리밍) - (누적 질문, context)를 순차 반환"""
+        
+        logger.info(f"📖 학습 질문 스트리밍 생성 시작: {topic} ({difficulty}, {question_type})")
+        
+        knowledge = await self.asearch_knowledge(**self._study_search_args(topic, difficulty))
+        messages, context = self._build_study_messages(topic, difficulty, question_type, knowledge)
+        
+        question = ""
+        async for delta in self.acall_gpt_stream(messages, temperature=0.8, task=TASK_QUESTION_GENERATION):
+            question += delta
+            yield question, context
+        
+        if question:
+            logger.info(f"✅ 학습 질문 생성 완료")
+            return
+        
+        pooled = self._pooled_question(knowledge)
+        if pooled:
+            yield pooled, context
         else:
             logger.error(f"❌ 질문 생성 실패")
-            return "질문 생성에 실패했습니다. GPT API를 확인하세요.", context
+            yield "질문 생성에 실패했습니다. GPT API를 확인하세요.", context
     
     # ========================================
     # 면접 모드 - 질문 생성
     # ========================================
     
-    def generate_interview_question(
+    @staticmethod
+    def _interview_search_args(focus_area: Optional[str]) -> Dict:
+        if focus_area and focus_area != "전체":
+            return {'query': focus_area, 'top_k': 3}
+        # 기본 반도체 공정 질문
+        return {'query': "반도체 공정", 'top_k': 3}
+    
+    def _build_interview_messages(
         self,
-        use_profile: bool = False,
-        focus_area: Optional[str] = None
-    ) -> Tuple[str, str]:
-        """면접 모드 질문 생성"""
-        
-        logger.info(f"💼 면접 질문 생성 시작 (프로필 사용: {use_profile}, 중점: {focus_area})")
-        
-        if use_profile and not self.student_profile:
-            logger.warning("⚠️  프로필이 없습니다")
-            return "먼저 '프로필 설정' 탭에서 이력서와 자기소개서를 분석해주세요.", ""
+        use_profile: bool,
+        focus_area: Optional[str],
+        knowledge: Optional[List[Dict]] = None
+    ) -> Tuple[List[Dict[str, str]], str]:
+        """
+        면접 모드 프롬프트 구성 → (messages, context)
+        knowledge가 없으면 RAG 검색을 직접 수행 (비동기 경로는 미리 검색해서 전달)
+        """
         
         # RAG 검색
-        if focus_area and focus_area != "전체":
-            knowledge = self.search_knowledge(query=focus_area, top_k=3)
-        else:
-            # 기본 반도체 공정 질문
-            knowledge = self.search_knowledge(query="반도체 공정", top_k=3)
+        if knowledge is None:
+            knowledge = self.search_knowledge(**self._interview_search_args(focus_area))
         
-        context = "\n\n".join([
-            f"Q: {k['question']}\nA: {k['answer']}"
-            for k in knowledge if k.get('question') and k.get('answer')
-        ]) if knowledge else "반도체 공정에 대한 일반적인 지식"
+        knowledge_texts = [
+            self._knowledge_text(k)
+            for k in knowledge or [] if k.get('question') and k.get('answer')
+        ]
         
         # 프롬프트 구성
         if use_profile and self.student_profile:
@@ -518,163 +1000,257 @@ class SemiconductorSimulator:
             projects = self.student_profile.get('projects') or self.student_profile.get('프로젝트') or []
             
             # 프로필 요약 생성
-            profile_summary = f"""
-학생 프로필:
-- 학력: {education}
+            profile_summary = f"""- 학력: {education}
 - 주요 경험: {', '.join(str(e) for e in experiences[:3]) if experiences else '경험 정보 없음'}
 - 프로젝트: {', '.join(str(p) for p in projects[:2]) if projects else '프로젝트 정보 없음'}
 - 관심 분야: {', '.join(str(i) for i in interests[:3]) if interests else '관심 분야 정보 없음'}
-- 기술 스킬: {', '.join(str(s) for s in skills[:5]) if skills else '스킬 정보 없음'}
-
-프로필 전체 데이터:
-{str(self.student_profile)[:500]}
-"""
+- 기술 스킬: {', '.join(str(s) for s in skills[:5]) if skills else '스킬 정보 없음'}"""
             
             logger.info(f"📊 프로필 요약: {len(experiences)}개 경험, {len(interests)}개 관심사, {len(skills)}개 스킬")
             
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"""당신은 반도체 기업의 면접관입니다.
-다음 학생의 프로필을 바탕으로 맞춤형 면접 질문을 생성하세요.
-
-{profile_summary}
-
-질문 생성 가이드:
-1. 학생의 구체적인 경험(프로젝트, 인턴 등)을 언급하며 질문
-2. 관심 분야와 기술 스킬을 연결하여 심화 질문
-3. 실제 경험에서 배운 점을 확인하는 질문
-4. 이론과 실무를 연결하는 질문
-
-예시:
-- "ITO 박막 프로젝트에서 RF 파워를 어떻게 최적화했나요?"
-- "MEMS 센서 제작 시 RIE 식각에서 어떤 어려움이 있었나요?"
-- "ALD 공정에 관심이 많다고 했는데, CVD와 비교하여 장단점을 설명해주세요."
-
-질문은 구체적이고 학생의 경험을 직접 언급해야 합니다."""
-                },
-                {
-                    "role": "user",
-                    "content": "이 학생의 프로필을 바탕으로 맞춤형 면접 질문 1개를 생성해주세요. 학생의 구체적인 경험이나 프로젝트를 언급하세요."
-                }
-            ]
+            # 요약을 먼저 두고 전체 데이터는 남은 예산만큼만 포함
+            builder = PromptBuilder(INTERVIEW_PROFILE_INSTRUCTIONS, label="interview_question_profile")
+            builder.add_context("학생 프로필", [profile_summary])
+            builder.add_context("프로필 전체 데이터", [json.dumps(self.student_profile, ensure_ascii=False)])
+            messages = builder.build(
+                "이 학생의 프로필을 바탕으로 맞춤형 면접 질문 1개를 생성해주세요. 학생의 구체적인 경험이나 프로젝트를 언급하세요."
+            )
+            context = "\n\n".join(fit_to_budget(knowledge_texts, default_context_budget()))
         
         else:
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"""당신은 반도체 기업의 면접관입니다.
-학부 수준의 지원자에게 적합한 기술 면접 질문을 생성하세요.
-
-{'참고 자료:' if knowledge else '주제:'}
-{context}
-
-질문은 다음을 평가할 수 있어야 합니다:
-- 반도체 공정에 대한 이론적 지식
-- 문제 해결 능력
-- 실무 적용 가능성
-- 학습 태도
-
-구체적인 공정 파라미터나 메커니즘을 포함한 질문을 만드세요."""
-                },
-                {
-                    "role": "user",
-                    "content": "반도체 공정 관련 면접 질문 1개를 생성해주세요. 구체적이고 기술적인 질문이어야 합니다."
-                }
-            ]
+            builder = PromptBuilder(INTERVIEW_GENERAL_INSTRUCTIONS, label="interview_question")
+            builder.add_context("참고 자료", knowledge_texts)
+            messages = builder.build(
+                "반도체 공정 관련 면접 질문 1개를 생성해주세요. 구체적이고 기술적인 질문이어야 합니다."
+            )
+            context = builder.context_text("참고 자료")
+        
+        return messages, context or "반도체 공정에 대한 일반적인 지식"
+    
+    def generate_interview_question(
+        self,
+        use_profile: bool = False,
+        focus_area: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """면접 모드 질문 생성"""
+        
+        logger.info(f"💼 면접 질문 생성 시작 (프로필 사용: {use_profile}, 중점: {focus_area})")
+        
+        if use_profile and not self.student_profile:
+            logger.warning("⚠️  프로필이 없습니다")
+            return "먼저 '프로필 설정' 탭에서 이력서와 자기소개서를 분석해주세요.", ""
         
-        question = self.call_gpt(messages, temperature=0.8)
+        knowledge = self.search_knowledge(**self._interview_search_args(focus_area))
+        messages, context = self._build_interview_messages(use_profile, focus_area, knowledge)
+        question = self.call_gpt(messages, temperature=0.8, task=TASK_QUESTION_GENERATION)
         
         if question:
             logger.info(f"✅ 면접 질문 생성 완료")
             return question, context
+        
+        pooled = self._pooled_question(knowledge)
+        if pooled:
+            return pooled, context
+        logger.error(f"❌ 질문 생성 실패")
+        return "질문 생성에 실패했습니다. GPT API를 확인하세요.", context
+    
+    async def agenerate_interview_question_stream(
+        self,
+        use_profile: bool = False,
+        focus_area: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """면접 모드 질문 생성 (스트리밍) - (누적 질문, context)를 순차 반환"""
+        
+        logger.info(f"💼 면접 질문 스트리밍 생성 시작 (프로필 사용: {use_profile}, 중점: {focus_area})")
+        
+        if use_profile and not self.student_profile:
+            logger.warning("⚠️  프로필이 없습니다")
+            yield "먼저 '프로필 설정' 탭에서 이력서와 자기소개서를 분석해주세요.", ""
+            return
+        
+        knowledge = await self.asearch_knowledge(**self._interview_search_args(focus_area))
+        messages, context = self._build_interview_messages(use_profile, focus_area, knowledge)
+        
+        question = ""
+        async for delta in self.acall_gpt_stream(messages, temperature=0.8, task=TASK_QUESTION_GENERATION):
+            question += delta
+            yield question, context
+        
+        if question:
+            logger.info(f"✅ 면접 질문 생성 완료")
+            return
+        
+        pooled = self._pooled_question(knowledge)
+        if pooled:
+            yield pooled, context
         else:
             logger.error(f"❌ 질문 생성 실패")
-            return "질문 생성에 실패했습니다. GPT API를 확인하세요.", context
+            yield "질문 생성에 실패했습니다. GPT API를 확인하세요.", context
     
     # ========================================
     # 답변 평가
     # ========================================
     
-    def evaluate_answer(
+    def _build_evaluation_messages(
         self,
         question: str,
         answer: str,
         context: str
-    ) -> Dict:
-        """답변 평가 (5가지 기준)"""
-        
-        messages = [
-            {
-                "role": "system",
-                "content": f"""당신은 반도체 공정 전문가이자 교육자입니다.
-학생의 답변을 다음 5가지 기준으로 평가하세요:
-
-1. 정확성 (30점): 기술적 정확도, 용어 사용, 수치 정확성
-2. 깊이 (25점): 원리 이해도, 메커니즘 설명, 이론적 배경
-3. 구조 (20점): 논리적 흐름, 체계적 설명, 명확성
-4. 응용 (15점): 실무/실습 연결, 문제 해결 접근
-5. 의사소통 (10점): 표현력, 용어 정리, 설명 명확성
-
-참고 자료:
-{context}
-
-질문: {question}
-답변: {answer}
-
-다음 형식으로 JSON 응답하세요:
-{{
-    "scores": {{
-        "accuracy": <0-30>,
-        "depth": <0-25>,
-        "structure": <0-20>,
-        "application": <0-15>,
-        "communication": <0-10>
-    }},
-    "total_score": <총점>,
-    "strengths": ["강점1", "강점2"],
-    "improvements": ["개선점1", "개선점2"],
-    "detailed_feedback": "상세 피드백",
-    "recommended_topics": ["복습 추천 주제1", "추천 주제2"]
-}}"""
-            },
-            {
-                "role": "user",
-                "content": f"다음 답변을 평가해주세요:\n\n{answer}"
-            }
-        ]
+    ) -> List[Dict[str, str]]:
+        """답변 평가 프롬프트 구성 (5가지 기준)"""
         
-        result = self.call_gpt(messages, temperature=0.3)
+        builder = PromptBuilder(EVALUATION_INSTRUCTIONS, label="evaluation")
+        builder.add_context("참고 자료", [context])
+        return builder.build(f"질문: {question}\n\n답변: {answer}\n\n위 답변을 평가해주세요.")
+    
+    def _parse_evaluation(self, question: str, answer: str, context: str, result: Optional[str]) -> Dict:
+        """GPT 평가 응답 파싱 후 세션에 저장"""
         
+        evaluation = self._evaluation_result(question, answer, context, result)
+        self._save_qa([(question, answer, evaluation)])
+        return evaluation
+    
+    @staticmethod
+    def _evaluation_result(question: str, answer: str, context: str, result: Optional[str]) -> Dict:
+        """
+        GPT 평가 응답 파싱
+        GPT 호출 실패/시간 초과/파싱 실패 시 로컬 채점 결과로 대체
+        """
+        
+        evaluation = None
         if result:
             try:
-                import json
-                # JSON 추출 (마크다운 코드 블록 제거)
-                if "```json" in result:
-                    result = result.split("```json")[1].split("```")[0]
-                elif "```" in result:
-                    result = result.split("```")[1].split("```")[0]
-                
-                evaluation = json.loads(result.strip())
-                logger.info(f"✅ 답변 평가 완료 (총점: {evaluation.get('total_score', 0)})")
-                
-                # 세션에 Q&A 추가 (메모리만)
-                self.current_session_qa.append({
-                    "question": question,
-                    "answer": answer,
-                    "evaluation": evaluation,
-                    "timestamp": datetime.now().isoformat()
-                })
-                logger.info(f"💾 세션에 저장 완료 (총 {len(self.current_session_qa)}개)")
-                
-                return evaluation
-            
+                # 코드 블록/잘린 응답도 로컬에서 보정하여 파싱
+                evaluation = loads_tolerant(result)
             except Exception as e:
                 logger.error(f"❌ 평가 결과 파싱 오류: {e}")
-                return {"error": "평가 결과 파싱 실패"}
         
+        if isinstance(evaluation, dict) and 'total_score' in evaluation:
+            logger.info(f"✅ 답변 평가 완료 (총점: {evaluation.get('total_score', 0)})")
         else:
-            return {"error": "평가 실패"}
+            logger.warning("⚠️  GPT 평가 실패, 로컬 채점 결과로 대체")
+            metrics.increment("llm_fallbacks", source="local_score")
+            evaluation = {
+                "⚠️ 안내": "GPT 평가를 사용할 수 없어 키워드 기반 자동 채점 결과를 표시합니다",
+                **score_answer(question, answer, context)
+            }
+        
+        return evaluation
+    
+    def _save_qa(self, records: List[Tuple[str, str, Dict]]):
+        """(질문, 답변, 평가) 목록을 세션에 한 번에 추가 (메모리만)"""
+        
+        timestamp = datetime.now().isoformat()
+        self.current_session_qa.extend(
+            {"question": question, "answer": answer, "evaluation": evaluation, "timestamp": timestamp}
+            for question, answer, evaluation in records
+        )
+        logger.info(f"💾 세션에 저장 완료 (총 {len(self.current_session_qa)}개)")
+    
+    @staticmethod
+    def _provisional_evaluation(question: str, answer: str, context: str) -> Dict:
+        """GPT 평가 전에 바로 보여줄 로컬 임시 채점 결과"""
+        return {"⏳ 임시 채점": "키워드 기반 자동 채점 (GPT 평가 진행 중)", **score_answer(question, answer, context)}
+    
+    @staticmethod
+    def _partial_evaluation(parser: StreamingJSONParser, provisional: Dict) -> Dict:
+        """
+        스트리밍 중 부분 평가 결과 (진행 상태 표시 포함)
+        GPT가 아직 채우지 않은 항목은 임시 채점 값으로 표시
+        """
+        partial = parser.snapshot() or {}
+        merged = {
+            key: value for key, value in provisional.items()
+            if key not in ("⏳ 임시 채점", "detailed_feedback", "provisional")
+        }
+        merged.update(partial)
+        merged["scores"] = {**provisional.get("scores", {}), **(partial.get("scores") or {})}
+        return {"⏳ 평가 진행 중": f"{len(parser.text)}자 수신", **merged}
+    
+    def evaluate_answer(
+        self,
+        question: str,
+        answer: str,
+        context: str
+    ) -> Dict:
+        """답변 평가 (5가지 기준)"""
+        
+        messages = self._build_evaluation_messages(question, answer, context)
+        result = self.call_gpt(messages, temperature=0.3, cache=True, response_format=JSON_RESPONSE_FORMAT, task=TASK_EVALUATION)
+        return self._parse_evaluation(question, answer, context, result)
+    
+    async def aevaluate_answer_stream(
+        self,
+        question: str,
+        answer: str,
+        context: str
+    ) -> AsyncIterator[Dict]:
+        """
+        답변 평가 (스트리밍)
+        로컬 임시 채점 결과를 먼저 반환하고, GPT 평가 값이 완성될 때마다 부분 평가 결과를,
+        완료 후 최종 평가 결과를 반환
+        """
+        
+        provisional = self._provisional_evaluation(question, answer, context)
+        yield provisional
+        
+        messages = self._build_evaluation_messages(question, answer, context)
+        
+        parser = StreamingJSONParser()
+        async for delta in self.acall_gpt_stream(messages, temperature=0.3, cache=True, response_format=JSON_RESPONSE_FORMAT, task=TASK_EVALUATION):
+            if parser.feed(delta):
+                yield self._partial_evaluation(parser, provisional)
+        
+        yield self._parse_evaluation(question, answer, context, parser.text or None)
+    
+    # ========================================
+    # 시험 모드 - 일괄 출제 / 동시 채점
+    # ========================================
+    
+    async def agenerate_exam(self, topic: str, difficulty: str, count: int = 20) -> List[Dict]:
+        """
+        문제 은행에서 시험 문항 출제 (GPT 호출 없음)
+        각 문항: {"question": 질문, "context": 채점용 참고 자료}
+        """
+        
+        knowledge = await self.asearch_knowledge(topic, difficulty_filter=difficulty, top_k=count)
+        exam = [
+            {"question": item['question'], "context": self._knowledge_text(item)}
+            for item in knowledge if item.get('question')
+        ]
+        logger.info(f"📝 시험 출제 완료: '{topic}' {len(exam)}문항")
+        return exam
+    
+    async def aevaluate_exam(self, items: List[Dict]) -> List[Dict]:
+        """
+        시험 답안 일괄 채점
+        - 모든 문항을 동시에 평가 (LLM 레이트 리미터가 전체 호출량 제한, EXAM_EVAL_CONCURRENCY로 동시 요청 수 상한)
+        - 채점이 끝나면 세션에 문항 순서대로 한 번에 저장 → 바로 리포트 생성 가능
+        items: [{"question", "answer", "context"}], 반환: 문항 순서의 평가 결과
+        """
+        
+        semaphore = asyncio.Semaphore(int(os.getenv("EXAM_EVAL_CONCURRENCY", 10)))
+        start = time.perf_counter()
+        
+        async def evaluate(item: Dict) -> Dict:
+            question, answer, context = item['question'], item.get('answer') or '', item.get('context') or ''
+            if not answer.strip():
+                return {"total_score": 0, "scores": {}, "detailed_feedback": "미응답"}
+            
+            messages = self._build_evaluation_messages(question, answer, context)
+            async with semaphore:
+                result = await self.acall_gpt(messages, temperature=0.3, cache=True, response_format=JSON_RESPONSE_FORMAT, task=TASK_EVALUATION)
+            return self._evaluation_result(question, answer, context, result)
+        
+        evaluations = await asyncio.gather(*(evaluate(item) for item in items))
+        
+        elapsed = time.perf_counter() - start
+        metrics.observe("exam_grading_seconds", elapsed)
+        metrics.increment("exam_answers_graded", len(items))
+        logger.info(f"✅ 시험 채점 완료: {len(items)}문항, {elapsed:.1f}초")
+        
+        self._save_qa([(item['question'], item.get('answer') or '', evaluation) for item, evaluation in zip(items, evaluations)])
+        return evaluations
     
     # ========================================
     # 프로필 분석
@@ -1069,81 +1645,21 @@ class SemiconductorSimulator:
     # 프로필 분석
     # ========================================
     
-    def analyze_profile(self, resume_text: str, ps_text: str) -> Dict:
-        """이력서/자소서 분석"""
-        
-        logger.info("👤 프로필 분석 시작...")
-        
-        messages = [
-            {
-                "role": "system",
-                "content": """당신은 반도체 분야 채용 전문가입니다.
-이력서와 자기소개서를 분석하여 다음 정보를 **매우 상세하게** 추출하세요:
-
-1. education: 대학, 학과, 학년, GPA (문자열)
-2. experiences: 프로젝트/인턴/실습 경험 목록 (리스트, 각 항목에 제목과 간단한 설명)
-3. projects: 구체적인 프로젝트 목록 (리스트, 프로젝트명과 사용 기술)
-4. skills: 기술 스킬 목록 (리스트)
-   - 증착 장비: 스퍼터링, CVD, ALD 등
-   - 식각 장비: RIE, 습식 식각 등
-   - 분석 장비: XRD, SEM, TEM, XPS 등
-   - 소프트웨어: MATLAB, Python 등
-5. interests: 관심 분야 목록 (리스트, 증착/식각/리소그래피 등)
-6. career_goal: 단기/장기 커리어 목표 (문자열)
-7. strengths: 강점 목록 (리스트)
-8. weaknesses: 보완이 필요한 부분 (리스트)
-
-**매우 중요**: 
-- 모든 리스트 항목은 구체적으로 작성
-- 프로젝트 경험은 반드시 포함 (예: "ITO 박막 증착 프로젝트")
-- 기술 스킬은 장비 이름까지 구체적으로 (예: "RF 스퍼터링", "RIE 식각")
-
-반드시 다음 형식의 JSON으로 응답하세요:
-{
-    "education": "서울대학교 재료공학부 3학년, GPA 3.82/4.3",
-    "experiences": [
-        "ITO 박막 증착 최적화 프로젝트 (RF 스퍼터링)",
-        "MEMS 압력센서 제작 실습",
-        "저온 ALD 공정 연구 (인턴)"
-    ],
-    "projects": [
-        "ITO 박막 증착 프로젝트",
-        "MEMS 센서 제작"
-    ],
-    "skills": [
-        "RF 스퍼터링",
-        "RIE 식각",
-        "XRD 분석",
-        "Python"
-    ],
-    "interests": [
-        "박막 증착",
-        "CVD 공정",
-        "공정 최적화"
-    ],
-    "career_goal": "대기업 공정 엔지니어 목표",
-    "strengths": ["끈기", "실험 설계"],
-    "weaknesses": ["영어 커뮤니케이션"]
-}"""
-            },
-            {
-                "role": "user",
-                "content": f"다음 이력서와 자기소개서를 분석하여 위 형식의 JSON으로 추출해주세요:\n\n이력서:\n{resume_text[:2000]}\n\n자기소개서:\n{ps_text[:2000]}"
-            }
-        ]
+    def _build_profile_messages(self, resume_text: str, ps_text: str) -> List[Dict[str, str]]:
+        """이력서/자소서 분석 프롬프트 구성 (문서별 토큰 예산 적용)"""
         
-        result = self.call_gpt(messages, temperature=0.3)
+        builder = PromptBuilder(PROFILE_ANALYSIS_INSTRUCTIONS, label="profile_analysis")
+        builder.add_context("이력서", [resume_text], budget=PROFILE_DOCUMENT_TOKEN_BUDGET)
+        builder.add_context("자기소개서", [ps_text], budget=PROFILE_DOCUMENT_TOKEN_BUDGET)
+        return builder.build("위 이력서와 자기소개서를 분석하여 지시된 형식의 JSON으로 추출해주세요.")
+    
+    def _parse_profile(self, result: Optional[str]) -> Dict:
+        """GPT 프로필 분석 응답 파싱 후 저장"""
         
         if result:
             try:
-                import json
-                # JSON 추출
-                if "```json" in result:
-                    result = result.split("```json")[1].split("```")[0]
-                elif "```" in result:
-                    result = result.split("```")[1].split("```")[0]
-                
-                profile = json.loads(result.strip())
+                # 코드 블록/잘린 응답도 로컬에서 보정하여 파싱
+                profile = loads_tolerant(result)
                 
                 # 프로필 검증 및 기본값 설정
                 if not profile.get('experiences'):
@@ -1189,6 +1705,25 @@ class SemiconductorSimulator:
             logger.error("❌ GPT 응답 없음")
             return {"error": "GPT API 호출 실패"}
 
+    
+    async def aanalyze_profile_stream(self, resume_text: str, ps_text: str) -> AsyncIterator[Dict]:
+        """
+        이력서/자소서 분석 (스트리밍)
+        항목이 완성될 때마다 부분 프로필을, 완료 후 최종 프로필을 반환
+        """
+        
+        logger.info("👤 프로필 분석 시작...")
+        
+        messages = self._build_profile_messages(resume_text, ps_text)
+        
+        parser = StreamingJSONParser()
+        async for delta in self.acall_gpt_stream(messages, temperature=0.3, cache=True, response_format=JSON_RESPONSE_FORMAT, task=TASK_PROFILE_ANALYSIS):
+            if parser.feed(delta):
+                partial = parser.snapshot()
+                if partial:
+                    yield {"⏳ 분석 진행 중": True, **partial}
+        
+        yield self._parse_profile(parser.text or None)
 
 # ============================================
 # Gradio UI 구성
@@ -1226,6 +1761,82 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
         current_question = gr.State("")
         current_context = gr.State("")
         
+        async def resolve_answer(text_answer, audio_answer) -> Optional[str]:
+            """음성 답변이 있으면 STT 결과, 없거나 인식 실패 시 텍스트 답변 (학습/면접 모드 공용)"""
+            logger.info(f"📝 답변 평가 시작 (텍스트 {len(text_answer) if text_answer else 0}자, 음성 {'있음' if audio_answer is not None else '없음'})")
+            
+            if audio_answer is None:
+                logger.info("📝 텍스트 답변 사용")
+                return text_answer
+            
+            logger.info("🎤 음성 답변 → STT 변환 시작")
+            text_from_audio = await simulator.atranscribe_answer(audio_answer)
+            if text_from_audio:
+                logger.info(f"✅ STT 성공: {text_from_audio[:50]}...")
+                return text_from_audio
+            
+            logger.warning("⚠️  STT 실패, 텍스트 답변 사용")
+            return text_answer
+        
+        def add_live_answer_mic(answer_text):
+            """
+            실시간 음성 답변 마이크 (학습/면접 모드 공용)
+            녹음 중 조각을 바로 연속 인식에 입력해 중간 결과를 답변 칸에 표시하고,
+            녹음이 끝나면 최종 텍스트를 답변 칸에 채움 (제출 시 STT 대기 없음)
+            """
+            live_mic = gr.Audio(
+                label="🎙️ 실시간 음성 답변 (말하는 동안 텍스트 변환)",
+                sources=["microphone"],
+                type="numpy",
+                streaming=True
+            )
+            live_transcriber = gr.State(None)
+            
+            async def on_chunk(chunk, transcriber):
+                if chunk is None:
+                    return gr.update(), transcriber
+                # stream/stop_recording 이벤트는 따로 실행되므로 이미 끝난 인식기가 남아 있을 수 있음 → 새로 시작
+                if transcriber is None or transcriber.finished:
+                    transcriber = simulator.create_live_transcriber()
+                    if transcriber is None:
+                        logger.warning("⚠️  Speech 클라이언트가 없어 실시간 인식을 사용할 수 없습니다")
+                        return gr.update(), None
+                
+                sample_rate, data = chunk
+                try:
+                    await asyncio.to_thread(transcriber.feed, sample_rate, data)
+                except Exception as e:
+                    logger.error(f"❌ 실시간 음성 인식 오류: {e}")
+                if transcriber.finished:
+                    # 입력 중 on_stop이 먼저 끝남 → 최종 텍스트를 덮어쓰지 않고 State도 되살리지 않음
+                    return gr.update(), None
+                return transcriber.text or gr.update(), transcriber
+            
+            async def on_stop(transcriber):
+                if transcriber is None:
+                    return gr.update(), None
+                text = await transcriber.afinish()
+                if text:
+                    logger.info(f"✅ 실시간 인식 완료: {text[:50]}...")
+                    return text, None
+                return gr.update(), None
+            
+            stream_kwargs = dict(
+                inputs=[live_mic, live_transcriber],
+                outputs=[answer_text, live_transcriber]
+            )
+            try:
+                live_mic.stream(on_chunk, stream_every=0.5, time_limit=600, **stream_kwargs)
+            except TypeError:
+                # stream_every/time_limit 미지원 Gradio
+                live_mic.stream(on_chunk, **stream_kwargs)
+            live_mic.stop_recording(
+                on_stop,
+                inputs=[live_transcriber],
+                outputs=[answer_text, live_transcriber]
+            )
+            return live_mic
+        
         with gr.Tabs():
             # ===== 프로필 설정 탭 =====
             with gr.Tab("👤 프로필 설정"):
@@ -1238,23 +1849,35 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                 analyze_btn = gr.Button("📊 분석 시작", variant="primary")
                 profile_output = gr.JSON(label="분석 결과")
                 
-                def analyze_profile_handler(resume, ps):
+                async def analyze_profile_handler(resume, ps):
                     if not resume or not ps:
-                        return {"❌ 오류": "이력서와 자기소개서를 모두 업로드해주세요"}
+                        yield {"❌ 오류": "이력서와 자기소개서를 모두 업로드해주세요"}
+                        return
                     
                     # 파일에서 텍스트 추출
                     try:
-                        from resume_analyzer import ResumeAnalyzer
-                        analyzer = ResumeAnalyzer()
+                        analyzer = simulator.get_resume_analyzer()
                         
                         logger.info(f"📄 파일 처리 시작: {resume.name}, {ps.name}")
                         
-                        resume_text = analyzer.extract_text_from_pdf(resume.name) if resume.name.endswith('.pdf') else analyzer.extract_text_from_docx(resume.name)
-                        ps_text = analyzer.extract_text_from_pdf(ps.name) if ps.name.endswith('.pdf') else analyzer.extract_text_from_docx(ps.name)
+                        # 파일 파싱은 CPU/디스크 작업이므로 이벤트 루프 밖에서 실행
+                        def extract_text(file):
+                            if file.name.endswith('.pdf'):
+                                return analyzer.extract_text_from_pdf(file.name)
+                            return analyzer.extract_text_from_docx(file.name)
+                        
+                        resume_text, ps_text = await asyncio.gather(
+                            asyncio.to_thread(extract_text, resume),
+                            asyncio.to_thread(extract_text, ps)
+                        )
                         
                         logger.info(f"✅ 텍스트 추출 완료: 이력서 {len(resume_text)}자, 자소서 {len(ps_text)}자")
                         
-                        profile = simulator.analyze_profile(resume_text, ps_text)
+                        # 항목이 완성되는 대로 부분 결과 표시
+                        profile = None
+                        async for profile in simulator.aanalyze_profile_stream(resume_text, ps_text):
+                            if "⏳ 분석 진행 중" in profile:
+                                yield profile
                         
                         # 출력 포맷 개선
                         if profile and 'error' not in profile:
@@ -1269,19 +1892,19 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                                 "💪 강점": profile.get('strengths', []),
                                 "📈 보완 필요": profile.get('weaknesses', [])
                             }
-                            return formatted_output
+                            yield formatted_output
                         else:
-                            return profile
+                            yield profile
                     
                     except ImportError:
                         logger.error("❌ resume_analyzer 모듈을 찾을 수 없습니다")
-                        return {"❌ 오류": "resume_analyzer.py 파일이 필요합니다"}
+                        yield {"❌ 오류": "resume_analyzer.py 파일이 필요합니다"}
                     
                     except Exception as e:
                         logger.error(f"❌ 프로필 분석 오류: {e}")
                         import traceback
                         logger.debug(traceback.format_exc())
-                        return {"❌ 오류": str(e), "💡 힌트": "이력서와 자기소개서가 올바른 형식인지 확인하세요"}
+                        yield {"❌ 오류": str(e), "💡 힌트": "이력서와 자기소개서가 올바른 형식인지 확인하세요"}
                 
                 analyze_btn.click(
                     analyze_profile_handler,
@@ -1318,6 +1941,7 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                         study_audio_output = gr.Audio(
                             label="질문 음성 (자동 재생)",
                             type="filepath",
+                            streaming=True,
                             autoplay=True
                         )
                 
@@ -1332,8 +1956,10 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                         study_answer_audio = gr.Audio(
                             label="🎤 음성 답변 녹음",
                             sources=["microphone"],
-                            type="filepath"
+                            # 배열로 받아 메모리에서 바로 STT (임시 파일 없음)
+                            type="numpy"
                         )
+                        add_live_answer_mic(study_answer_text)
                 
                 # 녹음된 음성 재생 섹션
                 gr.Markdown("### 🔊 녹음된 답변 확인")
@@ -1345,12 +1971,19 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                 
                 study_submit_btn = gr.Button("✅ 답변 제출", variant="primary")
                 study_evaluation_output = gr.JSON(label="평가 결과")
+                study_feedback_audio = gr.Audio(
+                    label="피드백 음성",
+                    type="filepath",
+                    streaming=True,
+                    autoplay=True
+                )
                 
                 # 녹음 완료 시 자동으로 재생 컴포넌트에 복사
                 def on_audio_recorded(audio):
                     """녹음 완료 시 재생 컴포넌트 업데이트"""
                     if audio:
-                        logger.info(f"🎤 녹음 완료: {audio}")
+                        sample_rate, data = audio
+                        logger.info(f"🎤 녹음 완료: {len(data) / sample_rate:.1f}초 ({sample_rate}Hz)")
                         return audio
                     return None
                 
@@ -1360,10 +1993,11 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                     outputs=[study_recorded_playback]
                 )
                 
-                def start_study(topic, difficulty, q_type):
-                    question, context = simulator.generate_study_question(topic, difficulty, q_type)
-                    audio = simulator.text_to_speech(question)
-                    return question, audio, question, context
+                async def start_study(topic, difficulty, q_type):
+                    # 질문 텍스트를 토큰 단위로 보여주면서, 완성된 문장부터 음성 합성하여 순서대로 재생
+                    question_stream = simulator.agenerate_study_question_stream(topic, difficulty, q_type)
+                    async for (question, context), audio in simulator.aspeak_stream(question_stream, text_of=lambda item: item[0]):
+                        yield question, audio, question, context
                 
                 study_start_btn.click(
                     start_study,
@@ -1371,72 +2005,29 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                     outputs=[study_question_output, study_audio_output, current_question, current_context]
                 )
                 
-                def evaluate_study_answer(question, context, text_answer, audio_answer):
+                async def evaluate_study_answer(question, context, text_answer, audio_answer):
                     """답변 평가 (텍스트 또는 음성)"""
-                    logger.info(f"📝 답변 평가 시작")
-                    logger.info(f"   - 텍스트 답변 길이: {len(text_answer) if text_answer else 0}")
-                    logger.info(f"   - 음성 데이터 타입: {type(audio_answer)}")
-                    logger.info(f"   - 음성 데이터 값: {audio_answer}")
-                    
-                    # Gradio Audio 컴포넌트는 튜플 또는 문자열로 전달됨
-                    audio_file_path = None
-                    if audio_answer:
-                        if isinstance(audio_answer, tuple):
-                            # (sample_rate, audio_data) 형태
-                            logger.info("📦 튜플 형태의 오디오 데이터")
-                            if len(audio_answer) >= 2:
-                                # 두 번째 요소가 파일 경로일 수 있음
-                                if isinstance(audio_answer[1], str):
-                                    audio_file_path = audio_answer[1]
-                                else:
-                                    # NumPy 배열인 경우 임시 파일로 저장
-                                    import tempfile
-                                    import soundfile as sf
-                                    
-                                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                                    sf.write(temp_file.name, audio_answer[1], audio_answer[0])
-                                    audio_file_path = temp_file.name
-                                    logger.info(f"📁 임시 파일 생성: {audio_file_path}")
-                        elif isinstance(audio_answer, str):
-                            # 파일 경로 문자열
-                            audio_file_path = audio_answer
-                            logger.info(f"📁 파일 경로: {audio_file_path}")
-                        else:
-                            logger.warning(f"⚠️  알 수 없는 오디오 형식: {type(audio_answer)}")
-                    
-                    # 음성 답변이 있으면 STT
-                    if audio_file_path:
-                        logger.info(f"🎤 음성 답변 → STT 변환 시작: {audio_file_path}")
-                        try:
-                            text_from_audio = simulator.speech_to_text(audio_file_path)
-                            
-                            if text_from_audio:
-                                logger.info(f"✅ STT 성공: {text_from_audio[:50]}...")
-                                answer = text_from_audio
-                            else:
-                                logger.warning("⚠️  STT 실패, 텍스트 답변 사용")
-                                answer = text_answer
-                        except Exception as e:
-                            logger.error(f"❌ STT 오류: {e}")
-                            import traceback
-                            logger.debug(traceback.format_exc())
-                            answer = text_answer
-                    else:
-                        logger.info("📝 텍스트 답변 사용")
-                        answer = text_answer
+                    answer = await resolve_answer(text_answer, audio_answer)
                     
                     if not answer or len(answer.strip()) == 0:
                         logger.warning("⚠️  답변이 비어있음")
-                        return {"error": "답변을 입력하거나 녹음해주세요"}
+                        yield {"error": "답변을 입력하거나 녹음해주세요"}, None
+                        return
                     
                     logger.info(f"📊 최종 답변: {answer[:100]}... (총 {len(answer)} 글자)")
-                    evaluation = simulator.evaluate_answer(question, answer, context)
-                    return evaluation
+                    # 상세 피드백은 완성된 문장부터 음성으로 읽어줌
+                    evaluation_stream = simulator.aevaluate_answer_stream(question, answer, context)
+                    async for evaluation, audio in simulator.aspeak_stream(
+                        evaluation_stream,
+                        # 로컬 채점 결과는 읽지 않고 GPT 피드백만 음성으로
+                        text_of=lambda evaluation: "" if evaluation.get("provisional") else str(evaluation.get("detailed_feedback") or "")
+                    ):
+                        yield evaluation, audio
                 
                 study_submit_btn.click(
                     evaluate_study_answer,
                     inputs=[current_question, current_context, study_answer_text, study_answer_audio],
-                    outputs=study_evaluation_output
+                    outputs=[study_evaluation_output, study_feedback_audio]
                 )
             
             # ===== 면접 모드 탭 =====
@@ -1462,6 +2053,7 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                         interview_audio_output = gr.Audio(
                             label="질문 음성 (자동 재생)",
                             type="filepath",
+                            streaming=True,
                             autoplay=True
                         )
                 
@@ -1476,8 +2068,10 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                         interview_answer_audio = gr.Audio(
                             label="🎤 음성 답변 녹음",
                             sources=["microphone"],
-                            type="filepath"
+                            # 배열로 받아 메모리에서 바로 STT (임시 파일 없음)
+                            type="numpy"
                         )
+                        add_live_answer_mic(interview_answer_text)
                 
                 # 녹음된 음성 재생 섹션
                 gr.Markdown("### 🔊 녹음된 답변 확인")
@@ -1489,12 +2083,19 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                 
                 interview_submit_btn = gr.Button("✅ 답변 제출", variant="primary")
                 interview_evaluation_output = gr.JSON(label="평가 결과")
+                interview_feedback_audio = gr.Audio(
+                    label="피드백 음성",
+                    type="filepath",
+                    streaming=True,
+                    autoplay=True
+                )
                 
                 # 녹음 완료 시 자동으로 재생 컴포넌트에 복사
                 def on_interview_audio_recorded(audio):
                     """녹음 완료 시 재생 컴포넌트 업데이트"""
                     if audio:
-                        logger.info(f"🎤 면접 답변 녹음 완료: {audio}")
+                        sample_rate, data = audio
+                        logger.info(f"🎤 면접 답변 녹음 완료: {len(data) / sample_rate:.1f}초 ({sample_rate}Hz)")
                         return audio
                     return None
                 
@@ -1534,10 +2135,11 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                         pdf_output = gr.File(label="생성된 PDF 리포트")
                         pdf_status = gr.Markdown()
                 
-                def start_interview(use_profile, focus):
-                    question, context = simulator.generate_interview_question(use_profile, focus)
-                    audio = simulator.text_to_speech(question)
-                    return question, audio, question, context
+                async def start_interview(use_profile, focus):
+                    # 질문 텍스트를 토큰 단위로 보여주면서, 완성된 문장부터 음성 합성하여 순서대로 재생
+                    question_stream = simulator.agenerate_interview_question_stream(use_profile, focus)
+                    async for (question, context), audio in simulator.aspeak_stream(question_stream, text_of=lambda item: item[0]):
+                        yield question, audio, question, context
                 
                 interview_start_btn.click(
                     start_interview,
@@ -1545,74 +2147,29 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                     outputs=[interview_question_output, interview_audio_output, current_question, current_context]
                 )
                 
-                def evaluate_interview_answer(question, context, text_answer, audio_answer):
+                async def evaluate_interview_answer(question, context, text_answer, audio_answer):
                     """면접 답변 평가 (텍스트 또는 음성)"""
-                    logger.info(f"💼 면접 답변 평가 시작")
-                    logger.info(f"   - 텍스트 답변 길이: {len(text_answer) if text_answer else 0}")
-                    logger.info(f"   - 음성 데이터 타입: {type(audio_answer)}")
-                    logger.info(f"   - 음성 데이터 값: {audio_answer}")
-                    
-                    # Gradio Audio 컴포넌트 처리
-                    audio_file_path = None
-                    if audio_answer:
-                        if isinstance(audio_answer, tuple):
-                            logger.info("📦 튜플 형태의 오디오 데이터")
-                            if len(audio_answer) >= 2:
-                                if isinstance(audio_answer[1], str):
-                                    audio_file_path = audio_answer[1]
-                                else:
-                                    # NumPy 배열인 경우 임시 파일로 저장
-                                    try:
-                                        import tempfile
-                                        import soundfile as sf
-                                        
-                                        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                                        sf.write(temp_file.name, audio_answer[1], audio_answer[0])
-                                        audio_file_path = temp_file.name
-                                        logger.info(f"📁 임시 파일 생성: {audio_file_path}")
-                                    except ImportError:
-                                        logger.error("❌ soundfile 패키지 필요: pip install soundfile")
-                                    except Exception as e:
-                                        logger.error(f"❌ 오디오 저장 실패: {e}")
-                        elif isinstance(audio_answer, str):
-                            audio_file_path = audio_answer
-                            logger.info(f"📁 파일 경로: {audio_file_path}")
-                        else:
-                            logger.warning(f"⚠️  알 수 없는 오디오 형식: {type(audio_answer)}")
-                    
-                    # 음성 답변이 있으면 STT
-                    if audio_file_path:
-                        logger.info(f"🎤 음성 답변 → STT 변환 시작: {audio_file_path}")
-                        try:
-                            text_from_audio = simulator.speech_to_text(audio_file_path)
-                            
-                            if text_from_audio:
-                                logger.info(f"✅ STT 성공: {text_from_audio[:50]}...")
-                                answer = text_from_audio
-                            else:
-                                logger.warning("⚠️  STT 실패, 텍스트 답변 사용")
-                                answer = text_answer
-                        except Exception as e:
-                            logger.error(f"❌ STT 오류: {e}")
-                            import traceback
-                            logger.debug(traceback.format_exc())
-                            answer = text_answer
-                    else:
-                        logger.info("📝 텍스트 답변 사용")
-                        answer = text_answer
+                    answer = await resolve_answer(text_answer, audio_answer)
                     
                     if not answer or len(answer.strip()) == 0:
                         logger.warning("⚠️  답변이 비어있음")
-                        return {"error": "답변을 입력하거나 녹음해주세요"}
+                        yield {"error": "답변을 입력하거나 녹음해주세요"}, None
+                        return
                     
                     logger.info(f"📊 최종 답변 길이: {len(answer)} 글자")
-                    evaluation = simulator.evaluate_answer(question, answer, context)
-                    return evaluation
+                    # 상세 피드백은 완성된 문장부터 음성으로 읽어줌
+                    evaluation_stream = simulator.aevaluate_answer_stream(question, answer, context)
+                    async for evaluation, audio in simulator.aspeak_stream(
+                        evaluation_stream,
+                        # 로컬 채점 결과는 읽지 않고 GPT 피드백만 음성으로
+                        text_of=lambda evaluation: "" if evaluation.get("provisional") else str(evaluation.get("detailed_feedback") or "")
+                    ):
+                        yield evaluation, audio
                 
                 interview_submit_btn.click(
                     evaluate_interview_answer,
                     inputs=[current_question, current_context, interview_answer_text, interview_answer_audio],
-                    outputs=interview_evaluation_output
+                    outputs=[interview_evaluation_output, interview_feedback_audio]
                 )
                 
                 def generate_pdf_handler(user_name):
@@ -1642,6 +2199,97 @@ def create_gradio_interface(simulator: SemiconductorSimulator):
                     clear_session_handler,
                     outputs=[pdf_status]
                 )
+            
+            # ===== 시험 모드 탭 =====
+            with gr.Tab("📝 시험 모드"):
+                gr.Markdown("### 문항을 한 번에 출제하고, 모든 답안을 작성한 뒤 일괄 채점합니다")
+                
+                exam_items = gr.State([])
+                
+                with gr.Row():
+                    exam_topic = gr.Textbox(label="시험 범위", value="CVD 증착")
+                    exam_difficulty = gr.Radio(["전체", "기초", "중급", "고급"], label="난이도", value="전체")
+                    exam_count = gr.Slider(5, 30, value=20, step=1, label="문항 수")
+                
+                exam_start_btn = gr.Button("📝 시험 출제", variant="primary")
+                exam_sheet = gr.Dataframe(
+                    headers=["번호", "질문", "답안"],
+                    datatype=["number", "str", "str"],
+                    type="array",
+                    interactive=True,
+                    wrap=True,
+                    label="답안지 (답안 칸에 작성)"
+                )
+                
+                with gr.Row():
+                    exam_student_name = gr.Textbox(label="이름", value="학생")
+                    exam_grade_btn = gr.Button("✅ 일괄 채점 + 리포트 생성", variant="primary")
+                
+                exam_result_output = gr.JSON(label="채점 결과")
+                exam_report_output = gr.File(label="리포트")
+                
+                async def start_exam(topic, difficulty, count):
+                    items = await simulator.agenerate_exam(topic, difficulty, int(count))
+                    sheet = [[i + 1, item['question'], ""] for i, item in enumerate(items)]
+                    return sheet, items
+                
+                exam_start_btn.click(
+                    start_exam,
+                    inputs=[exam_topic, exam_difficulty, exam_count],
+                    outputs=[exam_sheet, exam_items]
+                )
+                
+                async def grade_exam(sheet, items, student_name):
+                    if not items:
+                        return {"❌ 오류": "먼저 시험을 출제하세요"}, None
+                    
+                    rows = sheet.values.tolist() if hasattr(sheet, 'values') else list(sheet or [])
+                    answers = {int(row[0]): str(row[2] or "") for row in rows if len(row) >= 3 and row[0] not in (None, "")}
+                    answered = [
+                        {**item, "answer": answers.get(i + 1, "")}
+                        for i, item in enumerate(items)
+                    ]
+                    
+                    evaluations = await simulator.aevaluate_exam(answered)
+                    report_path = await asyncio.to_thread(simulator.generate_pdf_report, student_name or "학생")
+                    
+                    totals = [e.get('total_score', 0) for e in evaluations]
+                    summary = {
+                        "문항 수": len(evaluations),
+                        "평균 점수": round(sum(totals) / len(totals), 1) if totals else 0,
+                        "문항별 점수": {f"{i + 1}번": score for i, score in enumerate(totals)},
+                        "문항별 평가": evaluations
+                    }
+                    return summary, report_path
+                
+                exam_grade_btn.click(
+                    grade_exam,
+                    inputs=[exam_sheet, exam_items, exam_student_name],
+                    outputs=[exam_result_output, exam_report_output]
+                )
+        
+        # ===== 시스템 지표 =====
+        with gr.Accordion("📈 시스템 지표", open=False):
+            metrics_refresh_btn = gr.Button("🔄 새로고침", variant="secondary")
+            metrics_output = gr.JSON(label="지표")
+            
+            def metrics_handler():
+                from llm_cache import cache_stats
+                
+                result = metrics.snapshot()
+                result['llm_cache'] = cache_stats()
+                tts_cache = get_tts_cache()
+                if tts_cache is not None:
+                    result['tts_cache'] = tts_cache.stats()
+                router = get_router()
+                if router is not None:
+                    result['llm_router'] = router.snapshot()
+                return result
+            
+            metrics_refresh_btn.click(
+                metrics_handler,
+                outputs=[metrics_output]
+            )
         
         gr.Markdown("""
         ---
@@ -1700,6 +2348,9 @@ def main():
         ╚══════════════════════════════════════════════════════════╝
         """)
         
+        # 비동기 핸들러가 이벤트 루프에서 동시 처리되도록 큐 동시성 상향
+        demo.queue(default_concurrency_limit=int(os.getenv('GRADIO_CONCURRENCY_LIMIT', 100)))
+        
         demo.launch(
             server_name=server_name,
             server_port=port,
@@ -18,16 +18,16 @@ from azure.search.documents.indexes.models import (
     HnswAlgorithmConfiguration,
 )
 from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI
+
+from llm_clients import create_embedding
+from rate_limiter import PRIORITY_BACKGROUND
+from tts_prerender import AUDIO_REF_FIELD, make_audio_ref, schedule_prerender
 
 # Azure 설정
 SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
 SEARCH_KEY = os.getenv("AZURE_SEARCH_KEY")
 INDEX_NAME = "interview-questions"
 
-OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
-
 # 인덱스 생성
 def create_search_index():
     """벡터 검색이 가능한 인덱스 생성"""
@@ -63,7 +63,8 @@ def create_search_index():
             name="id",
             type=SearchFieldDataType.String,
             key=True,
-            filterable=True
+            filterable=True,
+            sortable=True
         ),
         SearchableField(
             name="question",
@@ -104,6 +105,11 @@ def create_search_index():
             type=SearchFieldDataType.Collection(SearchFieldDataType.String),
             filterable=True,
             facetable=True
+        ),
+        # 사전 합성된 질문 음성 참조 (tts_prerender)
+        SimpleField(
+            name=AUDIO_REF_FIELD,
+            type=SearchFieldDataType.String
         )
     ]
     
@@ -260,22 +266,8 @@ SAMPLE_QUESTIONS = [
 
 
 def get_embeddings(texts):
-    """OpenAI로 임베딩 생성"""
-    client = AzureOpenAI(
-        api_key=OPENAI_KEY,
-        api_version="2024-02-15-preview",
-        azure_endpoint=OPENAI_ENDPOINT
-    )
-    
-    embeddings = []
-    for text in texts:
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        embeddings.append(response.data[0].embedding)
-    
-    return embeddings
+    """OpenAI로 임베딩 생성 (공유 클라이언트)"""
+    return [create_embedding(text, priority=PRIORITY_BACKGROUND) for text in texts]
 
 
 def upload_documents():
@@ -296,6 +288,7 @@ def upload_documents():
     for i, question_data in enumerate(SAMPLE_QUESTIONS):
         doc = question_data.copy()
         doc["contentVector"] = embeddings[i]
+        doc[AUDIO_REF_FIELD] = make_audio_ref(doc["id"], doc["question"])
         documents.append(doc)
     
     # 업로드
@@ -305,6 +298,9 @@ def upload_documents():
     success_count = sum(1 for r in result if r.succeeded)
     print(f"업로드 완료: {success_count}/{len(documents)}개 성공")
     
+    # 질문 음성은 백그라운드에서 미리 합성
+    schedule_prerender(documents)
+    
     return result
 
 
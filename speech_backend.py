@@ -0,0 +1,376 @@
+"""
+음성 백엔드 (TTS 합성 + 연속 인식 세션)
+- 앱은 speechsdk를 직접 호출하지 않고 SpeechBackend만 사용
+- AzureSpeechBackend: 사전 연결된 합성기 풀 + PushAudioInputStream 연속 인식 (continuous_stt)
+- FakeSpeechBackend: Azure 없이 부하 테스트/벤치마크용
+  텍스트/음성 내용으로 결정되는 합성 음성(WAV)과 인식 결과, 지연/지터/실패 주입 설정 가능
+
+SPEECH_BACKEND=fake 로 가짜 백엔드 사용 (기본: azure)
+"""
+
+import io
+import os
+import re
+import time
+import wave
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from continuous_stt import BITS_PER_SAMPLE, CHANNELS, SAMPLE_RATE, ContinuousRecognizer, atranscribe_file, transcribe_file
+from speech_pool import PooledSynthesizer, create_synthesizer_pool
+from tts_cache import DEFAULT_TTS_OUTPUT_FORMAT, TTS_OUTPUT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechBackendError(Exception):
+    """음성 백엔드 호출 실패 (가짜 백엔드의 실패 주입 포함)"""
+
+
+class SpeechBackend(ABC):
+    """
+    음성 백엔드 인터페이스
+
+    인식 세션(open_recognizer 반환값)은 ContinuousRecognizer와 같은 메서드를 가짐:
+        start(), write(pcm), close(), cancel(), finish(timeout), await afinish(timeout), text
+    """
+
+    name = "base"
+    voice: Optional[str] = None
+    output_format: str = DEFAULT_TTS_OUTPUT_FORMAT
+
+    @abstractmethod
+    def synthesize(self, text: str, ssml: bool = False) -> Optional[bytes]:
+        """텍스트/SSML → 음성 데이터 (실패 시 None)"""
+
+    @abstractmethod
+    async def asynthesize(self, text: str, ssml: bool = False) -> Optional[bytes]:
+        """synthesize의 비동기 버전"""
+
+    @abstractmethod
+    def open_recognizer(
+        self,
+        on_partial: Optional[Callable[[str], None]] = None,
+        sample_rate: int = SAMPLE_RATE,
+        bits_per_sample: int = BITS_PER_SAMPLE,
+        channels: int = CHANNELS
+    ):
+        """PCM 입력용 연속 인식 세션"""
+
+    @abstractmethod
+    def transcribe_file(self, audio_file: str, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """음성 파일 전체 인식 (PCM WAV가 아닌 형식 포함)"""
+
+    async def atranscribe_file(self, audio_file: str, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        return await asyncio.to_thread(self.transcribe_file, audio_file, on_partial)
+
+    def close(self):
+        pass
+
+
+# ============================================
+# Azure Speech
+# ============================================
+
+class AzureSpeechBackend(SpeechBackend):
+    """Azure Speech SDK 백엔드"""
+
+    name = "azure"
+
+    def __init__(self, speech_config, voice: Optional[str] = None, output_format: str = DEFAULT_TTS_OUTPUT_FORMAT):
+        self.speech_config = speech_config
+        self.voice = voice
+        self.output_format = output_format
+        # 사전 연결된 TTS 합성기 풀 (요청마다 연결 설정 비용 제거)
+        self._synthesizer_pool = create_synthesizer_pool(speech_config)
+
+    @contextmanager
+    def _lease_synthesizer(self):
+        """사전 연결된 합성기 대여 (풀이 없으면 1회용 합성기)"""
+        if self._synthesizer_pool is not None:
+            with self._synthesizer_pool.lease() as synthesizer:
+                yield synthesizer
+            return
+
+        synthesizer = PooledSynthesizer(self.speech_config)
+        try:
+            yield synthesizer
+        finally:
+            synthesizer.close()
+
+    @staticmethod
+    def _audio_data(result, synthesizer: PooledSynthesizer) -> Optional[bytes]:
+        import azure.cognitiveservices.speech as speechsdk
+
+        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+            logger.error(f"❌ TTS 실패: {result.reason}")
+            # 취소/오류가 난 합성기는 풀로 돌려보내지 않음
+            synthesizer.healthy = False
+            return None
+        return result.audio_data
+
+    def synthesize(self, text: str, ssml: bool = False) -> Optional[bytes]:
+        with self._lease_synthesizer() as synthesizer:
+            return self._audio_data(synthesizer.speak(text, ssml=ssml), synthesizer)
+
+    async def asynthesize(self, text: str, ssml: bool = False) -> Optional[bytes]:
+        with self._lease_synthesizer() as synthesizer:
+            return self._audio_data(await synthesizer.aspeak(text, ssml=ssml), synthesizer)
+
+    def open_recognizer(self, on_partial=None, sample_rate=SAMPLE_RATE, bits_per_sample=BITS_PER_SAMPLE, channels=CHANNELS):
+        return ContinuousRecognizer(
+            self.speech_config,
+            on_partial=on_partial,
+            sample_rate=sample_rate,
+            bits_per_sample=bits_per_sample,
+            channels=channels
+        )
+
+    def transcribe_file(self, audio_file: str, on_partial=None) -> Optional[str]:
+        return transcribe_file(self.speech_config, audio_file, on_partial)
+
+    async def atranscribe_file(self, audio_file: str, on_partial=None) -> Optional[str]:
+        return await atranscribe_file(self.speech_config, audio_file, on_partial)
+
+    def close(self):
+        if self._synthesizer_pool is not None:
+            self._synthesizer_pool.close()
+
+
+# ============================================
+# 가짜 백엔드 (부하 테스트)
+# ============================================
+
+# 인식 결과에 쓰는 단어 (음성 내용 해시로 선택 → 같은 음성은 항상 같은 결과)
+FAKE_TRANSCRIPT_WORDS = [
+    "CVD", "증착", "온도", "압력", "플라즈마", "식각", "선택비", "포토레지스트",
+    "노광", "현상", "이온주입", "도핑", "CMP", "평탄화", "박막", "균일도", "수율", "파티클"
+]
+
+FAKE_TTS_SAMPLE_RATE = 16000
+FAKE_SECONDS_PER_CHAR = 0.08
+FAKE_MAX_AUDIO_SECONDS = 30.0
+
+
+def _fake_word(data: bytes) -> str:
+    return FAKE_TRANSCRIPT_WORDS[hashlib.sha256(data).digest()[0] % len(FAKE_TRANSCRIPT_WORDS)]
+
+
+class FakeRecognizer:
+    """ContinuousRecognizer와 같은 인터페이스의 가짜 인식 세션 (음성 1초마다 단어 1개)"""
+
+    def __init__(self, backend: "FakeSpeechBackend", on_partial=None, bytes_per_second: int = SAMPLE_RATE * 2):
+        self.backend = backend
+        self.on_partial = on_partial
+        self.bytes_per_second = bytes_per_second
+        self._segments: List[str] = []
+        self._pending = bytearray()
+        self._closed = False
+        self._audio_bytes = 0
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def text(self) -> str:
+        with self._lock:
+            return " ".join(self._segments)
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        # 서비스 연결 지연
+        time.sleep(self.backend.delay())
+
+    def write(self, chunk: bytes):
+        if not chunk or self._closed:
+            return
+        with self._lock:
+            self._audio_bytes += len(chunk)
+            self._pending.extend(chunk)
+            while len(self._pending) >= self.bytes_per_second:
+                second = bytes(self._pending[:self.bytes_per_second])
+                del self._pending[:self.bytes_per_second]
+                self._segments.append(_fake_word(second))
+        if self.on_partial is not None:
+            self.on_partial(self.text)
+
+    def close(self):
+        self._closed = True
+
+    def cancel(self):
+        self.close()
+        with self._lock:
+            self._pending.clear()
+
+    def _result(self) -> Optional[str]:
+        with self._lock:
+            if self._pending:
+                self._segments.append(_fake_word(bytes(self._pending)))
+                self._pending.clear()
+        audio_seconds = self._audio_bytes / self.bytes_per_second
+        metrics.observe("stt_audio_seconds", audio_seconds)
+        if self._started_at is not None:
+            metrics.observe("stt_seconds", time.perf_counter() - self._started_at, mode="fake")
+
+        if self.backend.should_fail():
+            logger.error("❌ 연속 인식 오류: 가짜 백엔드 실패 주입")
+            return None
+        return self.text.strip() or None
+
+    def finish(self, timeout: float = None) -> Optional[str]:
+        self.close()
+        time.sleep(self.backend.delay())
+        return self._result()
+
+    async def afinish(self, timeout: float = None) -> Optional[str]:
+        self.close()
+        await asyncio.sleep(self.backend.delay())
+        return self._result()
+
+
+class FakeSpeechBackend(SpeechBackend):
+    """
+    Azure 없이 동작하는 가짜 백엔드
+    - 합성: 텍스트 길이에 비례하는 길이의 사인파 WAV (주파수는 텍스트 해시로 결정)
+    - 인식: 음성 내용 해시로 고른 단어열
+    - 호출마다 latency ± jitter 지연, failure_rate 확률로 실패
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = 0,
+        voice: str = "fake-voice"
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.voice = voice
+        self.output_format = "wav"
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeSpeechBackend":
+        seed = os.getenv("FAKE_SPEECH_SEED", "0")
+        return cls(
+            latency=float(os.getenv("FAKE_SPEECH_LATENCY_MS", 200)) / 1000,
+            jitter=float(os.getenv("FAKE_SPEECH_JITTER_MS", 50)) / 1000,
+            failure_rate=float(os.getenv("FAKE_SPEECH_FAILURE_RATE", 0)),
+            seed=int(seed) if seed else None
+        )
+
+    def delay(self) -> float:
+        """이번 호출의 지연 시간 (초)"""
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    @staticmethod
+    def render_audio(text: str) -> bytes:
+        """텍스트 → 결정적인 합성 음성 (16kHz 모노 16bit WAV)"""
+        spoken = re.sub(r"<[^>]+>", "", text).strip()
+        seconds = min(FAKE_MAX_AUDIO_SECONDS, max(0.3, len(spoken) * FAKE_SECONDS_PER_CHAR))
+        frequency = 180 + hashlib.sha256(spoken.encode("utf-8")).digest()[0] % 120
+
+        t = np.arange(int(seconds * FAKE_TTS_SAMPLE_RATE), dtype=np.float32) / FAKE_TTS_SAMPLE_RATE
+        samples = (np.sin(2 * np.pi * frequency * t) * 8000).astype("<i2")
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(FAKE_TTS_SAMPLE_RATE)
+            wav.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+    def _synthesized(self, text: str, started: float) -> bytes:
+        metrics.observe("tts_synthesis_seconds", time.perf_counter() - started, connection="fake")
+        if self.should_fail():
+            raise SpeechBackendError("가짜 백엔드 실패 주입 (TTS)")
+        return self.render_audio(text)
+
+    def synthesize(self, text: str, ssml: bool = False) -> Optional[bytes]:
+        started = time.perf_counter()
+        time.sleep(self.delay())
+        return self._synthesized(text, started)
+
+    async def asynthesize(self, text: str, ssml: bool = False) -> Optional[bytes]:
+        started = time.perf_counter()
+        await asyncio.sleep(self.delay())
+        return self._synthesized(text, started)
+
+    def open_recognizer(self, on_partial=None, sample_rate=SAMPLE_RATE, bits_per_sample=BITS_PER_SAMPLE, channels=CHANNELS):
+        return FakeRecognizer(self, on_partial, bytes_per_second=sample_rate * bits_per_sample // 8 * channels)
+
+    def transcribe_file(self, audio_file: str, on_partial=None) -> Optional[str]:
+        with open(audio_file, "rb") as f:
+            data = f.read()
+        recognizer = FakeRecognizer(self, on_partial, bytes_per_second=max(1, len(data) // 5))
+        recognizer.start()
+        recognizer.write(data)
+        return recognizer.finish()
+
+
+def speech_settings_from_env() -> Optional[Tuple[object, str, str]]:
+    """
+    환경 변수 → (SpeechConfig, 음성 이름, 출력 형식) (Speech 키가 없으면 None)
+    앱(initialize_azure_clients)과 사전 합성(tts_prerender)이 같은 설정을 쓰도록 여기서만 구성
+    """
+    speech_key = os.getenv("AZURE_SPEECH_KEY")
+    if not speech_key:
+        return None
+
+    import azure.cognitiveservices.speech as speechsdk
+
+    speech_config = speechsdk.SpeechConfig(
+        subscription=speech_key,
+        region=os.getenv("AZURE_SPEECH_REGION", "koreacentral")
+    )
+    voice = os.getenv("AZURE_SPEECH_VOICE_NAME", "ko-KR-SunHiNeural")
+    speech_config.speech_synthesis_voice_name = voice
+    speech_config.speech_recognition_language = "ko-KR"
+
+    output_format = os.getenv("AZURE_SPEECH_OUTPUT_FORMAT", DEFAULT_TTS_OUTPUT_FORMAT).lower()
+    if output_format not in TTS_OUTPUT_FORMATS:
+        logger.warning(f"⚠️  지원하지 않는 TTS 출력 형식: {output_format} → {DEFAULT_TTS_OUTPUT_FORMAT} 사용")
+        output_format = DEFAULT_TTS_OUTPUT_FORMAT
+    speech_config.set_speech_synthesis_output_format(
+        getattr(speechsdk.SpeechSynthesisOutputFormat, TTS_OUTPUT_FORMATS[output_format][0])
+    )
+    return speech_config, voice, output_format
+
+
+def create_speech_backend(
+    speech_config=None,
+    voice: Optional[str] = None,
+    output_format: str = DEFAULT_TTS_OUTPUT_FORMAT
+) -> Optional[SpeechBackend]:
+    """SPEECH_BACKEND 설정에 따라 백엔드 생성 (azure인데 speech_config가 없으면 None)"""
+    kind = os.getenv("SPEECH_BACKEND", "azure").lower()
+    if kind == "fake":
+        backend = FakeSpeechBackend.from_env()
+        logger.info(
+            f"🧪 가짜 Speech 백엔드 사용 (지연 {backend.latency * 1000:.0f}±{backend.jitter * 1000:.0f}ms, "
+            f"실패율 {backend.failure_rate:.0%})"
+        )
+        return backend
+
+    if speech_config is None:
+        return None
+    return AzureSpeechBackend(speech_config, voice, output_format)
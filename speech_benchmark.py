@@ -0,0 +1,206 @@
+"""
+음성 경로 동시성 벤치마크 (학습/면접 모드 음성 흐름)
+- 세션마다: 질문 토큰 스트림 → 문장 단위 TTS → 마이크 녹음(48kHz 스테레오) → 16kHz 변환/VAD → 연속 인식 → 피드백 TTS
+- 앱과 같은 모듈(speech_pipeline, audio_ingest, speech_backend)을 그대로 사용
+- 기본은 가짜 백엔드 (Azure 없이 일반 Linux에서 실행), --backend azure로 실제 서비스 측정
+
+실행:
+    python speech_benchmark.py --sessions 200 --concurrency 50
+    python speech_benchmark.py --live --latency-ms 300 --jitter-ms 100 --failure-rate 0.02
+"""
+
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from audio_ingest import LiveTranscriber, atranscribe_pcm, parse_gradio_audio
+from speech_backend import AzureSpeechBackend, FakeSpeechBackend, SpeechBackend, speech_settings_from_env
+from speech_pipeline import stream_with_speech
+
+logger = logging.getLogger(__name__)
+
+BENCH_QUESTIONS = [
+    "CVD 공정에서 온도, 압력, 반응가스 유량이 박막의 증착 속도에 미치는 영향을 설명하세요. 각 변수가 균일도에 주는 영향도 함께 말씀해 주세요.",
+    "PECVD와 LPCVD의 차이점을 비교하고, 각각의 장단점을 설명하세요.",
+    "포토리소그래피 공정의 주요 단계를 순서대로 설명하고, 각 단계의 목적을 기술하세요."
+]
+BENCH_FEEDBACK = (
+    "핵심 개념은 정확하게 설명했습니다. 온도와 압력의 영향은 잘 짚었지만 유량에 대한 설명이 부족합니다. "
+    "다음에는 구체적인 공정 조건 예시를 함께 들어 보세요."
+)
+
+MIC_SAMPLE_RATE = 48000
+MIC_CHUNK_SECONDS = 0.5
+
+
+async def _token_stream(text: str, chunk_chars: int = 4) -> AsyncIterator[str]:
+    """GPT 스트리밍처럼 누적 텍스트를 조금씩 반환"""
+    for end in range(chunk_chars, len(text) + chunk_chars, chunk_chars):
+        yield text[:end]
+        await asyncio.sleep(0)
+
+
+def synthetic_recording(seconds: float, seed: int) -> np.ndarray:
+    """발화(톤)와 쉼이 번갈아 나오는 48kHz 스테레오 int16 녹음"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * MIC_SAMPLE_RATE), dtype=np.float32) / MIC_SAMPLE_RATE
+    voiced = (t % 1.5) < 1.0
+    tone = np.sin(2 * np.pi * (150 + seed % 100) * t) * 6000 * voiced
+    noise = rng.normal(0, 30, t.size)
+    mono = (tone + noise).astype(np.int16)
+    return np.stack([mono, mono], axis=1)
+
+
+class _Recorder:
+    """단계별 소요 시간/실패 수 집계"""
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: Optional[float]):
+        if seconds is not None:
+            self.timings.setdefault(stage, []).append(seconds)
+
+    def fail(self, stage: str):
+        self.failures[stage] = self.failures.get(stage, 0) + 1
+
+    def summary(self) -> Dict:
+        stages = {}
+        for stage, values in self.timings.items():
+            data = np.asarray(values) * 1000
+            stages[stage] = {
+                "count": len(values),
+                "p50_ms": round(float(np.percentile(data, 50)), 1),
+                "p95_ms": round(float(np.percentile(data, 95)), 1),
+                "p99_ms": round(float(np.percentile(data, 99)), 1),
+                "max_ms": round(float(data.max()), 1)
+            }
+        return {"stages": stages, "failures": self.failures}
+
+
+async def _speak(speech: SpeechBackend, text: str, stage: str, recorder: _Recorder, max_concurrency: int):
+    """문장 단위 TTS 파이프라인 → 첫 음성/전체 소요 시간"""
+
+    async def synthesize(sentence: str) -> Optional[bytes]:
+        try:
+            return await speech.asynthesize(sentence)
+        except Exception:
+            recorder.fail(f"{stage}_tts")
+            raise
+
+    started = time.perf_counter()
+    first_audio = None
+    async for _, segment in stream_with_speech(_token_stream(text), lambda item: item, synthesize, max_concurrency):
+        if segment and first_audio is None:
+            first_audio = time.perf_counter() - started
+    recorder.observe(f"{stage}_first_audio", first_audio)
+    recorder.observe(f"{stage}_total", time.perf_counter() - started)
+
+
+async def _transcribe(speech: SpeechBackend, recording: np.ndarray, live: bool, recorder: _Recorder) -> Optional[str]:
+    """
+    답변 인식
+    live=False: 녹음 종료 후 변환/VAD/인식 (제출 → 텍스트까지)
+    live=True: 녹음 중 0.5초 조각을 실시간 입력, 녹음 종료 → 최종 텍스트까지
+    """
+    if not live:
+        started = time.perf_counter()
+        _, pcm = await asyncio.to_thread(parse_gradio_audio, (MIC_SAMPLE_RATE, recording))
+        text = await atranscribe_pcm(speech, pcm) if pcm else None
+        recorder.observe("answer_stt", time.perf_counter() - started)
+        return text
+
+    transcriber = LiveTranscriber(speech)
+    chunk = int(MIC_SAMPLE_RATE * MIC_CHUNK_SECONDS)
+    for start in range(0, len(recording), chunk):
+        await asyncio.to_thread(transcriber.feed, MIC_SAMPLE_RATE, recording[start:start + chunk])
+    started = time.perf_counter()
+    text = await transcriber.afinish()
+    recorder.observe("answer_stt_after_stop", time.perf_counter() - started)
+    return text
+
+
+async def run_session(speech: SpeechBackend, index: int, args, recorder: _Recorder):
+    started = time.perf_counter()
+    await _speak(speech, BENCH_QUESTIONS[index % len(BENCH_QUESTIONS)], "question", recorder, args.tts_concurrency)
+
+    text = await _transcribe(speech, synthetic_recording(args.answer_seconds, seed=index), args.live, recorder)
+    if not text:
+        recorder.fail("answer_stt")
+
+    await _speak(speech, BENCH_FEEDBACK, "feedback", recorder, args.tts_concurrency)
+    recorder.observe("session_total", time.perf_counter() - started)
+
+
+async def run_benchmark(speech: SpeechBackend, args) -> Dict:
+    recorder = _Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(index: int):
+        async with semaphore:
+            try:
+                await run_session(speech, index, args, recorder)
+            except Exception as e:
+                logger.warning(f"⚠️  세션 {index} 실패: {e}")
+                recorder.fail("session")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "backend": speech.name,
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "live": args.live,
+        "elapsed_s": round(elapsed, 2),
+        "sessions_per_s": round(args.sessions / elapsed, 2),
+        **recorder.summary()
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="음성 경로 동시성 벤치마크")
+    parser.add_argument("--backend", choices=["fake", "azure"], default="fake")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 세션 수")
+    parser.add_argument("--tts-concurrency", type=int, default=3, help="세션당 동시 문장 합성 수")
+    parser.add_argument("--answer-seconds", type=float, default=8.0, help="답변 녹음 길이")
+    parser.add_argument("--live", action="store_true", help="녹음 중 실시간 인식 경로 측정")
+    parser.add_argument("--latency-ms", type=float, default=200, help="가짜 백엔드 호출 지연")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="가짜 백엔드 지연 편차")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="가짜 백엔드 실패 확률")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.backend == "fake":
+        speech = FakeSpeechBackend(
+            latency=args.latency_ms / 1000,
+            jitter=args.jitter_ms / 1000,
+            failure_rate=args.failure_rate,
+            seed=args.seed
+        )
+    else:
+        settings = speech_settings_from_env()
+        if settings is None:
+            parser.error("AZURE_SPEECH_KEY가 설정되지 않았습니다")
+        speech_config, voice, output_format = settings
+        speech = AzureSpeechBackend(speech_config, voice=voice, output_format=output_format)
+
+    try:
+        result = asyncio.run(run_benchmark(speech, args))
+    finally:
+        speech.close()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
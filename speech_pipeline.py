@@ -0,0 +1,158 @@
+"""
+GPT 스트림 → 문장 단위 TTS 파이프라인
+- 스트리밍 텍스트를 한국어 문장 경계에서 자름
+- 완성된 문장은 뒤 토큰이 생성되는 동안 바로 음성 합성 시작
+- 합성된 음성 조각은 문장 순서대로 플레이어에 전달
+  → 첫 음성이 전체 생성 완료가 아니라 첫 문장 생성 직후 재생됨
+"""
+
+import re
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar, Union
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 음성 조각: 메모리 음성 데이터(bytes) 또는 파일 경로
+AudioSegment = Union[bytes, str]
+
+# 문장 끝 부호(+닫는 따옴표/괄호) 뒤에 공백이 오면 경계로 확정 ("1.5" 같은 소수점은 제외됨)
+_SENTENCE_END = re.compile(r'[.!?。？！…]+["\'”’)\]]*(?=\s)|\n+')
+
+MIN_SENTENCE_CHARS = 8
+
+
+class SentenceSplitter:
+    """스트리밍 텍스트를 받아 완성된 문장만 반환"""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """텍스트 조각 추가 → 새로 완성된 문장 목록 (너무 짧은 문장은 다음 문장과 합침)"""
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """스트림 종료 시 남은 텍스트"""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest or None
+
+
+async def stream_with_speech(
+    items: AsyncIterator[T],
+    text_of: Callable[[T], str],
+    synthesize: Callable[[str], Awaitable[Optional[AudioSegment]]],
+    max_concurrency: int = 3,
+    prerendered: Optional[Callable[[str], Optional[AudioSegment]]] = None
+) -> AsyncIterator[Tuple[T, Optional[AudioSegment]]]:
+    """
+    누적 텍스트 스트림에 문장 단위 음성 합성을 겹쳐 실행
+
+    Args:
+        items: 생성 스트림 (예: (누적 질문, context) 튜플)
+        text_of: 항목에서 누적 텍스트를 꺼내는 함수
+        synthesize: 문장 → 음성 데이터(bytes) 또는 파일 경로 (비동기)
+        max_concurrency: 동시에 합성할 최대 문장 수
+        prerendered: 전체 텍스트 → 미리 합성된 음성 (있으면 문장 합성 없이 바로 사용, 예: 문제 은행 질문)
+
+    Yields:
+        (항목, 새로 준비된 음성 조각 또는 None)
+        스트림이 끝난 뒤 남은 음성 조각은 마지막 항목과 함께 반환
+    """
+    splitter = SentenceSplitter()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    pending: List[asyncio.Task] = []
+    spoken = ""
+    start = time.perf_counter()
+    first_audio = True
+
+    async def synthesize_bounded(sentence: str) -> Optional[AudioSegment]:
+        async with semaphore:
+            return await synthesize(sentence)
+
+    def schedule(sentences: List[str]):
+        for sentence in sentences:
+            pending.append(asyncio.ensure_future(synthesize_bounded(sentence)))
+
+    def pop_ready() -> List[Optional[AudioSegment]]:
+        """앞에서부터 완료된 합성 결과만 순서대로 꺼냄"""
+        ready = []
+        while pending and pending[0].done():
+            task = pending.pop(0)
+            try:
+                ready.append(task.result())
+            except Exception as e:
+                logger.error(f"❌ 문장 음성 합성 오류: {e}")
+        return ready
+
+    def mark_first(segment: Optional[AudioSegment]):
+        nonlocal first_audio
+        if segment and first_audio:
+            first_audio = False
+            metrics.observe("tts_first_audio_seconds", time.perf_counter() - start)
+
+    last_item = None
+    try:
+        async for item in items:
+            last_item = item
+            text = text_of(item) or ""
+
+            audio = prerendered(text) if prerendered is not None and text and text != spoken else None
+            if audio:
+                # 텍스트 전체의 음성이 이미 있음 → 문장 분할/합성 생략
+                splitter = SentenceSplitter()
+                ready = asyncio.get_running_loop().create_future()
+                ready.set_result(audio)
+                pending.append(ready)
+            else:
+                if text.startswith(spoken):
+                    delta = text[len(spoken):]
+                else:
+                    # 누적 텍스트가 교체된 경우 (예: 실패 메시지) 새로 시작
+                    splitter = SentenceSplitter()
+                    delta = text
+                schedule(splitter.feed(delta))
+            spoken = text
+
+            segments = [s for s in pop_ready() if s]
+            if not segments:
+                yield item, None
+            for segment in segments:
+                mark_first(segment)
+                yield item, segment
+
+        rest = splitter.flush()
+        if rest:
+            schedule([rest])
+
+        # 남은 조각은 순서대로 기다려서 전달
+        while pending:
+            task = pending.pop(0)
+            try:
+                segment = await task
+            except Exception as e:
+                logger.error(f"❌ 문장 음성 합성 오류: {e}")
+                continue
+            if segment:
+                mark_first(segment)
+                yield last_item, segment
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,215 @@
+"""
+사전 연결된 SpeechSynthesizer 풀
+- 요청마다 SpeechSynthesizer 생성 + 서비스 연결(WebSocket/TLS) 비용을 내지 않도록
+  연결을 미리 열어 둔(Connection.open) 합성기를 요청 단위로 대여/반납
+- 합성 결과는 파일이 아닌 메모리(result.audio_data)로 받음 (audio_config=None → 합성기 재사용 가능)
+- 연결 끊김/합성 오류가 난 합성기는 폐기하고, 오래 쉬었거나 끊긴 연결은 백그라운드에서 다시 엶
+- 대여(사전 연결/콜드)/폐기 횟수와 합성 시간을 metrics에 기록
+
+SpeechRecognizer는 생성 시 입력 오디오(AudioConfig)에 묶이므로 풀링하지 않음 (SpeechConfig만 공유)
+SPEECH_POOL_SIZE=0 으로 비활성화
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDLE_SECONDS = 240.0
+
+
+class PooledSynthesizer:
+    """연결을 유지하는 SpeechSynthesizer 1개 (한 번에 한 요청만 사용)"""
+
+    def __init__(self, speech_config):
+        import azure.cognitiveservices.speech as speechsdk
+
+        self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        self.connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        self.connected = False
+        self.healthy = True
+        self.last_used = time.monotonic()
+        self._waiter = None
+
+        # 이벤트 핸들러는 한 번만 연결하고, 현재 요청의 대기자에게 전달
+        self.synthesizer.synthesis_completed.connect(self._on_result)
+        self.synthesizer.synthesis_canceled.connect(self._on_result)
+        self.connection.connected.connect(self._on_connected)
+        self.connection.disconnected.connect(self._on_disconnected)
+
+    def _on_connected(self, evt):
+        self.connected = True
+
+    def _on_disconnected(self, evt):
+        self.connected = False
+
+    def _on_result(self, evt):
+        waiter = self._waiter
+        if waiter is not None:
+            waiter(evt.result)
+
+    def open(self):
+        """서비스 연결을 미리 엶 (첫 합성의 연결 지연 제거)"""
+        self.connection.open(True)
+        self.connected = True
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+    def _start(self, text: str, ssml: bool):
+        if ssml:
+            return self.synthesizer.speak_ssml_async(text)
+        return self.synthesizer.speak_text_async(text)
+
+    def _observe(self, started: float, warm: bool):
+        self.last_used = time.monotonic()
+        metrics.observe("tts_synthesis_seconds", self.last_used - started, connection="warm" if warm else "cold")
+
+    def speak(self, text: str, ssml: bool = False):
+        """동기 합성 → SpeechSynthesisResult"""
+        started, warm = time.monotonic(), self.connected
+        try:
+            return self._start(text, ssml).get()
+        finally:
+            self._observe(started, warm)
+
+    async def aspeak(self, text: str, ssml: bool = False):
+        """비동기 합성 (완료 이벤트를 await, 워커 스레드 점유 없음)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(result):
+            def set_result():
+                if not future.done():
+                    future.set_result(result)
+            loop.call_soon_threadsafe(set_result)
+
+        self._waiter = resolve
+        started, warm = time.monotonic(), self.connected
+        # SDK가 작업을 끝낼 때까지 ResultFuture 참조 유지
+        pending = self._start(text, ssml)
+        try:
+            return await future
+        finally:
+            self._waiter = None
+            self._observe(started, warm)
+            del pending
+
+
+class SynthesizerPool:
+    """PooledSynthesizer 대여/반납 풀"""
+
+    def __init__(self, speech_config, size: int = 3, max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS):
+        self.speech_config = speech_config
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = deque()
+        self._lock = threading.Lock()
+        # 연결 열기는 요청 경로 밖에서 수행
+        self._opener = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speech-pool")
+
+    def _create(self) -> PooledSynthesizer:
+        return PooledSynthesizer(self.speech_config)
+
+    def _open_and_return(self, synthesizer: Optional[PooledSynthesizer] = None):
+        try:
+            synthesizer = synthesizer or self._create()
+            synthesizer.open()
+        except Exception as e:
+            logger.warning(f"⚠️  Speech 연결 사전 준비 실패: {e}")
+            return
+        self._put(synthesizer)
+
+    def _put(self, synthesizer: PooledSynthesizer):
+        with self._lock:
+            if len(self._idle) < self.size:
+                synthesizer.last_used = time.monotonic()
+                self._idle.append(synthesizer)
+                metrics.set_gauge("speech_pool_idle", len(self._idle))
+                return
+        synthesizer.close()
+
+    def warm(self):
+        """풀 크기만큼 합성기를 만들어 연결을 미리 엶 (백그라운드)"""
+        with self._lock:
+            missing = self.size - len(self._idle)
+        for _ in range(missing):
+            self._opener.submit(self._open_and_return)
+        if missing > 0:
+            logger.info(f"🔥 Speech 합성기 {missing}개 사전 연결 시작")
+
+    def acquire(self) -> PooledSynthesizer:
+        """연결된 합성기 대여 (없으면 새로 생성 - 첫 합성에서 연결)"""
+        with self._lock:
+            while self._idle:
+                synthesizer = self._idle.pop()
+                metrics.set_gauge("speech_pool_idle", len(self._idle))
+                if synthesizer.healthy:
+                    if not synthesizer.connected or time.monotonic() - synthesizer.last_used > self.max_idle_seconds:
+                        # 서비스가 닫았을 수 있는 연결 → 다음 요청을 위해 백그라운드로 다시 엶
+                        self._opener.submit(self._open_and_return, synthesizer)
+                        continue
+                    metrics.increment("speech_pool_leases", kind="warm")
+                    return synthesizer
+                synthesizer.close()
+
+        metrics.increment("speech_pool_leases", kind="cold")
+        return self._create()
+
+    def release(self, synthesizer: PooledSynthesizer, healthy: bool = True):
+        """반납 (오류가 난 합성기는 폐기 후 새 합성기 준비)"""
+        if healthy and synthesizer.healthy:
+            self._put(synthesizer)
+            return
+        synthesizer.healthy = False
+        synthesizer.close()
+        metrics.increment("speech_pool_discards")
+        self._opener.submit(self._open_and_return)
+
+    @contextmanager
+    def lease(self):
+        """with pool.lease() as synthesizer: ... (예외 발생 시 합성기 폐기)"""
+        synthesizer = self.acquire()
+        try:
+            yield synthesizer
+        except BaseException:
+            self.release(synthesizer, healthy=False)
+            raise
+        self.release(synthesizer)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for synthesizer in idle:
+            synthesizer.close()
+        self._opener.shutdown(wait=False)
+
+
+def create_synthesizer_pool(speech_config) -> Optional[SynthesizerPool]:
+    """설정에 따라 합성기 풀 생성 후 사전 연결 (SPEECH_POOL_SIZE=0이면 None)"""
+    if speech_config is None:
+        return None
+
+    size = int(os.getenv("SPEECH_POOL_SIZE", os.getenv("TTS_MAX_CONCURRENCY", 3)))
+    if size <= 0:
+        return None
+
+    pool = SynthesizerPool(
+        speech_config,
+        size=size,
+        max_idle_seconds=float(os.getenv("SPEECH_POOL_MAX_IDLE", DEFAULT_MAX_IDLE_SECONDS))
+    )
+    pool.warm()
+    return pool
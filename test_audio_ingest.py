@@ -0,0 +1,154 @@
+"""audio_ingest VAD 테스트 (python -m pytest -q)"""
+
+import numpy as np
+
+from audio_ingest import MAX_PAUSE_MS, MIN_SPEECH_SECONDS, VoiceActivityDetector, prepare_pcm
+from continuous_stt import SAMPLE_RATE
+
+
+def _noise(seconds: float, level: float = 0.001, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(SAMPLE_RATE * seconds)) * level).astype(np.float32)
+
+
+def _tone(seconds: float, freq: float = 220.0, level: float = 0.3) -> np.ndarray:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * freq * t) * level).astype(np.float32)
+
+
+def test_single_click_is_rejected():
+    """잡음 속 30ms 클릭 하나는 행오버로 늘어나도 발화로 보지 않음"""
+    samples = _noise(2.0)
+    start = SAMPLE_RATE  # 프레임 경계 (1초 지점)
+    samples[start:start + SAMPLE_RATE * 30 // 1000] = 0.5
+
+    vad = VoiceActivityDetector()
+    vad.process(samples)
+    assert vad.speech_seconds < MIN_SPEECH_SECONDS
+    assert vad.output_frames > vad.speech_frames  # 행오버 프레임은 잘라낸 길이에만 포함
+
+    assert prepare_pcm(SAMPLE_RATE, samples) == b""
+
+
+def test_speech_is_trimmed_not_rejected():
+    samples = np.concatenate([_noise(1.0), _tone(1.0), _noise(1.0, seed=1)])
+
+    pcm = prepare_pcm(SAMPLE_RATE, samples)
+    seconds = len(pcm) / 2 / SAMPLE_RATE
+    assert 1.0 <= seconds < 2.0
+
+
+def _write_wav(path, samples: np.ndarray):
+    import wave
+    from audio_ingest import to_pcm16
+
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(to_pcm16(samples))
+
+
+class _RecordingBackend:
+    """open_recognizer 호출과 입력 조각만 기록하는 테스트용 백엔드"""
+
+    def __init__(self):
+        self.writes = []
+        self.cancelled = False
+
+    def open_recognizer(self, on_partial=None):
+        return self
+
+    def start(self):
+        pass
+
+    def write(self, chunk: bytes):
+        self.writes.append(len(chunk))
+
+    def cancel(self):
+        self.cancelled = True
+
+    def finish(self):
+        return f"{sum(self.writes)} bytes"
+
+
+def test_wav_file_is_fed_in_chunks(tmp_path):
+    from audio_ingest import transcribe_wav_file
+
+    path = tmp_path / "answer.wav"
+    _write_wav(path, np.concatenate([_noise(1.0), _tone(3.0), _noise(1.0, seed=1)]))
+
+    backend = _RecordingBackend()
+    assert transcribe_wav_file(backend, str(path)) is not None
+    assert len(backend.writes) >= 3
+    # 조각 하나는 입력 1초 + 보류했던 쉼 구간(MAX_PAUSE_MS) 이하
+    assert max(backend.writes) <= (SAMPLE_RATE + SAMPLE_RATE * MAX_PAUSE_MS // 1000) * 2
+    assert not backend.cancelled
+
+
+def test_wav_file_click_cancels_recognizer(tmp_path):
+    from audio_ingest import transcribe_wav_file
+
+    samples = _noise(2.0)
+    samples[SAMPLE_RATE:SAMPLE_RATE + SAMPLE_RATE * 30 // 1000] = 0.5
+    path = tmp_path / "click.wav"
+    _write_wav(path, samples)
+
+    backend = _RecordingBackend()
+    assert transcribe_wav_file(backend, str(path)) is None
+    assert backend.cancelled
+
+
+def test_live_transcriber_finish_during_start_closes_session():
+    """feed가 인식기를 여는 중에 afinish가 호출돼도 세션이 남지 않음"""
+    import asyncio
+    import threading
+    import time
+
+    from audio_ingest import LiveTranscriber
+
+    class SlowStartBackend(_RecordingBackend):
+        def __init__(self):
+            super().__init__()
+            self.started = threading.Event()
+            self.closed = False
+
+        def open_recognizer(self, on_partial=None):
+            self.started.set()
+            time.sleep(0.2)
+            return self
+
+        text = ""
+
+        async def afinish(self):
+            self.closed = True
+            return "answer"
+
+    backend = SlowStartBackend()
+    transcriber = LiveTranscriber(backend)
+    samples = np.concatenate([_noise(0.5), _tone(1.0)])
+    feeder = threading.Thread(target=transcriber.feed, args=(SAMPLE_RATE, samples))
+    feeder.start()
+    backend.started.wait(1)
+
+    asyncio.run(transcriber.afinish())
+    feeder.join()
+    assert transcriber.finished
+    assert backend.closed or backend.cancelled
+
+
+def test_live_transcriber_rejects_short_noise_burst():
+    """실시간 경로도 클릭 하나로 열린 인식 세션은 결과 없이 취소"""
+    import asyncio
+
+    from audio_ingest import LiveTranscriber
+
+    samples = _noise(2.0)
+    samples[SAMPLE_RATE:SAMPLE_RATE + SAMPLE_RATE * 30 // 1000] = 0.5
+
+    backend = _RecordingBackend()
+    transcriber = LiveTranscriber(backend)
+    transcriber.feed(SAMPLE_RATE, samples)
+
+    assert asyncio.run(transcriber.afinish()) is None
+    assert backend.cancelled
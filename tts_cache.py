@@ -0,0 +1,244 @@
+"""
+TTS 음성 파일 캐시 (내용 주소 방식)
+- 키: (텍스트, 음성 이름, SSML/운율, 출력 형식) 해시 → 같은 문장은 한 번만 합성
+- 전용 디렉터리에 저장, 전체 용량(bytes) 기준 LRU 삭제
+- 자주 쓰는 음성은 메모리에도 보관 (get_bytes 적중 시 디스크 읽기 없음)
+- 적중 시 합성 없이 파일 경로/음성 데이터를 바로 반환 (Speech 비용/지연 0)
+- 적중/미스/삭제 횟수를 metrics에 기록
+
+TTS_CACHE_ENABLED=false 로 비활성화
+"""
+
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# TTS 출력 형식 (AZURE_SPEECH_OUTPUT_FORMAT) → (SpeechSynthesisOutputFormat 이름, 파일 확장자)
+# 압축 형식은 16bit PCM WAV 대비 약 1/10 크기
+TTS_OUTPUT_FORMATS = {
+    "mp3": ("Audio24Khz48KBitRateMonoMp3", ".mp3"),
+    "opus": ("Ogg24Khz16BitMonoOpus", ".ogg"),
+    "wav": ("Riff24Khz16BitMonoPcm", ".wav")
+}
+DEFAULT_TTS_OUTPUT_FORMAT = "mp3"
+
+
+def make_audio_key(
+    text: str,
+    voice: Optional[str],
+    ssml: Optional[str] = None,
+    output_format: Optional[str] = None
+) -> str:
+    """합성 요청 내용의 SHA-256 해시"""
+    payload = "\x1f".join([text or "", voice or "", ssml or "", output_format or ""])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """디렉터리 기반 음성 파일 캐시 (전체 용량 상한, LRU 삭제)"""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 500 * 1024 * 1024,
+        memory_max_bytes: int = 32 * 1024 * 1024
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # 파일명 → (경로, 크기)
+        self._total_bytes = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()  # 파일명 → 음성 데이터
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """기존 파일을 최근 사용 순서로 등록 (재시작 후에도 캐시 유지)"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, path, stat.st_size))
+
+        for _, name, path, size in sorted(files):
+            self._entries[name] = (path, size)
+            self._total_bytes += size
+
+        if files:
+            logger.info(f"✅ TTS 캐시 로드: {len(files)}개 ({self._total_bytes / 1024 / 1024:.1f}MB)")
+        self._evict()
+
+    @staticmethod
+    def _file_name(key: str, suffix: str) -> str:
+        return f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ".wav") -> Optional[str]:
+        """캐시된 음성 파일 경로 (없으면 None)"""
+        name = self._file_name(key, suffix)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+
+        if entry is not None and os.path.exists(entry[0]):
+            try:
+                # 다른 프로세스/재시작 후에도 LRU 순서가 유지되도록 수정 시각 갱신
+                os.utime(entry[0])
+            except OSError:
+                pass
+            metrics.increment("tts_cache_hits", tier="disk")
+            return entry[0]
+
+        if entry is not None:
+            self._forget(name)
+        metrics.increment("tts_cache_misses")
+        return None
+
+    def get_bytes(self, key: str, suffix: str = ".wav") -> Optional[bytes]:
+        """캐시된 음성 데이터 (메모리 → 디스크 순, 디스크 적중 시 메모리로 승격)"""
+        name = self._file_name(key, suffix)
+        with self._lock:
+            data = self._memory.get(name)
+            if data is not None:
+                self._memory.move_to_end(name)
+                if name in self._entries:
+                    self._entries.move_to_end(name)
+        if data is not None:
+            metrics.increment("tts_cache_hits", tier="memory")
+            return data
+
+        path = self.get(key, suffix)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self._forget(name)
+            return None
+        self._remember(name, data)
+        return data
+
+    def _remember(self, name: str, data: bytes):
+        with self._lock:
+            previous = self._memory.pop(name, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            if len(data) > self.memory_max_bytes:
+                return
+            self._memory[name] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def put_file(self, key: str, source_path: str, suffix: str = ".wav") -> str:
+        """합성된 파일을 캐시 디렉터리로 이동 후 캐시 경로 반환"""
+        name = self._file_name(key, suffix)
+        path = os.path.join(self.cache_dir, name)
+        shutil.move(source_path, path)
+        self._register(name, path, os.path.getsize(path))
+        return path
+
+    def put_bytes(self, key: str, data: bytes, suffix: str = ".wav") -> str:
+        """음성 데이터를 캐시에 저장 후 캐시 경로 반환 (임시 파일 교체 방식)"""
+        name = self._file_name(key, suffix)
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._register(name, path, len(data))
+        self._remember(name, data)
+        return path
+
+    def _register(self, name: str, path: str, size: int):
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[name] = (path, size)
+            self._total_bytes += size
+        self._evict()
+
+    def _forget(self, name: str):
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._total_bytes -= entry[1]
+            data = self._memory.pop(name, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+
+    def _evict(self):
+        """전체 용량이 상한을 넘으면 오래 사용하지 않은 파일부터 삭제"""
+        removed = []
+        with self._lock:
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                name, (path, size) = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                removed.append(path)
+                data = self._memory.pop(name, None)
+                if data is not None:
+                    self._memory_bytes -= len(data)
+            metrics.set_gauge("tts_cache_bytes", self._total_bytes)
+
+        for path in removed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if removed:
+            metrics.increment("tts_cache_evictions", len(removed))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes
+            }
+
+
+_cache: Optional[AudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> Optional[AudioCache]:
+    """공유 TTS 캐시 (비활성화 또는 디렉터리 생성 실패 시 None)"""
+    global _cache
+
+    if os.getenv("TTS_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache_dir = os.getenv("TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "tts-cache")
+                try:
+                    _cache = AudioCache(
+                        cache_dir,
+                        max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", 500)) * 1024 * 1024),
+                        memory_max_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", 32)) * 1024 * 1024)
+                    )
+                    logger.info(f"✅ TTS 캐시 활성화: {cache_dir}")
+                except OSError as e:
+                    logger.warning(f"⚠️  TTS 캐시 디렉터리 생성 실패: {e}")
+                    return None
+    return _cache
@@ -0,0 +1,261 @@
+"""
+문제 은행 질문 음성 사전 합성 (백그라운드 작업)
+- 시드/업로드된 질문의 음성을 미리 합성해 (질문 id, 음성) 단위로 저장
+- 인덱스 문서의 audio_ref 필드에 음성 참조를 기록 → 재생 시 검색 결과에서 찾아 합성 없이 바로 재생
+- audio_ref = 질문 id + 질문 텍스트 해시 (질문이 수정되면 참조가 바뀌어 다시 합성)
+- 저장 위치: TTS_PRERENDER_DIR/<음성 이름>/<audio_ref><확장자>
+  (LRU 캐시와 별도 디렉터리, 용량 초과로 삭제되지 않음)
+
+실행:
+    python tts_prerender.py                              # AZURE_SEARCH_INDEX 전체
+    python tts_prerender.py --index interview-questions  # 다른 인덱스
+
+TTS_PRERENDER_ENABLED=false 로 업로드 후 자동 사전 합성 비활성화
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+import metrics
+from speech_backend import SpeechBackend, create_speech_backend, speech_settings_from_env
+from tts_cache import TTS_OUTPUT_FORMATS
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+AUDIO_REF_FIELD = "audio_ref"
+DEFAULT_PRERENDER_DIR = "prerendered_audio"
+
+
+def make_audio_ref(question_id, question: str) -> str:
+    """질문 id + 질문 텍스트 해시 → 음성 참조 (파일 이름으로 안전한 문자만 사용)"""
+    safe_id = re.sub(r"[^0-9A-Za-z_-]", "_", str(question_id))
+    digest = hashlib.sha256((question or "").encode("utf-8")).hexdigest()[:12]
+    return f"q{safe_id}-{digest}"
+
+
+def prerender_dir() -> str:
+    return os.getenv("TTS_PRERENDER_DIR", DEFAULT_PRERENDER_DIR)
+
+
+def prerendered_path(audio_ref: str, voice: Optional[str], suffix: str) -> str:
+    safe_voice = re.sub(r"[^0-9A-Za-z_-]", "_", voice or "default")
+    return os.path.join(prerender_dir(), safe_voice, f"{audio_ref}{suffix}")
+
+
+def find_prerendered(audio_ref: Optional[str], voice: Optional[str], suffix: str) -> Optional[str]:
+    """사전 합성된 음성 파일 경로 (없으면 None)"""
+    if not audio_ref:
+        return None
+    path = prerendered_path(audio_ref, voice, suffix)
+    if os.path.exists(path):
+        metrics.increment("tts_cache_hits", tier="prerendered")
+        return path
+    return None
+
+
+def load_prerendered(audio_ref: Optional[str], voice: Optional[str], suffix: str) -> Optional[bytes]:
+    """사전 합성된 음성 데이터 (없으면 None)"""
+    path = find_prerendered(audio_ref, voice, suffix)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class QuestionPrerenderer:
+    """질문 목록 → 음성 파일 (이미 합성된 질문은 건너뜀, 음성 백엔드로 동시 합성)"""
+
+    def __init__(self, speech: SpeechBackend, concurrency: int = 4):
+        self.speech = speech
+        self.voice = speech.voice
+        self.suffix = TTS_OUTPUT_FORMATS[speech.output_format][1]
+        self.concurrency = max(1, concurrency)
+
+    def _render_one(self, question: str, path: str) -> bool:
+        audio_data = self.speech.synthesize(question)
+        if audio_data is None:
+            logger.warning(f"⚠️  질문 음성 사전 합성 실패: {question[:30]}...")
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio_data)
+        os.replace(tmp_path, path)
+        return True
+
+    def render(self, documents: Iterable[Dict]) -> Dict:
+        """
+        문서({"id", "question", ...}) 목록의 질문 음성 합성
+
+        Returns:
+            {'rendered', 'skipped', 'failed', 'refs': {문서 id: audio_ref}}
+        """
+        refs: Dict[str, str] = {}
+        jobs = []
+        skipped = 0
+        for doc in documents:
+            if not doc.get("id") or not doc.get("question"):
+                continue
+            audio_ref = make_audio_ref(doc["id"], doc["question"])
+            refs[str(doc["id"])] = audio_ref
+            path = prerendered_path(audio_ref, self.voice, self.suffix)
+            if os.path.exists(path):
+                skipped += 1
+            else:
+                jobs.append((doc["question"], path))
+
+        rendered = failed = 0
+        if jobs:
+            logger.info(f"🔊 질문 음성 사전 합성 시작: {len(jobs)}개 (이미 있음 {skipped}개)")
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="tts-prerender") as executor:
+                futures = [executor.submit(self._render_one, question, path) for question, path in jobs]
+                for future in futures:
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        logger.warning(f"⚠️  질문 음성 사전 합성 오류: {e}")
+                        ok = False
+                    if ok:
+                        rendered += 1
+                    else:
+                        failed += 1
+
+        metrics.increment("tts_prerendered", rendered)
+        logger.info(f"✅ 질문 음성 사전 합성 완료: 합성 {rendered}개, 건너뜀 {skipped}개, 실패 {failed}개")
+        return {"rendered": rendered, "skipped": skipped, "failed": failed, "refs": refs}
+
+    def close(self):
+        self.speech.close()
+
+
+def create_prerenderer() -> Optional[QuestionPrerenderer]:
+    """환경 변수 설정으로 사전 합성기 생성 (Speech 키가 없으면 None, SPEECH_BACKEND=fake면 가짜 백엔드)"""
+    settings = speech_settings_from_env()
+    if settings is None:
+        speech = create_speech_backend()
+    else:
+        speech_config, voice, output_format = settings
+        speech = create_speech_backend(speech_config, voice=voice, output_format=output_format)
+
+    if speech is None:
+        logger.warning("⚠️  Azure Speech 키가 없어 질문 음성 사전 합성을 건너뜁니다")
+        return None
+    return QuestionPrerenderer(speech, concurrency=int(os.getenv("TTS_PRERENDER_CONCURRENCY", 4)))
+
+
+# ============================================
+# 인덱스 문서
+# ============================================
+
+def _write_audio_refs(search_client, refs: Dict[str, str], batch_size: int = 500) -> int:
+    """인덱스 문서에 audio_ref 기록 (다른 필드는 유지)"""
+    updates = [{"id": doc_id, AUDIO_REF_FIELD: audio_ref} for doc_id, audio_ref in refs.items()]
+    success_count = 0
+    for start in range(0, len(updates), batch_size):
+        result = search_client.merge_documents(documents=updates[start:start + batch_size])
+        success_count += sum(1 for r in result if r.succeeded)
+    return success_count
+
+
+def prerender_index(index_name: Optional[str] = None, page_size: int = 1000) -> Dict:
+    """
+    인덱스의 모든 질문 음성을 사전 합성하고 문서에 audio_ref 기록
+
+    audio_ref 필드가 없는 (이전 스키마) 인덱스도 음성은 합성됨 -
+    재생 시 문서 id와 질문으로 같은 참조를 계산해서 찾음
+    """
+    from index_snapshot import get_search_client, iter_index_documents, supports_id_cursor
+
+    index_name = index_name or os.getenv("AZURE_SEARCH_INDEX", "semiconductor-knowledge")
+    prerenderer = create_prerenderer()
+    if prerenderer is None:
+        return {"index_name": index_name, "rendered": 0, "skipped": 0, "failed": 0, "refs_written": 0}
+
+    search_client = get_search_client(index_name)
+    try:
+        documents = list(iter_index_documents(
+            search_client,
+            select=["id", "question"],
+            page_size=page_size,
+            id_cursor=supports_id_cursor(index_name)
+        ))
+        logger.info(f"📚 '{index_name}' 질문 {len(documents)}개 확인")
+        result = prerenderer.render(documents)
+    finally:
+        prerenderer.close()
+
+    refs = result.pop("refs")
+    try:
+        refs_written = _write_audio_refs(search_client, refs)
+    except Exception as e:
+        logger.warning(f"⚠️  audio_ref 기록 실패 (인덱스 스키마에 필드가 없으면 인덱스를 다시 생성하세요): {e}")
+        refs_written = 0
+
+    return {"index_name": index_name, **result, "refs_written": refs_written}
+
+
+# ============================================
+# 업로드 후 백그라운드 사전 합성
+# ============================================
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _render_in_background(documents: List[Dict]):
+    prerenderer = create_prerenderer()
+    if prerenderer is None:
+        return
+    try:
+        prerenderer.render(documents)
+    finally:
+        prerenderer.close()
+
+
+def schedule_prerender(documents: List[Dict]) -> Optional[Future]:
+    """
+    업로드한 문서의 질문 음성을 백그라운드에서 합성 (업로드 응답을 기다리게 하지 않음)
+    audio_ref는 업로드 시 문서에 함께 넣으므로 인덱스를 다시 쓰지 않음
+    """
+    global _executor
+
+    if os.getenv("TTS_PRERENDER_ENABLED", "true").lower() == "false" or not documents:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            # 작업은 순서대로 하나씩 (동시성은 작업 안에서 합성기 풀로 제한)
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-prerender-job")
+    # 임베딩 등 큰 필드는 넘기지 않음
+    jobs = [{"id": doc.get("id"), "question": doc.get("question")} for doc in documents]
+    return _executor.submit(_render_in_background, jobs)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="문제 은행 질문 음성 사전 합성")
+    parser.add_argument("--index", default=None, help="인덱스 이름 (기본: AZURE_SEARCH_INDEX)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    result = prerender_index(args.index, page_size=args.page_size)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()